@@ -0,0 +1,79 @@
+"""
+Authentication classes
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+STREAM_TICKET_SALT = "api.authentication.stream_ticket"
+
+
+def active_cache_key(user_id) -> str:
+    return f"auth:active:{user_id}"
+
+
+def is_user_active(user_id) -> bool:
+    """Whether the user exists and is active, cached for a short TTL"""
+    key = active_cache_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, active, settings.AUTH_ACTIVE_CACHE_TIMEOUT)
+    return active
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication without a users-table lookup per request.
+
+    `request.user` is a lightweight TokenUser built from the token claims
+    (use `request.user.id`, not model fields). Deactivated or deleted users
+    are still rejected via a short-TTL cached active-status check.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not is_user_active(user.id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+def issue_stream_ticket(user_id) -> str:
+    """A signed, timestamped ticket for opening the user's event stream"""
+    return signing.dumps(user_id, salt=STREAM_TICKET_SALT)
+
+
+class StreamTicketAuthentication(BaseAuthentication):
+    """
+    Authenticates `?ticket=` from POST /api/events/ticket/.
+
+    For EventSource streams only, since browsers cannot set headers on
+    them. URLs end up in access logs, so the ticket is signed rather than
+    an access token and expires after EVENTS_TICKET_SECONDS.
+    """
+
+    def authenticate(self, request):
+        ticket = request.query_params.get("ticket")
+        if not ticket:
+            return None
+        try:
+            user_id = signing.loads(
+                ticket,
+                salt=STREAM_TICKET_SALT,
+                max_age=settings.EVENTS_TICKET_SECONDS,
+            )
+        except signing.BadSignature:
+            raise AuthenticationFailed(
+                _("Stream ticket is invalid or expired"), code="ticket_invalid"
+            )
+        if not is_user_active(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return TokenUser({api_settings.USER_ID_CLAIM: user_id}), None
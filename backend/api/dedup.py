@@ -0,0 +1,152 @@
+"""
+Deduplicated check history
+
+With CHECK_DEDUP_WINDOW set, identical checks by one user (same label,
+hash prefix, score and breach result) within the same window are stored
+as one PasswordCheck row: `hit_count` counts them and `last_checked_at`
+is the time of the latest. Windows are fixed intervals of the epoch, so
+the row's `dedup_key` (a digest of the check and its window) is known
+before writing and a repeat costs one upsert on the (user, dedup_key)
+constraint: INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, or
+an UPDATE then INSERT on databases without it.
+
+Aggregates (api.stats) sum `hit_count`, so totals count every check.
+Daily rollups count a row's hits on the day of its `checked_at`, whether
+recorded live or rebuilt from history.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .events import publish_stats
+from .models import PasswordCheck
+from .routers import pin_to_primary
+
+KEY_FIELDS = ("label", "hash_prefix", "strength_score", "is_breached", "breach_count")
+
+
+def dedup_key(fields, when, window) -> str:
+    """Digest of a check's result and the dedup window containing `when`"""
+    values = [str(fields.get(name, "")) for name in KEY_FIELDS]
+    values.append(str(int(when.timestamp()) // window))
+    return hashlib.sha1("\0".join(values).encode()).hexdigest()
+
+
+def save_check(user, **fields) -> tuple:
+    """
+    Store one check, coalescing it into a repeat's row when deduplication
+    is on. Returns (check, created).
+
+    The returned check mirrors the stored row: for a coalesced repeat it
+    has the row's id, hit count and `checked_at` (the window's first
+    check, whose day the rollups count the repeat on, as backfilling
+    does), and `last_checked_at` is the time of this check.
+    """
+    window = settings.CHECK_DEDUP_WINDOW
+    if window <= 0:
+        return PasswordCheck.objects.create(user=user, **fields), True
+
+    now = timezone.now()
+    check = PasswordCheck(
+        user=user,
+        checked_at=now,
+        last_checked_at=now,
+        dedup_key=dedup_key(fields, now, window),
+        **fields,
+    )
+    connection = connections[router.db_for_write(PasswordCheck)]
+    features = connection.features
+    if (
+        features.supports_update_conflicts_with_target
+        and features.can_return_columns_from_insert
+    ):
+        check.id, check.hit_count, check.checked_at = _upsert(connection, check)
+        check._state.adding, check._state.db = False, connection.alias
+        created = check.hit_count == 1
+        if created:
+            # Let the usual receivers see the raw insert
+            post_save.send(
+                PasswordCheck,
+                instance=check,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=connection.alias,
+            )
+    else:
+        created = _update_or_create(check)
+
+    if not created:
+        pin_to_primary(user.id)
+        publish_stats(check)
+    return check, created
+
+
+def _upsert(connection, check) -> tuple:
+    """
+    Insert or count `check` with one statement; returns the row's
+    (id, hit_count, checked_at)
+    """
+    meta = PasswordCheck._meta
+    fields = [
+        meta.get_field(name)
+        for name in (
+            "user",
+            *KEY_FIELDS,
+            "checked_at",
+            "hit_count",
+            "last_checked_at",
+            "dedup_key",
+        )
+    ]
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    columns = ", ".join(qn(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    hit_count, last_checked_at = qn("hit_count"), qn("last_checked_at")
+    sql = (
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({qn('user_id')}, {qn('dedup_key')}) DO UPDATE SET "
+        f"{hit_count} = {table}.{hit_count} + 1, "
+        f"{last_checked_at} = EXCLUDED.{last_checked_at} "
+        f"RETURNING {qn('id')}, {hit_count}, {qn('checked_at')}"
+    )
+    params = [
+        field.get_db_prep_save(getattr(check, field.attname), connection)
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row_id, hits, checked_at = cursor.fetchone()
+    # Raw rows skip the backend's conversions (SQLite returns text)
+    column = meta.get_field("checked_at").get_col(meta.db_table)
+    for converter in connection.ops.get_db_converters(column):
+        checked_at = converter(checked_at, column, connection)
+    return row_id, hits, checked_at
+
+
+def _update_or_create(check) -> bool:
+    """Count a repeat with an UPDATE, or insert the first check of a window"""
+    rows = PasswordCheck.objects.filter(
+        user_id=check.user_id, dedup_key=check.dedup_key
+    )
+    updates = {
+        "hit_count": models.F("hit_count") + 1,
+        "last_checked_at": check.last_checked_at,
+    }
+    if not rows.update(**updates):
+        try:
+            with transaction.atomic():
+                check.save(force_insert=True)
+            return True
+        except IntegrityError:
+            # Another request inserted the row first
+            rows.update(**updates)
+    check.id, check.hit_count, check.checked_at = rows.values_list(
+        "id", "hit_count", "checked_at"
+    ).get()
+    return False
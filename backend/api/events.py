@@ -0,0 +1,309 @@
+"""
+Live dashboard events
+
+Events are pushed to a user's open Server-Sent Events streams through an
+in-process bus. Checks themselves are always read from the history, in id
+order: a bus notification makes the stream read them at once, and every
+EVENTS_POLL_SECONDS it reads anyway, which picks up checks saved by other
+worker processes and lets a reconnecting client resume from its
+Last-Event-ID. Progress of user imports is read the same way, from the
+ImportJob rows the importing thread updates after every batch, so an
+admin sees it whichever worker runs the import.
+
+Each open stream holds a worker thread, so a process serves at most
+EVENTS_MAX_STREAMS of them (see `slots`), and database connections are
+closed after every poll rather than held for the life of the stream.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import ImportJob, PasswordCheck
+from .renderers import isoformat
+
+CHECK_FIELDS = (
+    "id",
+    "label",
+    "strength_score",
+    "is_breached",
+    "breach_count",
+    "checked_at",
+)
+
+JOB_FIELDS = (
+    "id",
+    "status",
+    "total",
+    "done",
+    "created",
+    "skipped",
+    "error",
+    "started_at",
+    "updated_at",
+)
+
+
+class EventBus:
+    """
+    Per-user fan-out to subscriber queues within one process.
+
+    Queues are bounded: a client too slow to drain its queue loses bus
+    events, and picks up missed checks on its next history poll.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._queues = defaultdict(set)
+
+    def subscribe(self, user_id) -> queue.Queue:
+        subscriber = queue.Queue(self.maxsize)
+        with self._lock:
+            self._queues[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._queues.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._queues[user_id]
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._queues.get(user_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass
+
+
+bus = EventBus()
+
+
+class StreamSlots:
+    """Counts the event streams open in this process against a limit"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+
+    def acquire(self, limit) -> bool:
+        with self._lock:
+            if self.open >= limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open -= 1
+
+    def hold(self, stream):
+        """Wrap an acquired slot's stream so closing it frees the slot"""
+        return SlotStream(self, stream)
+
+
+class SlotStream:
+    """
+    Iterates a stream and releases its slot once, when exhausted or closed.
+
+    A plain generator would not do: closing one that never started (a
+    client gone before the first chunk) skips its `finally`.
+    """
+
+    def __init__(self, slots, stream):
+        self.slots = slots
+        self.stream = stream
+        self.released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self.stream.close()
+        if not self.released:
+            self.released = True
+            self.slots.release()
+
+
+slots = StreamSlots()
+
+
+def release_connections():
+    """Close this thread's database connections outside transactions"""
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def check_payload(values) -> dict:
+    data = dict(zip(CHECK_FIELDS, values))
+    data["checked_at"] = isoformat(data["checked_at"])
+    return data
+
+
+def publish_check(check: PasswordCheck):
+    """Wake the owner's streams to read a saved check once committed"""
+    user_id = check.user_id
+    transaction.on_commit(lambda: bus.publish(user_id, "check", None))
+
+
+def publish_stats(check: PasswordCheck):
+    """Tell the owner's streams their figures changed without a new check"""
+    user_id, data = check.user_id, {"last_check_id": check.id}
+    transaction.on_commit(lambda: bus.publish(user_id, "stats", data))
+
+
+def publish_progress(user_id, job, done, total, **extra):
+    """Report progress of a long-running job to the user's streams"""
+    bus.publish(
+        user_id, "progress", {"job": job, "done": done, "total": total, **extra}
+    )
+
+
+def publish_import(user_id):
+    """Wake the admin's streams to read their saved ImportJob progress"""
+    bus.publish(user_id, "import", None)
+
+
+def import_payload(values) -> dict:
+    job = dict(zip(JOB_FIELDS, values))
+    data = {
+        "job": "import_users",
+        "job_id": job["id"],
+        "done": job["done"],
+        "total": job["total"],
+        "created": job["created"],
+    }
+    if job["status"] != ImportJob.RUNNING:
+        seconds = (job["updated_at"] - job["started_at"]).total_seconds()
+        data.update(
+            finished=True,
+            status=job["status"],
+            skipped=job["skipped"],
+            users_per_second=round(job["created"] / seconds, 1) if seconds else 0.0,
+        )
+        if job["error"]:
+            data["error"] = job["error"]
+    return data
+
+
+def import_events(user_id, since) -> tuple:
+    """
+    (progress messages, new `since`) for the user's imports saved after
+    `since`; None reads the running import, for a stream just opened.
+    """
+    jobs = ImportJob.objects.filter(admin_id=user_id)
+    if since is None:
+        since = timezone.now()
+        jobs = jobs.filter(status=ImportJob.RUNNING)
+    else:
+        jobs = jobs.filter(updated_at__gt=since)
+    messages = []
+    for values in jobs.order_by("updated_at").values_list(*JOB_FIELDS):
+        since = max(since, values[-1])
+        messages.append(format_event("progress", import_payload(values)))
+    return messages, since
+
+
+def format_event(event, data, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def latest_check_id(user_id) -> int:
+    return (
+        PasswordCheck.objects.filter(user_id=user_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+        or 0
+    )
+
+
+def event_stream(user_id, last_id, max_seconds=None):
+    """
+    Yield SSE messages for one user until `max_seconds` have passed.
+
+    Check events carry the check id as the SSE id, so the browser's
+    automatic reconnect resumes after the last check it received. Each new
+    batch of checks is followed by a `stats` event telling the dashboard
+    its figures changed. Import progress is polled alongside the checks.
+    """
+    poll_seconds = settings.EVENTS_POLL_SECONDS
+    if max_seconds is None:
+        max_seconds = settings.EVENTS_STREAM_SECONDS
+    now = time.monotonic()
+    deadline = now + max_seconds
+    next_poll = now + poll_seconds
+    imports_since = None
+
+    subscriber = bus.subscribe(user_id)
+    try:
+        release_connections()
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            try:
+                event, data = subscriber.get(
+                    timeout=max(0, min(next_poll, deadline) - now)
+                )
+            except queue.Empty:
+                event = data = None
+
+            messages = []
+            new_checks = False
+            if event in ("check", "import"):
+                next_poll = 0
+            elif event is not None:
+                messages.append(format_event(event, data))
+
+            if time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + poll_seconds
+                checks = (
+                    PasswordCheck.objects.filter(user_id=user_id, id__gt=last_id)
+                    .order_by("id")
+                    .values_list(*CHECK_FIELDS)[: settings.EVENTS_POLL_BATCH]
+                )
+                for values in checks:
+                    last_id = values[0]
+                    messages.append(
+                        format_event("check", check_payload(values), last_id)
+                    )
+                    new_checks = True
+                progress, imports_since = import_events(user_id, imports_since)
+                messages.extend(progress)
+                release_connections()
+                if not messages:
+                    messages.append(": keepalive\n\n")
+
+            if new_checks:
+                messages.append(
+                    format_event("stats", {"last_check_id": last_id}, last_id)
+                )
+            if messages:
+                yield "".join(messages)
+    finally:
+        bus.unsubscribe(user_id, subscriber)
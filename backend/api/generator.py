@@ -0,0 +1,112 @@
+"""
+Password generation
+
+Passwords are built to satisfy `calculate_password_strength` by
+construction: every scoring criterion a policy can meet is guaranteed
+while the characters are drawn, so no candidate is ever scored and thrown
+away. Randomness comes from `secrets`.
+"""
+
+import secrets
+import string
+
+from .services import COMMON_PASSWORDS, SEQUENCES
+
+CHARACTER_CLASSES = {
+    "uppercase": string.ascii_uppercase,
+    "lowercase": string.ascii_lowercase,
+    "numbers": string.digits,
+    # Only symbols the scorer counts as special (the double quote is left
+    # out to keep passwords shell- and CSV-friendly)
+    "symbols": "!@#$%^&*(),.?:{}|<>",
+}
+
+LENGTH_THRESHOLDS = (8, 12, 16)
+MAX_LENGTH = 128
+
+# Characters that would complete a sequence, keyed by the two before them
+_SEQUENCE_ENDS = {}
+for _seq in SEQUENCES:
+    _SEQUENCE_ENDS.setdefault(_seq[:2], set()).update((_seq[2], _seq[2].upper()))
+
+_COMMON_BY_PREFIX = {}
+for _common in COMMON_PASSWORDS:
+    _COMMON_BY_PREFIX.setdefault(_common[:-1], set()).add(_common[-1])
+
+_random = secrets.SystemRandom()
+
+
+def policy_score(length: int, classes) -> int:
+    """
+    Score every password generated for this policy will get: length and
+    character-class points, plus the 30 pattern points (not common, no
+    sequences, no repeats), which generation always guarantees.
+    """
+    length_points = sum(10 for threshold in LENGTH_THRESHOLDS if length >= threshold)
+    return length_points + 10 * len(classes) + 30
+
+
+def _pick(alphabet: str, forbidden: set) -> str:
+    if forbidden:
+        alphabet = [char for char in alphabet if char not in forbidden]
+    return secrets.choice(alphabet)
+
+
+def _generate(length: int, alphabets: list, pool: str) -> str:
+    # One slot per required class, the rest drawn from the full pool
+    slots = alphabets + [pool] * (length - len(alphabets))
+    _random.shuffle(slots)
+
+    chars = []
+    for index, alphabet in enumerate(slots):
+        forbidden = set()
+        if index >= 2:
+            before = chars[-2] + chars[-1]
+            if before[0] == before[1]:
+                forbidden.add(before[1])
+            forbidden |= _SEQUENCE_ENDS.get(before.lower(), set())
+        if index == length - 1:
+            prefix = "".join(chars).lower()
+            for end in _COMMON_BY_PREFIX.get(prefix, ()):
+                forbidden.update((end, end.upper()))
+        chars.append(_pick(alphabet, forbidden))
+    return "".join(chars)
+
+
+def generate_passwords(
+    count: int,
+    length: int = 16,
+    min_score: int = 90,
+    uppercase: bool = True,
+    lowercase: bool = True,
+    numbers: bool = True,
+    symbols: bool = True,
+):
+    """
+    Return an iterator of `count` random passwords that each score at
+    least `min_score`, generated lazily as it is consumed.
+
+    Raises ValueError up front when the policy cannot reach `min_score`
+    (too short, or too few character classes enabled).
+    """
+    enabled = {
+        "uppercase": uppercase,
+        "lowercase": lowercase,
+        "numbers": numbers,
+        "symbols": symbols,
+    }
+    classes = [name for name, on in enabled.items() if on]
+    if not classes:
+        raise ValueError("Enable at least one character class")
+    if not len(classes) <= length <= MAX_LENGTH:
+        raise ValueError(f"Length must be between {len(classes)} and {MAX_LENGTH}")
+    score = policy_score(length, classes)
+    if score < min_score:
+        raise ValueError(
+            f"A {length}-character password using {', '.join(classes)} "
+            f"scores at most {score}"
+        )
+
+    alphabets = [CHARACTER_CLASSES[name] for name in classes]
+    pool = "".join(alphabets)
+    return (_generate(length, alphabets, pool) for _ in range(count))
@@ -0,0 +1,171 @@
+"""
+Have I Been Pwned range client
+
+Range responses are parsed once into a compact RangeTable and cached per
+prefix, so a lookup is a binary search instead of a scan over ~35KB of text.
+"""
+
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import tracing
+
+HIBP_RANGE_URL = "https://api.pwnedpasswords.com/range/{prefix}"
+
+# A SHA-1 digest is 20 bytes (40 hex chars). The 5-char prefix covers the
+# first two bytes and the high nibble of the third, so a 35-char suffix is
+# one leading nibble followed by exactly 17 bytes.
+SUFFIX_BYTES = 17
+
+RANGE_LINE_RE = re.compile(r"^([0-9A-F]{35}):(\d+)\s*$", re.MULTILINE)
+
+
+class _Keys:
+    """Sequence view over a packed suffix blob, one 17-byte key per item"""
+
+    __slots__ = ("blob",)
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.blob) // SUFFIX_BYTES
+
+    def __getitem__(self, index):
+        start = index * SUFFIX_BYTES
+        return self.blob[start : start + SUFFIX_BYTES]
+
+
+class RangeTable:
+    """
+    Parsed HIBP range for one prefix.
+
+    Suffixes are stored sorted as packed 17-byte keys with a parallel array
+    of breach counts. Entries are bucketed by their leading nibble, so
+    lookups bisect only inside one of 16 buckets.
+    Padding entries (count 0) are dropped at parse time.
+    """
+
+    __slots__ = ("prefix", "suffixes", "counts", "offsets")
+
+    def __init__(self, prefix: str, suffixes: bytes, counts: array, offsets: array):
+        self.prefix = prefix
+        self.suffixes = suffixes
+        self.counts = counts
+        self.offsets = offsets
+
+    @classmethod
+    def parse(cls, prefix: str, text: str) -> "RangeTable":
+        """Build a table from a raw `SUFFIX:COUNT` range body"""
+        entries = sorted(
+            (suffix, int(count))
+            for suffix, count in RANGE_LINE_RE.findall(text.upper())
+            if count != "0"
+        )
+
+        offsets = array("I", [0] * 17)
+        for suffix, _ in entries:
+            offsets[int(suffix[0], 16) + 1] += 1
+        for nibble in range(16):
+            offsets[nibble + 1] += offsets[nibble]
+
+        suffixes = bytes.fromhex("".join(suffix[1:] for suffix, _ in entries))
+        counts = array("I", (count for _, count in entries))
+        return cls(prefix.upper(), suffixes, counts, offsets)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def lookup(self, suffix: str) -> int:
+        """Return the breach count for a 35-char hex suffix (0 if absent)"""
+        if len(suffix) != 35:
+            return 0
+        try:
+            nibble = int(suffix[0], 16)
+            key = bytes.fromhex(suffix[1:])
+        except ValueError:
+            return 0
+
+        lo, hi = self.offsets[nibble], self.offsets[nibble + 1]
+        keys = _Keys(self.suffixes)
+        index = bisect_left(keys, key, lo, hi)
+        if index < hi and keys[index] == key:
+            return self.counts[index]
+        return 0
+
+    def entries(self):
+        """Yield (suffix, count) pairs in sorted order"""
+        keys = _Keys(self.suffixes)
+        for nibble in range(16):
+            lead = format(nibble, "X")
+            for index in range(self.offsets[nibble], self.offsets[nibble + 1]):
+                yield lead + keys[index].hex().upper(), self.counts[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Payload size of the table in bytes"""
+        return (
+            len(self.suffixes)
+            + self.counts.itemsize * len(self.counts)
+            + self.offsets.itemsize * len(self.offsets)
+        )
+
+
+def fetch_range(prefix: str) -> RangeTable | None:
+    """
+    Download and parse the range for a prefix.
+    Returns None on a non-200 response or a network error.
+    """
+    # Imported on first use to keep it off the cold-start path
+    import requests
+
+    with tracing.span("hibp.fetch") as span:
+        try:
+            response = requests.get(
+                HIBP_RANGE_URL.format(prefix=prefix),
+                headers={"User-Agent": "SecurePass-Dashboard", "Add-Padding": "true"},
+                timeout=5,
+            )
+        except requests.RequestException as exc:
+            span.set(http_status=None, error=type(exc).__name__)
+            return None
+        span.set(http_status=response.status_code)
+        if response.status_code != 200:
+            return None
+        return RangeTable.parse(prefix, response.text)
+
+
+def range_cache_key(prefix: str) -> str:
+    return f"hibp:range:{prefix.upper()}"
+
+
+def range_fetched_key(prefix: str) -> str:
+    return f"hibp:range-fetched:{prefix.upper()}"
+
+
+def store_range(table: RangeTable):
+    """Cache a parsed range, with its fetch time for the cache warmer"""
+    cache.set_many(
+        {
+            range_cache_key(table.prefix): table,
+            range_fetched_key(table.prefix): time.time(),
+        },
+        settings.HIBP_RANGE_CACHE_TIMEOUT,
+    )
+
+
+def get_range(prefix: str) -> RangeTable | None:
+    """Return the parsed range for a prefix, from cache when possible"""
+    with tracing.span("hibp.range") as span:
+        table = cache.get(range_cache_key(prefix))
+        span.set(cache_hit=table is not None)
+        if table is None:
+            table = fetch_range(prefix)
+            if table is not None:
+                store_range(table)
+        return table
@@ -0,0 +1,79 @@
+"""
+Latest check per label
+
+`record_latest` upserts one check into LatestCheck; `backfill_latest`
+rebuilds the table from the check history.
+"""
+
+from django.db import IntegrityError, transaction
+
+from .models import LatestCheck, PasswordCheck
+
+STATE_FIELDS = [
+    "hash_prefix",
+    "strength_score",
+    "is_breached",
+    "breach_count",
+    "checked_at",
+]
+
+
+def record_latest(check: PasswordCheck):
+    """Make `check` its label's latest state unless a newer one is stored"""
+    state = {field: getattr(check, field) for field in STATE_FIELDS}
+    # Only replace older results, so out-of-order writes cannot regress it
+    older = LatestCheck.objects.filter(
+        user_id=check.user_id, label=check.label, checked_at__lte=check.checked_at
+    )
+    if older.update(**state):
+        return
+    try:
+        with transaction.atomic():
+            LatestCheck.objects.create(
+                user_id=check.user_id, label=check.label, **state
+            )
+    except IntegrityError:
+        # The label already has a state: newer than this check, or just
+        # created by a concurrent request
+        older.update(**state)
+
+
+def backfill_latest(checks=None, batch_size=1000) -> int:
+    """
+    Rebuild LatestCheck from raw checks, upserting in batches.
+    Returns the number of (user, label) rows written.
+    """
+    if checks is None:
+        checks = PasswordCheck.objects.all()
+    rows = (
+        checks.order_by("user_id", "label", "-checked_at", "-id")
+        .values_list("user_id", "label", *STATE_FIELDS)
+        .iterator(chunk_size=batch_size)
+    )
+
+    written = 0
+    batch = []
+    previous = None
+    for user_id, label, *state in rows:
+        if (user_id, label) == previous:
+            continue
+        previous = (user_id, label)
+        batch.append(
+            LatestCheck(user_id=user_id, label=label, **dict(zip(STATE_FIELDS, state)))
+        )
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+    return written
+
+
+def _upsert(states) -> int:
+    LatestCheck.objects.bulk_create(
+        states,
+        update_conflicts=True,
+        unique_fields=["user", "label"],
+        update_fields=STATE_FIELDS,
+    )
+    return len(states)
@@ -0,0 +1,29 @@
+import time
+
+from api.latest import backfill_latest
+from api.models import PasswordCheck
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild LatestCheck rows (latest result per label) from the "
+        "PasswordCheck history. Run once after deploying the table, before "
+        "old history is pruned; it overwrites states written meanwhile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only this user id")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        checks = PasswordCheck.objects.all()
+        if options["user"]:
+            checks = checks.filter(user_id=options["user"])
+
+        start = time.perf_counter()
+        written = backfill_latest(checks, batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {written} latest checks in {elapsed:.2f}s")
+        )
@@ -0,0 +1,22 @@
+import time
+
+from api.prefixes import backfill_prefixes
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild PrefixPopularity counts from the PasswordCheck history. Run "
+        "once after deploying the table, before old history is pruned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written = backfill_prefixes(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {written} prefix counts in {elapsed:.2f}s")
+        )
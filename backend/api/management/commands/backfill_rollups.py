@@ -0,0 +1,35 @@
+import time
+
+from api.models import PasswordCheck
+from api.retention import unarchived
+from api.rollups import backfill_rollups
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild DailyRollup rows from the PasswordCheck history. Days already "
+        "folded into ArchivedStats by prune_checks are skipped, since their raw "
+        "rows are partly gone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only this user id")
+        parser.add_argument(
+            "--since", help="Only checks on or after this date (YYYY-MM-DD)"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        checks = unarchived(PasswordCheck.objects.all())
+        if options["user"]:
+            checks = checks.filter(user_id=options["user"])
+        if options["since"]:
+            checks = checks.filter(checked_at__date__gte=options["since"])
+
+        start = time.perf_counter()
+        written = backfill_rollups(checks, batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {written} daily rollups in {elapsed:.2f}s")
+        )
@@ -0,0 +1,42 @@
+from api.retention import prune_checks, retention_cutoff
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold PasswordCheck rows older than the retention window into the "
+        "rollup and archive tables, then delete them in chunks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.PASSWORD_CHECK_RETENTION_DAYS,
+            help="Retention window in days (default: PASSWORD_CHECK_RETENTION_DAYS)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Do all the work chunk by chunk, then roll each chunk back",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["days"])
+        if cutoff is None:
+            raise CommandError("Retention is disabled (--days is 0)")
+
+        result = prune_checks(
+            cutoff, chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
+        verb = "Would prune" if options["dry_run"] else "Pruned"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result['pruned']} checks older than {cutoff:%Y-%m-%d} "
+                f"in {result['chunks']} chunks ({result['rollups_written']} "
+                f"rollups written) in {result['seconds']:.2f}s, "
+                f"{result['rows_per_second']:.0f} rows/s"
+            )
+        )
@@ -0,0 +1,30 @@
+from api.revocation import load_revoked, purge_revoked_tokens
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete revoked refresh tokens that have expired, in chunks, and "
+        "optionally load the rest into the cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--prime-cache",
+            action="store_true",
+            help="Cache every unexpired revocation (see REVOKED_TOKENS_CACHE_SHARED)",
+        )
+
+    def handle(self, *args, **options):
+        result = purge_revoked_tokens(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {result['purged']} expired revoked tokens in "
+                f"{result['chunks']} chunks in {result['seconds']:.2f}s, "
+                f"{result['rows_per_second']:.0f} rows/s"
+            )
+        )
+        if options["prime_cache"]:
+            loaded = load_revoked(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Cached {loaded} revoked tokens"))
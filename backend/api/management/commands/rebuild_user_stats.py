@@ -0,0 +1,37 @@
+from api.stats import rebuild_user_stats
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's UserStats from the check history and archived "
+        "totals with one grouped query, and rewrite the rows that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing",
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild_user_stats(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        if options["verbosity"] > 1:
+            for user_id, stored, expected in result["drifted_users"]:
+                stored = "missing" if stored is None else f"{stored} checks"
+                self.stdout.write(f"user {user_id}: {stored}, expected {expected}")
+
+        verb = "Would rewrite" if options["dry_run"] else "Rewrote"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compared {result['users']} users: {result['drifted']} drifted "
+                f"({result['missing']} missing, total_checks off by "
+                f"{result['checks_drift']}). {verb} {len(result['drifted_users'])} "
+                f"rows from {result['rows']} checks in {result['seconds']:.2f}s, "
+                f"{result['rows_per_second']:.0f} rows/s"
+            )
+        )
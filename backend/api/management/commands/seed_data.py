@@ -0,0 +1,55 @@
+import time
+
+from api.synthetic import seed_history
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users and skewed PasswordCheck histories for load "
+        "and scaling tests. Users are named <prefix>-000000 onwards; running "
+        "again with the same prefix adds checks to the same users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--checks", type=int, default=1000, help="Total checks")
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of checks per user (0 spreads them evenly)",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Spread checks over this many days"
+        )
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument(
+            "--password", help="Login password for the users (default: unusable)"
+        )
+        parser.add_argument("--seed", type=int, help="Random seed")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["checks"] < 0:
+            raise CommandError("--users must be at least 1 and --checks at least 0")
+
+        start = time.perf_counter()
+        written = seed_history(
+            users=options["users"],
+            checks=options["checks"],
+            skew=options["skew"],
+            days=options["days"],
+            prefix=options["prefix"],
+            password=options["password"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {written['checks']} checks for {written['users']} users "
+                f"in {elapsed:.2f}s ({written['rollups']} daily rollups, "
+                f"{written['latest']} latest checks)"
+            )
+        )
@@ -0,0 +1,87 @@
+import time
+
+from api import tracing
+from api.prefixes import expected_hit_ratio, hot_prefixes, stale_prefixes, warm_ranges
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Prefetch the HIBP ranges of the most checked hash prefixes into the "
+        "cache before they expire. Needs a cache shared with the web workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=settings.HIBP_WARM_TOP,
+            help="Number of hot prefixes to keep cached (default: HIBP_WARM_TOP)",
+        )
+        parser.add_argument(
+            "--days", type=int, default=30, help="Only prefixes checked this recently"
+        )
+        parser.add_argument(
+            "--refresh-before",
+            type=int,
+            default=60 * 60,
+            help="Refetch ranges expiring within this many seconds",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running, warming every this many seconds (0: run once)",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Only report the hit ratio expected from history",
+        )
+
+    def handle(self, *args, **options):
+        if options["report"]:
+            return self.report(options["days"], options["top"])
+        if isinstance(caches["default"], LocMemCache):
+            self.stderr.write(
+                self.style.WARNING(
+                    "The default cache is per-process (LocMemCache): ranges "
+                    "warmed here are not visible to the web workers"
+                )
+            )
+
+        while True:
+            self.warm(options)
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
+
+    def warm(self, options):
+        start = time.perf_counter()
+        # A sampled round is one trace, with a hibp.fetch span per range
+        sampled = tracing.sampled()
+        with tracing.start_trace("hibp.warm") if sampled else tracing.NOOP_SPAN as root:
+            hot = hot_prefixes(options["top"], options["days"])
+            stale = stale_prefixes(hot, options["refresh_before"])
+            fetched, failed = warm_ranges(stale, workers=options["workers"])
+            root.set(hot=len(hot), fetched=fetched, failed=failed)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {fetched} of {len(hot)} hot ranges ({failed} failed, "
+                f"{len(hot) - len(stale)} still fresh) in {elapsed:.2f}s"
+            )
+        )
+
+    def report(self, days, top):
+        ratio = expected_hit_ratio(days, top)
+        self.stdout.write(
+            f"{ratio['checks']} checks over {ratio['prefixes']} prefixes in the "
+            f"last {days} days\n"
+            f"Expected range cache hit ratio: {ratio['cold']:.1%} cold, "
+            f"{ratio['warm']:.1%} with the top {ratio['hot_prefixes']} warmed"
+        )
@@ -0,0 +1,11 @@
+from api.warmup import warm_up
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Load lookup tables and prime database and cache connections"
+
+    def handle(self, *args, **options):
+        for step, seconds in warm_up().items():
+            self.stdout.write(f"{step}: {seconds * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS("Warm-up complete"))
@@ -0,0 +1,145 @@
+"""
+API middleware
+"""
+
+import random
+import re
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import profiling, tracing
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+re_accepts_br = re.compile(r"\bbr\b")
+
+
+class APICompressionMiddleware(GZipMiddleware):
+    """
+    Compress API read responses above API_COMPRESSION_MIN_SIZE bytes.
+
+    Only GET/HEAD responses with a data content type are compressed, so
+    request bodies are never reflected next to secrets (BREACH). Brotli is
+    used when the `brotli` package is installed and the client accepts it,
+    otherwise gzip via Django's GZipMiddleware.
+    """
+
+    content_types = (
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/plain",
+    )
+
+    def process_response(self, request, response):
+        if request.method not in ("GET", "HEAD"):
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in self.content_types:
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.API_COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is not None and re_accepts_br.search(accept_encoding):
+            if not (response.streaming and response.is_async):
+                return self.compress_brotli(response)
+        return super().process_response(request, response)
+
+    def compress_brotli(self, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming:
+            response.streaming_content = self._brotli_stream(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    def _brotli_stream(self, chunks):
+        compressor = brotli.Compressor()
+        for chunk in chunks:
+            # Flush per chunk so streamed rows still arrive progressively
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests on demand (see api.profiling).
+
+    Removed from the middleware chain unless PROFILE_REQUESTS is set, so
+    it costs nothing when disabled. Profiled responses carry the stored
+    profile's name in `X-Profile-Id`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_REQUESTS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = profiling.start_profile() if self.wants_profile(request) else None
+        if profile is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        response["X-Profile-Id"] = profiling.save_profile(profile, request)
+        return response
+
+    def wants_profile(self, request):
+        token = request.headers.get(profiling.PROFILE_HEADER)
+        if token:
+            return profiling.verify_token(token) is not None
+        rate = settings.PROFILE_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+
+class TracingMiddleware:
+    """
+    Trace a TRACING_SAMPLE_RATE fraction of requests (see api.tracing).
+
+    Removed from the middleware chain when the rate is 0. The root span
+    records the method, route and status, plus query counts and database
+    time of the whole request.
+    """
+
+    def __init__(self, get_response):
+        if settings.TRACING_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not tracing.sampled():
+            return self.get_response(request)
+        with tracing.start_trace(
+            "http.request", method=request.method
+        ) as root, tracing.count_queries():
+            response = self.get_response(request)
+            match = request.resolver_match
+            root.set(
+                route=match.route if match else request.path,
+                status=response.status_code,
+            )
+        response["X-Trace-Id"] = root.trace_id
+        return response
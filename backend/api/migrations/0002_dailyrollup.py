@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("checks", models.IntegerField(default=0)),
+                ("breached", models.IntegerField(default=0)),
+                (
+                    "strength_total",
+                    models.BigIntegerField(
+                        default=0, help_text="Sum of strength scores (for averages)"
+                    ),
+                ),
+                ("weak", models.IntegerField(default=0)),
+                ("fair", models.IntegerField(default=0)),
+                ("good", models.IntegerField(default=0)),
+                ("strong", models.IntegerField(default=0)),
+                ("very_strong", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "day"), name="unique_user_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_dailyrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("checks", models.IntegerField(default=0)),
+                ("breached", models.IntegerField(default=0)),
+                ("strength_total", models.BigIntegerField(default=0)),
+                ("weak", models.IntegerField(default=0)),
+                ("fair", models.IntegerField(default=0)),
+                ("good", models.IntegerField(default=0)),
+                ("strong", models.IntegerField(default=0)),
+                ("very_strong", models.IntegerField(default=0)),
+                (
+                    "archived_through",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="checked_at of the newest archived row",
+                        null=True,
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_archivedstats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="passwordcheck",
+            index=models.Index(
+                fields=["user", "-checked_at"], name="check_user_recent_idx"
+            ),
+        ),
+    ]
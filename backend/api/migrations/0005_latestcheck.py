@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_passwordcheck_user_recent_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LatestCheck",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("label", models.CharField(blank=True, max_length=100)),
+                ("hash_prefix", models.CharField(max_length=5)),
+                ("strength_score", models.IntegerField(default=0)),
+                ("is_breached", models.BooleanField(default=False)),
+                ("breach_count", models.IntegerField(default=0)),
+                ("checked_at", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="latest_checks",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["label"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "label"), name="unique_user_label"
+                    )
+                ],
+            },
+        ),
+    ]
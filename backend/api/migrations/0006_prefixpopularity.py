@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_latestcheck"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PrefixPopularity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hash_prefix", models.CharField(max_length=5, unique=True)),
+                ("checks", models.IntegerField(default=0)),
+                ("last_checked", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-checks"],
+                "indexes": [
+                    models.Index(fields=["-checks"], name="prefix_popularity_idx")
+                ],
+            },
+        ),
+    ]
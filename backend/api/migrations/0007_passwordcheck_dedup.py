@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:42
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_checked_at(apps, schema_editor):
+    # Existing rows each stand for one check made at checked_at
+    PasswordCheck = apps.get_model("api", "PasswordCheck")
+    PasswordCheck.objects.update(last_checked_at=models.F("checked_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_prefixpopularity"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="passwordcheck",
+            name="dedup_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=40, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="passwordcheck",
+            name="hit_count",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Checks this row stands for"
+            ),
+        ),
+        migrations.AddField(
+            model_name="passwordcheck",
+            name="last_checked_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="Time of the latest of those checks",
+            ),
+        ),
+        migrations.RunPython(copy_checked_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="passwordcheck",
+            index=models.Index(
+                fields=["user", "-last_checked_at"], name="check_user_last_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="passwordcheck",
+            constraint=models.UniqueConstraint(
+                fields=("user", "dedup_key"), name="unique_user_dedup_key"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_passwordcheck_dedup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="passwordcheck",
+            index=models.Index(fields=["-checked_at"], name="check_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="passwordcheck",
+            index=models.Index(
+                fields=["is_breached", "-checked_at"], name="check_breached_recent_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 
 class PasswordCheck(models.Model):
@@ -20,9 +21,34 @@ class PasswordCheck(models.Model):
     is_breached = models.BooleanField(default=False)
     breach_count = models.IntegerField(default=0, help_text="Times found in breaches")
     checked_at = models.DateTimeField(auto_now_add=True)
+    # Identical repeats within CHECK_DEDUP_WINDOW are coalesced into one row
+    # when deduplication is on (see api.dedup)
+    hit_count = models.PositiveIntegerField(
+        default=1, help_text="Checks this row stands for"
+    )
+    last_checked_at = models.DateTimeField(
+        default=timezone.now, help_text="Time of the latest of those checks"
+    )
+    dedup_key = models.CharField(max_length=40, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["-checked_at"]
+        indexes = [
+            models.Index(fields=["user", "-checked_at"], name="check_user_recent_idx"),
+            models.Index(
+                fields=["user", "-last_checked_at"], name="check_user_last_idx"
+            ),
+            # Admin changelist ordering, date hierarchy and breach filter
+            models.Index(fields=["-checked_at"], name="check_recent_idx"),
+            models.Index(
+                fields=["is_breached", "-checked_at"], name="check_breached_recent_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "dedup_key"], name="unique_user_dedup_key"
+            )
+        ]
 
     def __str__(self):
         return f"{self.label or 'Unlabeled'} - {self.user.username}"
@@ -41,3 +67,161 @@ class UserStats(models.Model):
 
     def __str__(self):
         return f"Stats for {self.user.username}"
+
+
+class DailyRollup(models.Model):
+    """
+    Per-user, per-day aggregate of password checks for time-series charts.
+    Updated incrementally on every check (see api.rollups).
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+    day = models.DateField()
+    checks = models.IntegerField(default=0)
+    breached = models.IntegerField(default=0)
+    strength_total = models.BigIntegerField(
+        default=0, help_text="Sum of strength scores (for averages)"
+    )
+    weak = models.IntegerField(default=0)
+    fair = models.IntegerField(default=0)
+    good = models.IntegerField(default=0)
+    strong = models.IntegerField(default=0)
+    very_strong = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "day"], name="unique_user_day")
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.user.username}"
+
+    @property
+    def avg_strength(self):
+        return self.strength_total / self.checks if self.checks else 0.0
+
+
+class ArchivedStats(models.Model):
+    """
+    Totals of PasswordCheck rows removed by the retention policy.
+    Live rows plus these totals give exact all-time figures (see api.stats).
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="archived_stats"
+    )
+    checks = models.IntegerField(default=0)
+    breached = models.IntegerField(default=0)
+    strength_total = models.BigIntegerField(default=0)
+    weak = models.IntegerField(default=0)
+    fair = models.IntegerField(default=0)
+    good = models.IntegerField(default=0)
+    strong = models.IntegerField(default=0)
+    very_strong = models.IntegerField(default=0)
+    archived_through = models.DateTimeField(
+        null=True, blank=True, help_text="checked_at of the newest archived row"
+    )
+
+    def __str__(self):
+        return f"Archived stats for {self.user.username}"
+
+
+class LatestCheck(models.Model):
+    """
+    Most recent check result per (user, label), upserted on every check
+    (see api.latest). Backs the current-health view without scanning the
+    history, and is kept when old history rows are pruned.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="latest_checks"
+    )
+    label = models.CharField(max_length=100, blank=True)
+    hash_prefix = models.CharField(max_length=5)
+    strength_score = models.IntegerField(default=0)
+    is_breached = models.BooleanField(default=False)
+    breach_count = models.IntegerField(default=0)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["label"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "label"], name="unique_user_label")
+        ]
+
+    def __str__(self):
+        return f"{self.label or 'Unlabeled'} - {self.user.username}"
+
+
+class PrefixPopularity(models.Model):
+    """
+    Checks per SHA-1 hash prefix across all users, incremented on every
+    check (see api.prefixes). Ranks the HIBP ranges worth keeping cached.
+    """
+
+    hash_prefix = models.CharField(max_length=5, unique=True)
+    checks = models.IntegerField(default=0)
+    last_checked = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-checks"]
+        indexes = [models.Index(fields=["-checks"], name="prefix_popularity_idx")]
+
+    def __str__(self):
+        return f"{self.hash_prefix} ({self.checks} checks)"
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked refresh token, kept until it would have expired anyway (see
+    api.revocation). The durable copy of the cached revocation list.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class ImportJob(models.Model):
+    """
+    A bulk user import uploaded by an admin (see api.onboarding). Progress
+    is saved after every batch; a running job that stops saving belonged
+    to a worker that was restarted, and is marked failed.
+    """
+
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    STATUS_CHOICES = [(RUNNING, "Running"), (FINISHED, "Finished"), (FAILED, "Failed")]
+
+    id = models.CharField(max_length=32, primary_key=True)
+    admin = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    error = models.CharField(max_length=200, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-started_at"]
+        constraints = [
+            # One import at a time across every worker
+            models.UniqueConstraint(
+                fields=["status"],
+                condition=models.Q(status="running"),
+                name="one_running_import",
+            )
+        ]
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status})"
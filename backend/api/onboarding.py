@@ -0,0 +1,272 @@
+"""
+Bulk user onboarding
+
+`read_users` parses a CSV (with a header row) or NDJSON file of users and
+validates each row like registration does; `import_users` creates them in
+batches. Password hashing dominates the cost, so each batch's passwords
+are hashed across a process pool, then the batch's users and their
+UserStats rows are inserted with bulk_create in one transaction. Users
+whose username already exists are skipped.
+
+The pool uses the spawn start method, so it is safe to start from a
+threaded web worker. Uploaded imports are tracked as ImportJob rows, one
+running at a time; a job whose worker was restarted mid-import stops
+reporting and is marked failed once IMPORT_JOB_STALE_SECONDS have passed.
+The import thread and the hashing processes continue the uploading
+request's trace (see api.tracing).
+"""
+
+import csv
+import json
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from . import tracing
+from .events import publish_import
+from .models import ImportJob, UserStats
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+FIELDS = ("username", "email", "password")
+# Matches UserSerializer
+MIN_PASSWORD_LENGTH = 8
+
+
+def _numbered_rows(stream, file_format):
+    """Yield (line number, row dict or None when unparseable)"""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        if "username" not in (reader.fieldnames or ()):
+            raise ValueError("The CSV header needs a username column")
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == "ndjson":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unknown format {file_format!r}, expected one of {FORMATS}")
+
+
+def _validate(row, seen) -> dict:
+    """Normalized user fields of a row; raises ValidationError"""
+    if row is None:
+        raise ValidationError("Not a JSON object")
+    user = {field: str(row.get(field) or "").strip() for field in FIELDS}
+    # Passwords are kept as given; a missing one gives an unusable password
+    password = row.get("password")
+    user["password"] = None if password in (None, "") else str(password)
+    username = user["username"]
+    if not username:
+        raise ValidationError("username is required")
+    User._meta.get_field("username").run_validators(username)
+    if username in seen:
+        raise ValidationError(f"Duplicate username {username!r}")
+    if user["email"]:
+        validate_email(user["email"])
+    if user["password"] is not None and len(user["password"]) < MIN_PASSWORD_LENGTH:
+        raise ValidationError(
+            f"password must be at least {MIN_PASSWORD_LENGTH} characters"
+        )
+    return user
+
+
+def read_users(stream, file_format, limit=None) -> tuple:
+    """
+    Parse and validate a text stream of users. Returns (users, errors):
+    dicts with `username`, `email` and `password` (None for an unusable
+    password), and dicts with the `line` and `error` of each rejected row.
+    Raises ValueError for an unknown format, a CSV without a username
+    column, or more than `limit` rows (reading stops at the first extra row).
+    """
+    users, errors, seen = [], [], set()
+    for count, (line, row) in enumerate(_numbered_rows(stream, file_format), 1):
+        if limit is not None and count > limit:
+            raise ValueError(f"At most {limit} users per upload")
+        try:
+            user = _validate(row, seen)
+        except ValidationError as exc:
+            errors.append({"line": line, "error": "; ".join(exc.messages)})
+            continue
+        seen.add(user["username"])
+        users.append(user)
+    return users, errors
+
+
+def hash_passwords(passwords, trace=None) -> list:
+    """
+    make_password for each password (None gives an unusable password).
+    `trace` is `tracing.inject()` output from the process that sent them.
+    """
+    with tracing.extract(trace, "import.hash", passwords=len(passwords)):
+        return [make_password(password) for password in passwords]
+
+
+def _hash_batch(passwords, pool, workers) -> list:
+    trace = tracing.inject()
+    if pool is None:
+        return hash_passwords(passwords, trace)
+    size = max(1, -(-len(passwords) // (workers * 4)))
+    chunks = [passwords[i : i + size] for i in range(0, len(passwords), size)]
+    hashed = pool.map(hash_passwords, chunks, [trace] * len(chunks))
+    return [password for chunk in hashed for password in chunk]
+
+
+def _taken(usernames) -> set:
+    return set(
+        User.objects.filter(username__in=usernames).values_list("username", flat=True)
+    )
+
+
+def _create_batch(pending) -> list:
+    """
+    Insert (user, password hash) pairs and their UserStats in one
+    transaction; returns the users created. Usernames registered since the
+    batch was filtered are dropped and the insert retried.
+    """
+    while pending:
+        try:
+            with transaction.atomic():
+                accounts = User.objects.bulk_create(
+                    User(
+                        username=user["username"], email=user["email"], password=hashed
+                    )
+                    for user, hashed in pending
+                )
+                UserStats.objects.bulk_create(
+                    UserStats(user=account) for account in accounts
+                )
+            return accounts
+        except IntegrityError:
+            taken = _taken([user["username"] for user, _ in pending])
+            if not taken:
+                raise
+            pending = [pair for pair in pending if pair[0]["username"] not in taken]
+    return []
+
+
+def import_users(users, batch_size=1000, workers=None, progress=None) -> dict:
+    """
+    Create `users` (as returned by `read_users`) and their UserStats rows,
+    one transaction per batch of `batch_size`. Passwords are hashed by
+    `workers` processes (default IMPORT_USERS_WORKERS; 0 hashes in this
+    process). `progress(done, created)` is called after each batch.
+    Returns the users created and skipped and the throughput.
+    """
+    if workers is None:
+        workers = settings.IMPORT_USERS_WORKERS
+    started = time.perf_counter()
+    created = skipped = 0
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            # Loads settings before tasks import this module
+            initializer=django.setup,
+        )
+
+    with pool or nullcontext():
+        pending = iter(users)
+        while batch := list(islice(pending, batch_size)):
+            with tracing.span("import.batch", users=len(batch)) as span:
+                existing = _taken([user["username"] for user in batch])
+                new = [user for user in batch if user["username"] not in existing]
+                hashes = _hash_batch([user["password"] for user in new], pool, workers)
+                accounts = _create_batch(list(zip(new, hashes)))
+                span.set(created=len(accounts))
+            created += len(accounts)
+            skipped += len(batch) - len(accounts)
+            if progress is not None:
+                progress(created + skipped, created)
+
+    seconds = time.perf_counter() - started
+    return {
+        "created": created,
+        "skipped": skipped,
+        "seconds": seconds,
+        "users_per_second": created / seconds if seconds else 0.0,
+    }
+
+
+def mark_orphaned_imports() -> int:
+    """Fail running imports that stopped reporting; returns how many"""
+    cutoff = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    return ImportJob.objects.filter(
+        status=ImportJob.RUNNING, updated_at__lt=cutoff
+    ).update(status=ImportJob.FAILED, error="Interrupted")
+
+
+def start_import(admin_id, users, batch_size=1000) -> str | None:
+    """
+    Import `users` in a background thread, recording progress on an
+    ImportJob that the admin's event streams report as `progress` events
+    of job `import_users`. Returns the job id, or None while another
+    import runs.
+    """
+    mark_orphaned_imports()
+    job_id = uuid.uuid4().hex
+    total = len(users)
+    try:
+        with transaction.atomic():
+            ImportJob.objects.create(id=job_id, admin_id=admin_id, total=total)
+    except IntegrityError:
+        return None
+
+    # Last counts reported; batches before a failure stay committed
+    reported = {"done": 0, "created": 0}
+
+    def report(done, created, status=ImportJob.RUNNING, **fields):
+        reported.update(done=done, created=created)
+        ImportJob.objects.filter(pk=job_id).update(
+            status=status,
+            done=done,
+            created=created,
+            updated_at=timezone.now(),
+            **fields,
+        )
+        publish_import(admin_id)
+
+    def run():
+        try:
+            with tracing.span("import.run", job_id=job_id, users=total):
+                result = import_users(users, batch_size, progress=report)
+            report(
+                total,
+                result["created"],
+                status=ImportJob.FINISHED,
+                skipped=result["skipped"],
+            )
+        except Exception:
+            logger.exception("User import %s failed", job_id)
+            report(**reported, status=ImportJob.FAILED, error="Import failed")
+        finally:
+            connections.close_all()
+
+    # The thread continues the request's trace, if it is sampled
+    threading.Thread(
+        target=tracing.propagate(run), name=f"import-users-{job_id}", daemon=True
+    ).start()
+    return job_id
@@ -0,0 +1,311 @@
+"""
+Password policy engine
+
+A policy is a declarative list of scoring rules (a dict, loadable from
+JSON). It is compiled once into a PolicyPlan and cached. Evaluating a
+password first extracts every rule's outcome as one bit of an integer,
+with work that depends on the password rather than the number of rules:
+one length lookup, one table lookup per distinct character, one set
+intersection per word length and one dict lookup for word lists. The
+bits are then mapped to score, label, feedback and criteria through a
+memo, since few bit combinations occur in practice.
+"""
+
+import json
+import re
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .services import COMMON_PASSWORDS, SEQUENCES, PasswordAnalysis, strength_label
+
+# Named character sets for `contains` rules. `digits` matches what the
+# regex `\d` matches (Unicode decimal digits).
+CHARSETS = {
+    "uppercase": lambda char: "A" <= char <= "Z",
+    "lowercase": lambda char: "a" <= char <= "z",
+    "digits": str.isdecimal,
+    "special": frozenset('!@#$%^&*(),.?":{}|<>').__contains__,
+}
+
+# Named word lists for `not_in` and `not_containing` rules
+WORD_LISTS = {
+    "common": COMMON_PASSWORDS,
+    "sequences": SEQUENCES,
+}
+
+RULE_TESTS = ("min_length", "contains", "not_in", "not_containing", "max_run")
+RULE_OPTIONS = ("name", "points", "feedback", "unless_failed", "required")
+
+DEFAULT_POLICY = {
+    "rules": [
+        {
+            "name": "length",
+            "min_length": 8,
+            "points": 10,
+            "feedback": "Use at least 8 characters",
+        },
+        {
+            "name": "length_12",
+            "min_length": 12,
+            "points": 10,
+            "feedback": "Consider using 12+ characters for better security",
+            "unless_failed": "length",
+        },
+        {"name": "length_16", "min_length": 16, "points": 10},
+        {
+            "name": "uppercase",
+            "contains": "uppercase",
+            "points": 10,
+            "feedback": "Add uppercase letters",
+        },
+        {
+            "name": "lowercase",
+            "contains": "lowercase",
+            "points": 10,
+            "feedback": "Add lowercase letters",
+        },
+        {
+            "name": "numbers",
+            "contains": "digits",
+            "points": 10,
+            "feedback": "Add numbers",
+        },
+        {
+            "name": "special",
+            "contains": "special",
+            "points": 10,
+            "feedback": "Add special characters (!@#$%)",
+        },
+        {
+            "name": "no_common",
+            "not_in": "common",
+            "points": 10,
+            "feedback": "Avoid common passwords",
+        },
+        {
+            "name": "no_sequential",
+            "not_containing": "sequences",
+            "points": 10,
+            "feedback": "Avoid sequences (123, abc)",
+        },
+        {
+            "name": "no_repeated",
+            "max_run": 2,
+            "points": 10,
+            "feedback": "Avoid repeated characters (aaa, 111)",
+        },
+    ],
+    "success_feedback": "Excellent! Very strong password 💪",
+}
+
+# Characters classified ahead of time; others are classified on first sight
+# and remembered up to this many
+_CHAR_CACHE_SIZE = 4096
+_OUTCOME_CACHE_SIZE = 65536
+
+
+class PolicyPlan:
+    """
+    A compiled policy. Build with `compile_policy`, which caches plans.
+
+    `evaluate` returns the same shape as `calculate_password_strength`,
+    plus `compliant` when the policy has `required` rules.
+    """
+
+    def __init__(self, spec: dict):
+        rules = spec.get("rules")
+        if not rules:
+            raise ValueError("A policy needs at least one rule")
+        self.names = tuple(rule.get("name") for rule in rules)
+        if None in self.names or len(set(self.names)) != len(self.names):
+            raise ValueError("Every rule needs a unique name")
+        self.success_feedback = spec.get("success_feedback", "")
+        self.points = tuple(rule.get("points", 0) for rule in rules)
+        self.feedback = tuple(rule.get("feedback") for rule in rules)
+        self.required_bits = 0
+        self.unless_failed = []
+
+        length_rules = []
+        self.char_tests = []
+        self.exact_bits = 0
+        self.exact_words = {}
+        self.substring_bits = 0
+        grams = {}
+        runs = {}
+
+        for index, rule in enumerate(rules):
+            bit = 1 << index
+            unknown = set(rule) - set(RULE_TESTS) - set(RULE_OPTIONS)
+            tests = [key for key in RULE_TESTS if key in rule]
+            if unknown or len(tests) != 1:
+                raise ValueError(
+                    f"Rule {rule['name']!r} needs exactly one of {RULE_TESTS}"
+                    + (f", got unknown keys {sorted(unknown)}" if unknown else "")
+                )
+            test, value = tests[0], rule[tests[0]]
+
+            if rule.get("required"):
+                self.required_bits |= bit
+            if "unless_failed" in rule:
+                if rule["unless_failed"] not in self.names:
+                    raise ValueError(f"Unknown rule {rule['unless_failed']!r}")
+                self.unless_failed.append(
+                    (bit, 1 << self.names.index(rule["unless_failed"]))
+                )
+
+            if test == "min_length":
+                length_rules.append((int(value), bit))
+            elif test == "contains":
+                predicate = CHARSETS.get(value) or frozenset(value).__contains__
+                self.char_tests.append((bit, predicate))
+            elif test == "not_in":
+                self.exact_bits |= bit
+                for word in self._words(value):
+                    self.exact_words[word] = self.exact_words.get(word, 0) | bit
+            elif test == "not_containing":
+                self.substring_bits |= bit
+                for word in self._words(value):
+                    by_word = grams.setdefault(len(word), {})
+                    by_word[word] = by_word.get(word, 0) | bit
+            elif test == "max_run":
+                runs[int(value)] = runs.get(int(value), 0) | bit
+
+        # Bits of every min_length rule met, indexed by password length
+        longest = max((length for length, _ in length_rules), default=0)
+        self.length_bits = [
+            sum(bit for length, bit in length_rules if size >= length)
+            for size in range(longest + 1)
+        ]
+        self.grams = [(size, by_word) for size, by_word in sorted(grams.items())]
+        self.run_tests = [
+            (re.compile(rf"(.)\1{{{limit},}}"), bits) for limit, bits in runs.items()
+        ]
+        self.char_bits = {}
+        for code in range(128):
+            self.classify(chr(code))
+        self.outcomes = {}
+
+    @staticmethod
+    def _words(value):
+        words = WORD_LISTS.get(value, ()) if isinstance(value, str) else value
+        return {word.lower() for word in words if word}
+
+    def classify(self, char) -> int:
+        """Bits of every `contains` rule the character satisfies"""
+        mask = 0
+        for bit, predicate in self.char_tests:
+            if predicate(char):
+                mask |= bit
+        if len(self.char_bits) < _CHAR_CACHE_SIZE:
+            self.char_bits[char] = mask
+        return mask
+
+    def features(self, password: str | PasswordAnalysis) -> int:
+        """One bit per rule, set when the password passes it"""
+        analysis = PasswordAnalysis.of(password)
+        password = analysis.password
+        size = len(password)
+        bits = self.length_bits[min(size, len(self.length_bits) - 1)]
+
+        char_bits = self.char_bits
+        for char in analysis.chars:
+            mask = char_bits.get(char)
+            bits |= self.classify(char) if mask is None else mask
+
+        if self.exact_bits or self.substring_bits:
+            lower = analysis.lower
+            if self.exact_bits:
+                bits |= self.exact_bits & ~self.exact_words.get(lower, 0)
+            if self.substring_bits:
+                found = 0
+                for gram_size, by_word in self.grams:
+                    present = {
+                        lower[i : i + gram_size]
+                        for i in range(len(lower) - gram_size + 1)
+                    }
+                    for word in by_word.keys() & present:
+                        found |= by_word[word]
+                bits |= self.substring_bits & ~found
+
+        for pattern, mask in self.run_tests:
+            if not pattern.search(password):
+                bits |= mask
+        return bits
+
+    def outcome(self, bits: int) -> tuple:
+        """(score, strength, feedback, criteria, compliant) for a bit set"""
+        cached = self.outcomes.get(bits)
+        if cached is not None:
+            return cached
+
+        passed = [bool(bits >> index & 1) for index in range(len(self.names))]
+        score = sum(points for points, ok in zip(self.points, passed) if ok)
+        score = max(0, min(100, score))
+        hidden = 0
+        for bit, gate in self.unless_failed:
+            if not bits & gate:
+                hidden |= bit
+        feedback = tuple(
+            message
+            for index, (message, ok) in enumerate(zip(self.feedback, passed))
+            if message and not ok and not hidden >> index & 1
+        ) or (self.success_feedback,)
+        compliant = bits & self.required_bits == self.required_bits
+
+        result = (score, strength_label(score), feedback, tuple(passed), compliant)
+        if len(self.outcomes) < _OUTCOME_CACHE_SIZE:
+            self.outcomes[bits] = result
+        return result
+
+    def evaluate(self, password: str | PasswordAnalysis) -> dict:
+        score, strength, feedback, passed, compliant = self.outcome(
+            PasswordAnalysis.of(password).features(self)
+        )
+        result = {
+            "score": score,
+            "strength": strength,
+            "feedback": list(feedback),
+            "criteria": dict(zip(self.names, passed)),
+        }
+        if self.required_bits:
+            result["compliant"] = compliant
+        return result
+
+
+_compiled = {}
+_by_name = {}
+
+
+def compile_policy(spec: dict) -> PolicyPlan:
+    """Compile a policy spec, reusing the plan of an identical spec"""
+    key = json.dumps(spec, sort_keys=True, default=sorted)
+    plan = _compiled.get(key)
+    if plan is None:
+        plan = _compiled[key] = PolicyPlan(spec)
+    return plan
+
+
+def get_policy(name=None) -> PolicyPlan:
+    """
+    Compiled plan for a policy name: the built-in default for None or
+    "default", otherwise an entry of settings.PASSWORD_POLICIES.
+    Raises LookupError for unknown names.
+    """
+    plan = _by_name.get(name)
+    if plan is None:
+        if name in (None, "default"):
+            spec = DEFAULT_POLICY
+        elif name in settings.PASSWORD_POLICIES:
+            spec = settings.PASSWORD_POLICIES[name]
+        else:
+            raise LookupError(f"Unknown password policy {name!r}")
+        plan = _by_name[name] = compile_policy(spec)
+    return plan
+
+
+@receiver(setting_changed)
+def _reset_policies(setting, **kwargs):
+    if setting == "PASSWORD_POLICIES":
+        _by_name.clear()
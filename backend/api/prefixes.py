@@ -0,0 +1,151 @@
+"""
+Hash-prefix popularity and HIBP cache warming
+
+`record_prefix` counts every check against its SHA-1 prefix across all
+users; `backfill_prefixes` rebuilds the counts from history. The most
+checked prefixes are the HIBP ranges worth keeping cached: `warm_ranges`
+refetches those whose cached copy is missing or about to expire, and
+`expected_hit_ratio` replays history to estimate how many lookups a cold
+and a warmed cache would serve.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from . import tracing
+from .hibp import fetch_range, range_fetched_key, store_range
+from .models import PasswordCheck, PrefixPopularity
+
+
+def record_prefix(check: PasswordCheck):
+    """Count a saved check against its hash prefix"""
+    prefixes = PrefixPopularity.objects.filter(hash_prefix=check.hash_prefix)
+    updates = {"checks": models.F("checks") + 1, "last_checked": check.last_checked_at}
+    if prefixes.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            PrefixPopularity.objects.create(
+                hash_prefix=check.hash_prefix,
+                checks=1,
+                last_checked=check.last_checked_at,
+            )
+    except IntegrityError:
+        # Another request created the row first
+        prefixes.update(**updates)
+
+
+def backfill_prefixes(checks=None, batch_size=1000) -> int:
+    """
+    Recompute prefix counts from raw checks and upsert them in batches.
+    Returns the number of prefixes written.
+    """
+    if checks is None:
+        checks = PasswordCheck.objects.all()
+    rows = (
+        checks.values("hash_prefix")
+        .annotate(
+            checks=models.Sum("hit_count"),
+            last_checked=models.Max("last_checked_at"),
+        )
+        .order_by()
+    )
+
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(PrefixPopularity(**row))
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+    return written
+
+
+def _upsert(prefixes) -> int:
+    PrefixPopularity.objects.bulk_create(
+        prefixes,
+        update_conflicts=True,
+        unique_fields=["hash_prefix"],
+        update_fields=["checks", "last_checked"],
+    )
+    return len(prefixes)
+
+
+def hot_prefixes(top, days=None) -> list:
+    """The `top` most checked prefixes, of those checked in the last `days`"""
+    prefixes = PrefixPopularity.objects.order_by("-checks")
+    if days:
+        prefixes = prefixes.filter(last_checked__gte=timezone.now() - timedelta(days))
+    return list(prefixes.values_list("hash_prefix", flat=True)[:top])
+
+
+def stale_prefixes(prefixes, refresh_before) -> list:
+    """Prefixes not cached, or whose cached range expires within `refresh_before`"""
+    fetched = cache.get_many([range_fetched_key(prefix) for prefix in prefixes])
+    oldest = time.time() - settings.HIBP_RANGE_CACHE_TIMEOUT + refresh_before
+    return [
+        prefix
+        for prefix in prefixes
+        if fetched.get(range_fetched_key(prefix), 0) < oldest
+    ]
+
+
+def warm_ranges(prefixes, workers=4) -> tuple:
+    """Fetch and cache ranges concurrently; returns (fetched, failed)"""
+    fetched = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for table in pool.map(tracing.propagate(fetch_range), prefixes):
+            if table is None:
+                failed += 1
+            else:
+                store_range(table)
+                fetched += 1
+    return fetched, failed
+
+
+def expected_hit_ratio(days=30, top=1000) -> dict:
+    """
+    Replay the last `days` of checks against a simulated range cache.
+
+    A lookup hits when its prefix was fetched less than
+    HIBP_RANGE_CACHE_TIMEOUT earlier (`cold`, no warming), or also when it
+    is one of the `top` hot prefixes kept cached by the warmer (`warm`).
+    Eviction by the cache's entry limit is not modelled.
+    """
+    timeout = timedelta(seconds=settings.HIBP_RANGE_CACHE_TIMEOUT)
+    hot = set(hot_prefixes(top, days))
+    checks = (
+        PasswordCheck.objects.filter(checked_at__gte=timezone.now() - timedelta(days))
+        .order_by("checked_at")
+        .values_list("hash_prefix", "checked_at", "hit_count")
+    )
+
+    fetched_at = {}
+    total = cold_hits = warm_hits = 0
+    for prefix, checked_at, hits in checks.iterator(chunk_size=5000):
+        total += hits
+        # Repeats coalesced into the row came soon after its first check
+        cold_hits += hits - 1
+        warm_hits += hits - 1
+        last = fetched_at.get(prefix)
+        if last is not None and checked_at - last < timeout:
+            cold_hits += 1
+            warm_hits += 1
+        else:
+            fetched_at[prefix] = checked_at
+            warm_hits += prefix in hot
+    return {
+        "checks": total,
+        "prefixes": len(fetched_at),
+        "hot_prefixes": len(hot),
+        "cold": cold_hits / total if total else 0.0,
+        "warm": warm_hits / total if total else 0.0,
+    }
@@ -0,0 +1,205 @@
+"""
+On-demand request profiling
+
+A request is profiled when it carries a valid signed `X-Profile` header
+(issued to staff by the admin API) or is picked by PROFILE_SAMPLE_RATE.
+The default profiler samples the request thread's stack from a background
+thread every PROFILE_INTERVAL_MS and writes a speedscope file
+(https://www.speedscope.app); PROFILE_MODE=cprofile uses cProfile instead
+and writes a pstats file. Profiles cover the request up to the response
+being returned; streamed bodies are produced later and are not included.
+"""
+
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_HEADER = "X-Profile"
+EXTENSIONS = (".speedscope.json", ".prof")
+
+_signer = signing.TimestampSigner(salt="api.profiling")
+_slug_re = re.compile(r"[^A-Za-z0-9]+")
+
+
+def issue_token(user) -> str:
+    """Signed `X-Profile` header value for a staff user"""
+    return _signer.sign_object({"user": user.pk})
+
+
+def verify_token(token):
+    """User id of a valid, unexpired token, else None"""
+    try:
+        payload = _signer.unsign_object(token, max_age=settings.PROFILE_TOKEN_SECONDS)
+    except signing.BadSignature:
+        return None
+    return payload.get("user")
+
+
+class SampledProfile:
+    """
+    Samples one thread's stack at a fixed interval. The profiled thread
+    runs untouched; the cost is the sampler thread taking the GIL briefly
+    each interval.
+    """
+
+    extension = ".speedscope.json"
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self._done.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += now - last
+            last = now
+
+    def write(self, path, name):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, seconds in self.stacks.items():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append(dict(zip(("name", "file", "line"), frame)))
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(seconds)
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "securepass",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.elapsed,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as profile_file:
+            json.dump(document, profile_file)
+
+
+class DeterministicProfile:
+    """cProfile wrapper: exact call counts, at a much higher overhead"""
+
+    extension = ".prof"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.elapsed = time.perf_counter() - self.started
+
+    def write(self, path, name):
+        self.profiler.dump_stats(path)
+
+
+def start_profile():
+    """Start a profiler of the configured mode for the current thread"""
+    if settings.PROFILE_MODE == "cprofile":
+        profile = DeterministicProfile()
+    else:
+        profile = SampledProfile(settings.PROFILE_INTERVAL_MS / 1000)
+    try:
+        profile.start()
+    except ValueError:
+        # Another profiler is active (cProfile is process-wide on 3.12+)
+        return None
+    return profile
+
+
+def save_profile(profile, request) -> str:
+    """Write a stopped profile to PROFILE_DIR and return its file name"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = _slug_re.sub("-", request.path).strip("-")[:60] or "root"
+    name = (
+        f"{stamp}-{uuid.uuid4().hex[:8]}-{request.method}-{slug}"
+        f"-{profile.elapsed * 1000:.0f}ms{profile.extension}"
+    )
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    profile.write(os.path.join(settings.PROFILE_DIR, name), name)
+    prune_profiles()
+    return name
+
+
+def list_profiles() -> list:
+    """Stored profiles, newest first"""
+    try:
+        entries = [
+            entry
+            for entry in os.scandir(settings.PROFILE_DIR)
+            if entry.is_file() and entry.name.endswith(EXTENSIONS)
+        ]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    return [
+        {
+            "name": entry.name,
+            "format": "pstats" if entry.name.endswith(".prof") else "speedscope",
+            "size": entry.stat().st_size,
+            "created": datetime.fromtimestamp(
+                entry.stat().st_mtime, timezone.utc
+            ).isoformat(),
+        }
+        for entry in entries
+    ]
+
+
+def profile_path(name):
+    """Path of a stored profile, or None for names not in the listing"""
+    if any(profile["name"] == name for profile in list_profiles()):
+        return os.path.join(settings.PROFILE_DIR, name)
+    return None
+
+
+def prune_profiles():
+    """Delete the oldest profiles beyond PROFILE_MAX_FILES"""
+    for profile in list_profiles()[settings.PROFILE_MAX_FILES :]:
+        try:
+            os.remove(os.path.join(settings.PROFILE_DIR, profile["name"]))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,152 @@
+"""
+Retention policy for PasswordCheck history
+
+Rows older than PASSWORD_CHECK_RETENTION_DAYS are folded into the daily
+rollups and into ArchivedStats, then deleted in bounded chunks so no single
+transaction is large or holds locks for long. The cutoff is aligned to a
+local day boundary, so every pruned day is complete in DailyRollup.
+"""
+
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from .models import ArchivedStats, DailyRollup, PasswordCheck
+from .rollups import ROLLUP_FIELDS, aggregate_checks_by_day
+from .stats import TOTAL_FIELDS, total_aggregates
+
+
+def retention_cutoff(days=None):
+    """Start of the oldest retained local day, or None when retention is off"""
+    if days is None:
+        days = settings.PASSWORD_CHECK_RETENTION_DAYS
+    if not days:
+        return None
+    first_day = timezone.localdate() - timedelta(days=days)
+    return timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+
+
+def fold_into_rollups(checks, batch_size=1000, dry_run=False) -> int:
+    """
+    Make sure every (user, day) in `checks` is fully counted in DailyRollup.
+
+    Rollups are only raised, never lowered: a day already counted
+    (including one partially pruned by an interrupted run) is left alone.
+    Returns the number of rollup rows written.
+    """
+    written = 0
+    rows = aggregate_checks_by_day(checks).iterator(chunk_size=batch_size)
+    while batch := list(islice(rows, batch_size)):
+        counted = {
+            (user_id, day): checks
+            for user_id, day, checks in DailyRollup.objects.filter(
+                user_id__in={row["user_id"] for row in batch},
+                day__in={row["day"] for row in batch},
+            ).values_list("user_id", "day", "checks")
+        }
+        missing = [
+            DailyRollup(**row)
+            for row in batch
+            if counted.get((row["user_id"], row["day"]), 0) < row["checks"]
+        ]
+        if missing:
+            with transaction.atomic():
+                DailyRollup.objects.bulk_create(
+                    missing,
+                    update_conflicts=True,
+                    unique_fields=["user", "day"],
+                    update_fields=ROLLUP_FIELDS,
+                )
+                transaction.set_rollback(dry_run)
+            written += len(missing)
+    return written
+
+
+def archive_chunk(checks):
+    """Add a chunk of checks to each owner's ArchivedStats"""
+    per_user = (
+        checks.values("user_id")
+        .annotate(newest=models.Max("checked_at"), **total_aggregates())
+        .order_by()
+    )
+    for row in per_user:
+        user_id, newest = row.pop("user_id"), row.pop("newest")
+        updates = {field: models.F(field) + row[field] for field in TOTAL_FIELDS}
+        updates["archived_through"] = Greatest(
+            Coalesce("archived_through", Value(newest)), Value(newest)
+        )
+        archived = ArchivedStats.objects.filter(user_id=user_id)
+        if archived.update(**updates):
+            continue
+        try:
+            with transaction.atomic():
+                ArchivedStats.objects.create(
+                    user_id=user_id, archived_through=newest, **row
+                )
+        except IntegrityError:
+            archived.update(**updates)
+
+
+def unarchived(checks):
+    """
+    `checks` on days after their owner's ArchivedStats.archived_through.
+    Earlier days have been (at least partly) pruned, so their rollups can no
+    longer be rebuilt from raw rows.
+    """
+    archived_through = ArchivedStats.objects.filter(user_id=OuterRef("user_id")).values(
+        "archived_through"
+    )
+    archived_day = TruncDate(
+        Subquery(archived_through), tzinfo=timezone.get_current_timezone()
+    )
+    return checks.alias(archived_day=archived_day).filter(
+        Q(archived_day__isnull=True) | Q(checked_at__date__gt=F("archived_day"))
+    )
+
+
+def prune_checks(cutoff, chunk_size=1000, dry_run=False) -> dict:
+    """
+    Fold and delete checks older than `cutoff`, one chunk per transaction.
+
+    With `dry_run` every chunk does the same work and is then rolled back,
+    so the reported throughput is realistic and nothing changes.
+    Returns counts and timings.
+    """
+    start = time.perf_counter()
+    old_checks = PasswordCheck.objects.filter(checked_at__lt=cutoff)
+
+    rollups = fold_into_rollups(old_checks, batch_size=chunk_size, dry_run=dry_run)
+
+    pruned = chunks = 0
+    last_id = 0
+    while True:
+        ids = list(
+            old_checks.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            chunk = PasswordCheck.objects.filter(id__in=ids)
+            archive_chunk(chunk)
+            chunk.delete()
+            transaction.set_rollback(dry_run)
+        pruned += len(ids)
+        chunks += 1
+        last_id = ids[-1]
+
+    elapsed = time.perf_counter() - start
+    return {
+        "pruned": pruned,
+        "chunks": chunks,
+        "rollups_written": rollups,
+        "seconds": elapsed,
+        "rows_per_second": pruned / elapsed if elapsed else 0.0,
+    }
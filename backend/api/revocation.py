@@ -0,0 +1,130 @@
+"""
+Refresh-token revocation
+
+simplejwt's blacklist app looks every refresh token up in the database
+and keeps its tables forever. Here a revoked token's `jti` is cached under
+its own key until the token would have expired, so a lookup is one cache
+read, and RevokedToken keeps the durable copy.
+
+Revoking inserts the RevokedToken row first; the unique `jti` makes a
+token usable for one rotation only, even when two refreshes race. A cache
+miss is answered from the table, except with REVOKED_TOKENS_CACHE_SHARED
+once `load_revoked` has primed the cache: every later revocation writes
+the same shared cache, so a miss means the token is not revoked.
+`purge_revoked_tokens` deletes rows whose tokens have expired.
+"""
+
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+# Set once every unexpired RevokedToken row is in the cache
+LOADED_KEY = "auth:revoked:loaded"
+
+
+def revoked_cache_key(jti) -> str:
+    return f"auth:revoked:{jti}"
+
+
+def is_revoked(jti) -> bool:
+    """Whether the refresh token with this `jti` has been revoked"""
+    key = revoked_cache_key(jti)
+    cached = cache.get_many([key, LOADED_KEY])
+    if cached.get(key):
+        return True
+    if settings.REVOKED_TOKENS_CACHE_SHARED and cached.get(LOADED_KEY):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(token) -> None:
+    """
+    Revoke a refresh token until it expires. Raises TokenError when it was
+    already revoked.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime_from_epoch(token["exp"])
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        raise TokenError(_("Token is blacklisted")) from None
+    timeout = (expires_at - timezone.now()).total_seconds()
+    if timeout > 0:
+        cache.set(revoked_cache_key(jti), True, timeout)
+
+
+def load_revoked(batch_size=1000) -> int:
+    """Cache every unexpired revocation; returns the number loaded"""
+    now = timezone.now()
+    rows = (
+        RevokedToken.objects.filter(expires_at__gt=now)
+        .values_list("jti", "expires_at")
+        .iterator(chunk_size=batch_size)
+    )
+    loaded = 0
+    while batch := list(islice(rows, batch_size)):
+        timeout = (max(row[1] for row in batch) - now).total_seconds()
+        cache.set_many({revoked_cache_key(row[0]): True for row in batch}, timeout)
+        loaded += len(batch)
+    cache.set(LOADED_KEY, True, None)
+    return loaded
+
+
+def purge_revoked_tokens(batch_size=1000) -> dict:
+    """
+    Delete RevokedToken rows whose tokens have expired, `batch_size` rows
+    per statement. Their cache entries have already expired on their own.
+    """
+    started = time.perf_counter()
+    expired = RevokedToken.objects.filter(expires_at__lte=timezone.now())
+    purged = chunks = 0
+    while ids := list(expired.values_list("pk", flat=True)[:batch_size]):
+        purged += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+        chunks += 1
+    seconds = time.perf_counter() - started
+    return {
+        "purged": purged,
+        "chunks": chunks,
+        "seconds": seconds,
+        "rows_per_second": purged / seconds if seconds else 0.0,
+    }
+
+
+class RevocableRefreshToken(RefreshToken):
+    """A refresh token that is checked against, and can join, the revocation list"""
+
+    def verify(self):
+        super().verify()
+        if is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        revoke(self)
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Rejects revoked refresh tokens and revokes each one it rotates"""
+
+    token_class = RevocableRefreshToken
+
+
+class RevocableTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """Revokes a refresh token on logout"""
+
+    token_class = RevocableRefreshToken
@@ -0,0 +1,83 @@
+"""
+Daily rollups of password checks
+
+`record_check` folds one new check into its (user, day) row with a single
+UPDATE; `backfill_rollups` rebuilds rows from the raw check history.
+"""
+
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyRollup, PasswordCheck
+from .services import strength_label
+from .stats import TOTAL_FIELDS, total_aggregates
+
+ROLLUP_FIELDS = list(TOTAL_FIELDS)
+
+
+def record_check(check: PasswordCheck):
+    """Add a saved check to its user's rollup for the check's local day"""
+    day = timezone.localdate(check.checked_at)
+    increments = {
+        "checks": 1,
+        "breached": int(check.is_breached),
+        "strength_total": check.strength_score,
+        strength_label(check.strength_score): 1,
+    }
+
+    rollups = DailyRollup.objects.filter(user_id=check.user_id, day=day)
+    updates = {field: models.F(field) + value for field, value in increments.items()}
+    if rollups.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(user_id=check.user_id, day=day, **increments)
+    except IntegrityError:
+        # Another request created the row first
+        rollups.update(**updates)
+
+
+def aggregate_checks_by_day(checks):
+    """
+    Group a PasswordCheck queryset by (user, local day), yielding dicts with
+    `user_id`, `day` and every rollup field.
+    """
+    return (
+        checks.annotate(
+            day=TruncDate("checked_at", tzinfo=timezone.get_current_timezone())
+        )
+        .values("user_id", "day")
+        .annotate(**total_aggregates())
+        .order_by()
+    )
+
+
+def backfill_rollups(checks=None, batch_size=1000) -> int:
+    """
+    Recompute rollups from raw checks and upsert them in batches.
+    Returns the number of (user, day) rows written.
+    """
+    if checks is None:
+        checks = PasswordCheck.objects.all()
+
+    written = 0
+    batch = []
+    for row in aggregate_checks_by_day(checks).iterator(chunk_size=batch_size):
+        batch.append(DailyRollup(**row))
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+    return written
+
+
+def _upsert(rollups) -> int:
+    DailyRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=["user", "day"],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(rollups)
@@ -0,0 +1,99 @@
+"""
+Read-replica database routing
+
+Dashboard reads (history, stats, exports) are sent to the `replica` alias
+while a view is inside `ReplicaReadMixin`; everything else, and every
+write, uses `default`. A user who just wrote is pinned to the primary for
+REPLICA_PIN_SECONDS so they always read their own writes, and an
+unconfigured or unreachable replica falls back to the primary.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+REPLICA_DB_ALIAS = "replica"
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def pin_cache_key(user_id) -> str:
+    return f"db:pinned:{user_id}"
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in connections.settings
+
+
+def pin_to_primary(user_id):
+    """Route this user's reads to the primary while the replica catches up"""
+    if replica_configured():
+        cache.set(pin_cache_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def replica_available() -> bool:
+    """Whether a replica is configured and was reachable recently"""
+    if not replica_configured() or cache.get("db:replica-down"):
+        return False
+    try:
+        connections[REPLICA_DB_ALIAS].ensure_connection()
+    except DatabaseError:
+        cache.set("db:replica-down", True, settings.REPLICA_RETRY_SECONDS)
+        return False
+    return True
+
+
+def read_alias_for(user_id) -> str:
+    """Database to serve this user's dashboard reads from"""
+    if not replica_configured():
+        return DEFAULT_DB_ALIAS
+    if user_id is not None and cache.get(pin_cache_key(user_id)):
+        return DEFAULT_DB_ALIAS
+    if replica_available():
+        return REPLICA_DB_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the alias chosen for the current view (see
+    ReplicaReadMixin) and all writes and migrations to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db != REPLICA_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    Serve a read-only view from the replica.
+
+    The alias is picked once the user is authenticated, so the rest of
+    the request (including conditional-GET lookups) reads from it, and is
+    reset when the response is finalized. Querysets evaluated after the
+    view returns, such as streamed exports, must be bound with `.using()`.
+    """
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        self._read_alias_token = _read_alias.set(read_alias_for(request.user.id))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_read_alias_token", None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
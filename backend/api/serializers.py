@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
+from .generator import MAX_LENGTH, generate_passwords
 from .models import PasswordCheck, UserStats
+from .policy import get_policy
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -32,6 +35,8 @@ class PasswordCheckSerializer(serializers.ModelSerializer):
             "is_breached",
             "breach_count",
             "checked_at",
+            "hit_count",
+            "last_checked_at",
         ]
         read_only_fields = [
             "id",
@@ -39,16 +44,67 @@ class PasswordCheckSerializer(serializers.ModelSerializer):
             "is_breached",
             "breach_count",
             "checked_at",
+            "hit_count",
+            "last_checked_at",
         ]
 
 
-class PasswordCheckRequestSerializer(serializers.Serializer):
+class QuickCheckRequestSerializer(serializers.Serializer):
+    """For incoming quick (unsaved) password check requests"""
+
+    password = serializers.CharField(
+        write_only=True,
+        min_length=1,
+        trim_whitespace=False,
+        error_messages={
+            "required": "Password is required",
+            "blank": "Password is required",
+        },
+    )
+    policy = serializers.CharField(required=False)
+
+    def validate_policy(self, value):
+        try:
+            get_policy(value)
+        except LookupError:
+            raise serializers.ValidationError("Unknown password policy.")
+        return value
+
+
+class PasswordCheckRequestSerializer(QuickCheckRequestSerializer):
     """For incoming password check requests"""
 
-    password = serializers.CharField(write_only=True, min_length=1)
     label = serializers.CharField(max_length=100, required=False, allow_blank=True)
 
 
+class PasswordGenerateRequestSerializer(serializers.Serializer):
+    """For bulk password generation requests"""
+
+    count = serializers.IntegerField(min_value=1, default=1)
+    length = serializers.IntegerField(min_value=1, max_value=MAX_LENGTH, default=16)
+    min_score = serializers.IntegerField(min_value=0, max_value=100, default=90)
+    uppercase = serializers.BooleanField(default=True)
+    lowercase = serializers.BooleanField(default=True)
+    numbers = serializers.BooleanField(default=True)
+    symbols = serializers.BooleanField(default=True)
+
+    def validate_count(self, value):
+        if value > settings.GENERATE_MAX_COUNT:
+            raise serializers.ValidationError(
+                f"Ensure this value is less than or equal to "
+                f"{settings.GENERATE_MAX_COUNT}."
+            )
+        return value
+
+    def validate(self, attrs):
+        # Rejects unreachable policies; nothing is generated yet
+        try:
+            generate_passwords(**attrs)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return attrs
+
+
 class UserStatsSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserStats
@@ -5,104 +5,12 @@ Password analysis services
 import hashlib
 import re
 
-import requests
+from .hibp import get_range
 
-
-def calculate_password_strength(password: str) -> dict:
-    """
-    Calculate password strength with detailed criteria
-    Returns score (0-100), strength label, feedback, and criteria breakdown
-    """
-    criteria = {
-        "length": len(password) >= 8,
-        "length_12": len(password) >= 12,
-        "length_16": len(password) >= 16,
-        "uppercase": bool(re.search(r"[A-Z]", password)),
-        "lowercase": bool(re.search(r"[a-z]", password)),
-        "numbers": bool(re.search(r"\d", password)),
-        "special": bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password)),
-        "no_common": not is_common_password(password),
-        "no_sequential": not has_sequential_chars(password),
-        "no_repeated": not has_repeated_chars(password),
-    }
-
-    # Calculate score
-    score = 0
-
-    # Length scoring (up to 30 points)
-    if criteria["length"]:
-        score += 10
-    if criteria["length_12"]:
-        score += 10
-    if criteria["length_16"]:
-        score += 10
-
-    # Character variety (up to 40 points)
-    if criteria["uppercase"]:
-        score += 10
-    if criteria["lowercase"]:
-        score += 10
-    if criteria["numbers"]:
-        score += 10
-    if criteria["special"]:
-        score += 10
-
-    # Security patterns (up to 30 points)
-    if criteria["no_common"]:
-        score += 10
-    if criteria["no_sequential"]:
-        score += 10
-    if criteria["no_repeated"]:
-        score += 10
-
-    # Determine strength label
-    if score >= 90:
-        strength = "very_strong"
-    elif score >= 70:
-        strength = "strong"
-    elif score >= 50:
-        strength = "good"
-    elif score >= 30:
-        strength = "fair"
-    else:
-        strength = "weak"
-
-    # Generate feedback
-    feedback = []
-    if not criteria["length"]:
-        feedback.append("Use at least 8 characters")
-    elif not criteria["length_12"]:
-        feedback.append("Consider using 12+ characters for better security")
-
-    if not criteria["uppercase"]:
-        feedback.append("Add uppercase letters")
-    if not criteria["lowercase"]:
-        feedback.append("Add lowercase letters")
-    if not criteria["numbers"]:
-        feedback.append("Add numbers")
-    if not criteria["special"]:
-        feedback.append("Add special characters (!@#$%)")
-    if not criteria["no_common"]:
-        feedback.append("Avoid common passwords")
-    if not criteria["no_sequential"]:
-        feedback.append("Avoid sequences (123, abc)")
-    if not criteria["no_repeated"]:
-        feedback.append("Avoid repeated characters (aaa, 111)")
-
-    if not feedback:
-        feedback.append("Excellent! Very strong password 💪")
-
-    return {
-        "score": score,
-        "strength": strength,
-        "feedback": feedback,
-        "criteria": criteria,
-    }
-
-
-def is_common_password(password: str) -> bool:
-    """Check if password is in common passwords list"""
-    common = [
+# Lookup tables and patterns are built once at import time (and shared by
+# all workers when gunicorn preloads the app)
+COMMON_PASSWORDS = frozenset(
+    [
         "password",
         "123456",
         "12345678",
@@ -126,112 +34,206 @@ def is_common_password(password: str) -> bool:
         "qwerty123",
         "1234567890",
     ]
-    return password.lower() in common
+)
+
+SEQUENCES = (
+    "012",
+    "123",
+    "234",
+    "345",
+    "456",
+    "567",
+    "678",
+    "789",
+    "890",
+    "abc",
+    "bcd",
+    "cde",
+    "def",
+    "efg",
+    "fgh",
+    "ghi",
+    "hij",
+    "ijk",
+    "jkl",
+    "klm",
+    "lmn",
+    "mno",
+    "nop",
+    "opq",
+    "pqr",
+    "qrs",
+    "rst",
+    "stu",
+    "tuv",
+    "uvw",
+    "vwx",
+    "wxy",
+    "xyz",
+    "qwe",
+    "wer",
+    "ert",
+    "rty",
+    "tyu",
+    "yui",
+    "uio",
+    "iop",
+    "asd",
+    "sdf",
+    "dfg",
+    "fgh",
+    "ghj",
+    "hjk",
+    "jkl",
+    "zxc",
+    "xcv",
+    "cvb",
+    "vbn",
+    "bnm",
+)
+
+REPEATED_RE = re.compile(r"(.)\1{2,}")
+
+# Strength buckets in ascending order, with the lowest score of each
+# (see strength_label)
+STRENGTH_BUCKETS = ("weak", "fair", "good", "strong", "very_strong")
+BUCKET_MIN_SCORES = {"weak": 0, "fair": 30, "good": 50, "strong": 70, "very_strong": 90}
+
+
+class PasswordAnalysis:
+    """
+    Values derived from one password, each computed on first use and kept:
+    the SHA-1 digest with its k-anonymity prefix and suffix, the lowercase
+    form, the distinct characters and the feature bits of the policy it was
+    last scored against. A request passes one instance to scoring, the
+    breach lookup and the saved check, so none is computed twice.
+    """
+
+    __slots__ = (
+        "password",
+        "_sha1",
+        "_prefix",
+        "_suffix",
+        "_lower",
+        "_chars",
+        "_plan",
+        "_bits",
+    )
+
+    def __init__(self, password: str):
+        self.password = password
+        self._sha1 = self._prefix = self._suffix = None
+        self._lower = self._chars = self._plan = self._bits = None
+
+    @classmethod
+    def of(cls, password) -> "PasswordAnalysis":
+        """`password` itself when already an analysis, else a new one"""
+        return password if isinstance(password, cls) else cls(password)
+
+    @property
+    def sha1(self) -> str:
+        """Uppercase hex SHA-1 digest, as used by HIBP"""
+        if self._sha1 is None:
+            digest = hashlib.sha1(self.password.encode("utf-8")).hexdigest().upper()
+            self._sha1, self._prefix, self._suffix = digest, digest[:5], digest[5:]
+        return self._sha1
+
+    @property
+    def hash_prefix(self) -> str:
+        """First 5 digest characters: all that is sent to HIBP or stored"""
+        if self._prefix is None:
+            self.sha1
+        return self._prefix
+
+    @property
+    def hash_suffix(self) -> str:
+        if self._suffix is None:
+            self.sha1
+        return self._suffix
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.password.lower()
+        return self._lower
+
+    @property
+    def chars(self) -> frozenset:
+        """Distinct characters"""
+        if self._chars is None:
+            self._chars = frozenset(self.password)
+        return self._chars
+
+    def features(self, plan) -> int:
+        """Rule bits for a compiled policy (see api.policy.PolicyPlan)"""
+        if self._plan is not plan:
+            self._bits = plan.features(self)
+            self._plan = plan
+        return self._bits
+
+
+def calculate_password_strength(
+    password: str | PasswordAnalysis, policy: str | None = None
+) -> dict:
+    """
+    Calculate password strength with detailed criteria
+    Returns score (0-100), strength label, feedback, and criteria breakdown.
+    `policy` names a configured policy (see api.policy); the default policy
+    scores 10 points per criterion.
+    """
+    from .policy import get_policy  # api.policy builds on this module's tables
+
+    return get_policy(policy).evaluate(password)
+
+
+def strength_label(score: int) -> str:
+    """Map a 0-100 score to its strength bucket"""
+    if score >= 90:
+        return "very_strong"
+    elif score >= 70:
+        return "strong"
+    elif score >= 50:
+        return "good"
+    elif score >= 30:
+        return "fair"
+    return "weak"
+
+
+def is_common_password(password: str) -> bool:
+    """Check if password is in common passwords list"""
+    return password.lower() in COMMON_PASSWORDS
 
 
 def has_sequential_chars(password: str) -> bool:
     """Check for sequential characters like 123 or abc"""
-    sequences = [
-        "012",
-        "123",
-        "234",
-        "345",
-        "456",
-        "567",
-        "678",
-        "789",
-        "890",
-        "abc",
-        "bcd",
-        "cde",
-        "def",
-        "efg",
-        "fgh",
-        "ghi",
-        "hij",
-        "ijk",
-        "jkl",
-        "klm",
-        "lmn",
-        "mno",
-        "nop",
-        "opq",
-        "pqr",
-        "qrs",
-        "rst",
-        "stu",
-        "tuv",
-        "uvw",
-        "vwx",
-        "wxy",
-        "xyz",
-        "qwe",
-        "wer",
-        "ert",
-        "rty",
-        "tyu",
-        "yui",
-        "uio",
-        "iop",
-        "asd",
-        "sdf",
-        "dfg",
-        "fgh",
-        "ghj",
-        "hjk",
-        "jkl",
-        "zxc",
-        "xcv",
-        "cvb",
-        "vbn",
-        "bnm",
-    ]
     lower = password.lower()
-    return any(seq in lower for seq in sequences)
+    return any(seq in lower for seq in SEQUENCES)
 
 
 def has_repeated_chars(password: str) -> bool:
     """Check for 3+ repeated characters"""
-    return bool(re.search(r"(.)\1{2,}", password))
+    return bool(REPEATED_RE.search(password))
 
 
-def check_hibp_breach(password: str) -> tuple[bool, int]:
+def check_hibp_breach(password: str | PasswordAnalysis) -> tuple[bool, int]:
     """
     Check if password appears in Have I Been Pwned database
     Uses k-anonymity: only sends first 5 chars of SHA1 hash
 
     Returns: (is_breached, breach_count)
     """
-    # SHA1 hash the password
-    sha1_hash = hashlib.sha1(password.encode("utf-8")).hexdigest().upper()
-    prefix = sha1_hash[:5]
-    suffix = sha1_hash[5:]
-
-    try:
-        # Query HIBP API with prefix only (k-anonymity)
-        response = requests.get(
-            f"https://api.pwnedpasswords.com/range/{prefix}",
-            headers={"User-Agent": "SecurePass-Dashboard"},
-            timeout=5,
-        )
-
-        if response.status_code != 200:
-            return False, 0
-
-        # Search for our suffix in the response
-        hashes = response.text.splitlines()
-        for line in hashes:
-            hash_suffix, count = line.split(":")
-            if hash_suffix == suffix:
-                return True, int(count)
+    analysis = PasswordAnalysis.of(password)
 
+    # Query HIBP API with prefix only (k-anonymity), parsed and cached.
+    # If the API fails, return unknown (not breached)
+    table = get_range(analysis.hash_prefix)
+    if table is None:
         return False, 0
 
-    except requests.RequestException:
-        # If API fails, return unknown (not breached)
-        return False, 0
+    count = table.lookup(analysis.hash_suffix)
+    return count > 0, count
 
 
-def get_hash_prefix(password: str) -> str:
+def get_hash_prefix(password: str | PasswordAnalysis) -> str:
     """Get the first 5 characters of SHA1 hash (for k-anonymity storage)"""
-    return hashlib.sha1(password.encode("utf-8")).hexdigest().upper()[:5]
+    return PasswordAnalysis.of(password).hash_prefix
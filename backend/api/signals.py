@@ -0,0 +1,34 @@
+"""
+Model signal receivers
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import active_cache_key
+from .events import publish_check
+from .models import PasswordCheck
+from .routers import pin_to_primary
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_active_status(sender, instance, **kwargs):
+    """Drop the cached active flag so deactivation takes effect immediately"""
+    cache.delete(active_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=PasswordCheck)
+@receiver(post_delete, sender=PasswordCheck)
+def pin_owner_to_primary(sender, instance, **kwargs):
+    """Let the owner read this write back before the replica has it"""
+    pin_to_primary(instance.user_id)
+
+
+@receiver(post_save, sender=PasswordCheck)
+def announce_check(sender, instance, created, **kwargs):
+    """Push new checks to the owner's open event streams"""
+    if created:
+        publish_check(instance)
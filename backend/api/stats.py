@@ -0,0 +1,216 @@
+"""
+Exact per-user check totals
+
+Totals combine live PasswordCheck rows with ArchivedStats, the summary of
+rows removed by the retention policy (see api.retention). UserStats caches
+each user's totals; `rebuild_user_stats` recomputes them for many users at
+once and repairs rows that drifted.
+"""
+
+import math
+import time
+from itertools import islice
+
+from django.db import models
+
+from .models import ArchivedStats, PasswordCheck, UserStats
+from .services import BUCKET_MIN_SCORES, STRENGTH_BUCKETS
+
+TOTAL_FIELDS = ("checks", "breached", "strength_total", *STRENGTH_BUCKETS)
+
+
+def bucket_filters() -> dict:
+    """Q filter per strength bucket, for conditional aggregation"""
+    filters = {}
+    bounds = [BUCKET_MIN_SCORES[bucket] for bucket in STRENGTH_BUCKETS] + [None]
+    for bucket, low, high in zip(STRENGTH_BUCKETS, bounds, bounds[1:]):
+        q = models.Q(strength_score__gte=low)
+        if high is not None:
+            q &= models.Q(strength_score__lt=high)
+        filters[bucket] = q
+    return filters
+
+
+def total_aggregates() -> dict:
+    """
+    Aggregate expressions for every TOTAL_FIELDS entry. A row counts as
+    `hit_count` checks (see api.dedup).
+    """
+    hits = models.F("hit_count")
+    return {
+        "checks": models.Sum(hits, default=0),
+        "breached": models.Sum(hits, filter=models.Q(is_breached=True), default=0),
+        "strength_total": models.Sum(models.F("strength_score") * hits, default=0),
+        **{
+            bucket: models.Sum(hits, filter=q, default=0)
+            for bucket, q in bucket_filters().items()
+        },
+    }
+
+
+def user_totals(user_id) -> dict:
+    """All-time totals for one user: live rows plus archived totals"""
+    totals = PasswordCheck.objects.filter(user_id=user_id).aggregate(
+        **total_aggregates()
+    )
+    archived = (
+        ArchivedStats.objects.filter(user_id=user_id).values(*TOTAL_FIELDS).first()
+    )
+    if archived:
+        for field in TOTAL_FIELDS:
+            totals[field] += archived[field]
+    return totals
+
+
+def stats_fields(totals) -> dict:
+    """UserStats field values for a user's totals"""
+    checks = totals["checks"]
+    return {
+        "total_checks": checks,
+        "breached_count": totals["breached"],
+        "avg_strength": totals["strength_total"] / checks if checks else 0,
+    }
+
+
+def _drifted(stored, expected) -> bool:
+    return (
+        stored["total_checks"] != expected["total_checks"]
+        or stored["breached_count"] != expected["breached_count"]
+        or not math.isclose(stored["avg_strength"], expected["avg_strength"])
+    )
+
+
+def rebuild_user_stats(user_ids=None, batch_size=1000, dry_run=False) -> dict:
+    """
+    Recompute UserStats for every user (or only `user_ids`) and upsert the
+    rows that are missing or differ, in batches of `batch_size`.
+
+    Live checks are aggregated with one GROUP BY user query, streamed, and
+    merged with archived totals; a stored row with no checks left is reset
+    to zero. `last_check` of a rewritten row becomes the user's latest
+    live check, or the newest archived one. With `dry_run` nothing is
+    written. Returns the users compared, the drift found (`drifted`
+    includes `missing`; `checks_drift` is the sum of absolute
+    `total_checks` differences, `drifted_users` lists (user id, stored,
+    expected) check counts), rows written, the live check rows aggregated
+    and the throughput.
+    """
+    started = time.perf_counter()
+    checks = PasswordCheck.objects.all()
+    archived = ArchivedStats.objects.all()
+    current = UserStats.objects.all()
+    if user_ids is not None:
+        checks = checks.filter(user_id__in=user_ids)
+        archived = archived.filter(user_id__in=user_ids)
+        current = current.filter(user_id__in=user_ids)
+
+    archived_totals = {
+        row.pop("user_id"): row
+        for row in archived.values("user_id", "archived_through", *TOTAL_FIELDS)
+    }
+    stored_stats = {
+        row.pop("user_id"): row
+        for row in current.values(
+            "user_id", "total_checks", "breached_count", "avg_strength"
+        )
+    }
+    live = (
+        checks.values("user_id")
+        .annotate(
+            rows=models.Count("id"),
+            last_check=models.Max("last_checked_at"),
+            **total_aggregates(),
+        )
+        .order_by()
+        .iterator(chunk_size=batch_size)
+    )
+
+    result = {
+        "users": 0,
+        "drifted": 0,
+        "missing": 0,
+        "checks_drift": 0,
+        "drifted_users": [],
+        "written": 0,
+        "rows": 0,
+    }
+
+    def expected_totals():
+        unseen = set(stored_stats)
+        for row in live:
+            user_id = row.pop("user_id")
+            unseen.discard(user_id)
+            result["rows"] += row["rows"]
+            extra = archived_totals.pop(user_id, None)
+            if extra:
+                for field in TOTAL_FIELDS:
+                    row[field] += extra[field]
+            yield user_id, row, row["last_check"]
+        # Users whose checks were all pruned, or all deleted
+        for user_id, row in archived_totals.items():
+            unseen.discard(user_id)
+            yield user_id, row, row["archived_through"]
+        zero = dict.fromkeys(TOTAL_FIELDS, 0)
+        for user_id in unseen:
+            yield user_id, zero, None
+
+    pending = expected_totals()
+    while batch := list(islice(pending, batch_size)):
+        rewrite = []
+        for user_id, totals, last_check in batch:
+            expected = stats_fields(totals)
+            stored = stored_stats.get(user_id)
+            if stored is None:
+                result["missing"] += 1
+            elif not _drifted(stored, expected):
+                continue
+            result["drifted"] += 1
+            stored_checks = stored["total_checks"] if stored else None
+            result["checks_drift"] += abs(
+                (stored_checks or 0) - expected["total_checks"]
+            )
+            result["drifted_users"].append(
+                (user_id, stored_checks, expected["total_checks"])
+            )
+            rewrite.append(
+                UserStats(user_id=user_id, last_check=last_check, **expected)
+            )
+        result["users"] += len(batch)
+        if rewrite and not dry_run:
+            UserStats.objects.bulk_create(
+                rewrite,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=[
+                    "total_checks",
+                    "breached_count",
+                    "avg_strength",
+                    "last_check",
+                ],
+            )
+            result["written"] += len(rewrite)
+
+    result["seconds"] = time.perf_counter() - started
+    result["rows_per_second"] = result["rows"] / result["seconds"]
+    return result
+
+
+def security_score(checks, breached, strong, avg_strength) -> float:
+    """
+    Overall 0-100 security score: penalizes breached passwords and rewards
+    strong (`strong` + `very_strong`) ones and a high average strength.
+    """
+    if checks == 0:
+        return 0
+
+    # Penalize breached passwords heavily
+    breach_penalty = (breached / checks) * 40
+
+    # Reward strong passwords
+    strong_bonus = (strong / checks) * 30
+
+    # Base on average strength
+    avg_bonus = (avg_strength / 100) * 30
+
+    score = max(0, min(100, 100 - breach_penalty + strong_bonus + avg_bonus - 30))
+    return round(score, 1)
@@ -0,0 +1,177 @@
+"""
+Synthetic users and check histories for load and scaling tests
+
+Distributions are skewed the way real usage is: a few users own most of
+the history (Zipf over users), a few labels get most rechecks, recent days
+are busier than old ones, weak passwords are the ones found breached, and
+a share of checks are of common passwords, so their hash prefixes repeat.
+Rows are written with bulk_create, so signals do not fire; `seed_history`
+rebuilds the derived tables (stats, rollups, latest checks, prefix counts).
+"""
+
+import random
+from datetime import timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.utils import timezone
+
+from .latest import backfill_latest
+from .models import PasswordCheck
+from .prefixes import backfill_prefixes
+from .rollups import backfill_rollups
+from .stats import rebuild_user_stats
+
+LABELS = [
+    "Gmail",
+    "Bank",
+    "GitHub",
+    "Work VPN",
+    "Netflix",
+    "Amazon",
+    "Facebook",
+    "Wi-Fi",
+    "Dropbox",
+    "Slack",
+]
+
+
+def zipf_counts(total, size, skew, rng) -> list:
+    """Split `total` into `size` Zipf-distributed counts, in random order"""
+    weights = [1 / rank**skew for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(counts)):
+        counts[index % size] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def create_users(count, prefix="synthetic", password=None) -> list:
+    """
+    Create `count` users named `<prefix>-000000` onwards; existing ones are
+    reused, so seeding again grows their histories. All share one password
+    hash (unusable when `password` is None), since hashing is slow.
+    """
+    encoded = make_password(password)
+    names = [f"{prefix}-{index:06d}" for index in range(count)]
+    User.objects.bulk_create(
+        [User(username=name, password=encoded) for name in names],
+        ignore_conflicts=True,
+    )
+    return list(User.objects.filter(username__in=names).order_by("username"))
+
+
+# Share of checks of a commonly used password, drawn from this many
+# distinct (Zipf-distributed) hash prefixes; the rest are uniform
+COMMON_SHARE = 0.2
+COMMON_PREFIXES = 1000
+
+
+@lru_cache
+def zipf_cum_weights(size) -> tuple:
+    """Cumulative Zipf weights for `size` items, most popular first"""
+    return tuple(accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+def random_prefix(rng) -> str:
+    if rng.random() < COMMON_SHARE:
+        weights = zipf_cum_weights(COMMON_PREFIXES)
+        rank = rng.choices(range(COMMON_PREFIXES), cum_weights=weights)[0]
+        # Scatter ranks over the prefix space
+        return f"{rank * 2654435761 % 0x100000:05X}"
+    return f"{rng.getrandbits(20):05X}"
+
+
+def random_check(user_id, labels, now, days, rng) -> PasswordCheck:
+    score = 10 * round(10 * rng.betavariate(2.5, 1.8))
+    breach_rate = 0.6 if score < 30 else 0.25 if score < 50 else 0.05
+    is_breached = rng.random() < breach_rate
+    # Squaring biases ages towards the present
+    checked_at = now - timedelta(days=days * rng.random() ** 2)
+    return PasswordCheck(
+        user_id=user_id,
+        hash_prefix=random_prefix(rng),
+        label=rng.choices(labels, cum_weights=zipf_cum_weights(len(labels)))[0],
+        strength_score=score,
+        is_breached=is_breached,
+        breach_count=int(10 * rng.paretovariate(1.2)) if is_breached else 0,
+        # Copied into checked_at after the insert (see insert_checks)
+        last_checked_at=checked_at,
+    )
+
+
+def user_labels(rng) -> list:
+    """A user's label pool: some common services, a blank and own accounts"""
+    labels = rng.sample(LABELS, rng.randint(2, len(LABELS))) + [""]
+    return labels + [f"Account {index}" for index in range(rng.randint(0, 20))]
+
+
+def insert_checks(batch) -> int:
+    """
+    Bulk-create a batch of checks, then backdate them. `checked_at` is
+    auto_now_add, so the insert stamps the current time; the intended time
+    is kept in `last_checked_at` (a synthetic row stands for one check).
+    """
+    created = PasswordCheck.objects.bulk_create(batch)
+    PasswordCheck.objects.filter(pk__in=[check.pk for check in created]).update(
+        checked_at=F("last_checked_at")
+    )
+    return len(created)
+
+
+def create_checks(counts, days=365, seed=None, batch_size=5000) -> int:
+    """
+    Bulk-create checks: `counts` maps user id to the number of checks.
+    Returns the number of rows written.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    written = 0
+    batch = []
+    for user_id, count in counts.items():
+        labels = user_labels(rng)
+        for _ in range(count):
+            batch.append(random_check(user_id, labels, now, days, rng))
+            if len(batch) >= batch_size:
+                written += insert_checks(batch)
+                batch = []
+    if batch:
+        written += insert_checks(batch)
+    return written
+
+
+def seed_history(
+    users=10,
+    checks=1000,
+    skew=1.1,
+    days=365,
+    prefix="synthetic",
+    password=None,
+    seed=None,
+    batch_size=5000,
+) -> dict:
+    """
+    Create `users` users sharing `checks` checks (Zipf with exponent `skew`)
+    and rebuild their derived tables. Returns the row counts written.
+    """
+    rng = random.Random(seed)
+    seeded = create_users(users, prefix, password)
+    counts = dict(
+        zip([user.id for user in seeded], zipf_counts(checks, users, skew, rng))
+    )
+    written = create_checks(counts, days, rng.random(), batch_size)
+
+    history = PasswordCheck.objects.filter(user_id__in=counts)
+    return {
+        "users": len(seeded),
+        "checks": written,
+        "stats": rebuild_user_stats(list(counts), batch_size)["written"],
+        "rollups": backfill_rollups(history, batch_size=batch_size),
+        "latest": backfill_latest(history, batch_size=batch_size),
+        # Prefix counts span all users, so they are rebuilt in full
+        "prefixes": backfill_prefixes(batch_size=batch_size),
+    }
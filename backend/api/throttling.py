@@ -0,0 +1,90 @@
+"""
+Rate limiting
+
+A token bucket per client and endpoint, stored in the Django cache as a
+single integer and advanced with atomic increments, so it works the same
+on the per-process LocMemCache and on a shared cache such as Redis.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket limiter keyed by user id, or by client IP for anonymous
+    requests, with the rate taken from the view's `throttle_scope`.
+
+    A rate of `N/period` refills one token every `period / N` seconds and
+    allows bursts of up to N requests. The bucket is tracked as its
+    theoretical arrival time (GCRA) in milliseconds: admitting a request
+    adds one interval, and the request is refused once that time runs more
+    than a full bucket ahead of the clock. Refused requests are refunded,
+    so hammering a closed bucket does not extend the wait.
+
+    Runs during `APIView.initial`, before the request body is parsed or
+    any hashing or upstream work happens.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request
+        pass
+
+    def get_rate(self):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"No default throttle rate set for '{self.scope}' scope"
+            )
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scope", None)
+        self.retry_after = None
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        now = int(self.timer() * 1000)
+        interval = max(1, self.duration * 1000 // self.num_requests)
+        capacity = interval * self.num_requests
+        # An idle bucket is full, so the key can expire once it would be
+        timeout = self.duration + 1
+
+        if self.cache.add(key, now + interval, timeout):
+            return True
+        try:
+            arrival = self.cache.incr(key, interval)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(key, now + interval, timeout)
+            return True
+        if arrival - interval < now:
+            # Bucket refilled while idle: restart from the current time.
+            # Racing requests may each do this; at worst one extra is let in.
+            arrival = now + interval
+            self.cache.set(key, arrival, timeout)
+        elif arrival - now > capacity:
+            self.cache.decr(key, interval)
+            self.retry_after = (arrival - now - capacity) / 1000
+            return False
+        else:
+            self.cache.touch(key, timeout)
+        return True
+
+    def wait(self):
+        return self.retry_after
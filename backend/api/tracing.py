@@ -0,0 +1,229 @@
+"""
+Lightweight request tracing
+
+A sampled request (TRACING_SAMPLE_RATE) gets a root span from
+TracingMiddleware; code inside it opens child spans with `span()`, which
+time a phase and carry attributes. Outside a sampled request `span()`
+returns a shared no-op span, so instrumented code costs a context
+variable lookup and an empty `with` block. Finished spans are exported
+one at a time, as JSON lines to TRACING_FILE or to an in-memory ring
+buffer of TRACING_BUFFER_SIZE spans.
+
+Spans live in a context variable, so threads started through `propagate`
+continue the trace; other processes can continue it from `inject()` via
+`extract()`.
+"""
+
+import contextvars
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+
+_current = contextvars.ContextVar("api_tracing_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent",
+        "parent_id",
+        "name",
+        "start",
+        "duration",
+        "attributes",
+    )
+
+    def __init__(self, name, trace_id, parent_id=None, parent=None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent = parent
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, name, amount):
+        """Add to a numeric attribute of this span and its local ancestors"""
+        span = self
+        while span is not None:
+            span.attributes[name] = span.attributes.get(name, 0) + amount
+            span = span.parent
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span, and its context manager, when not tracing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name, amount):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class RingBufferExporter:
+    """Keeps the most recent spans in memory (per process)"""
+
+    def __init__(self, size):
+        self.spans = deque(maxlen=size)
+
+    def export(self, span: dict):
+        self.spans.append(span)
+
+
+class JSONLinesExporter:
+    """Appends each span as one JSON line to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: dict):
+        line = json.dumps(span, separators=(",", ":"), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(line)
+
+
+_exporter = None
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        if settings.TRACING_FILE:
+            _exporter = JSONLinesExporter(settings.TRACING_FILE)
+        else:
+            _exporter = RingBufferExporter(settings.TRACING_BUFFER_SIZE)
+    return _exporter
+
+
+@receiver(setting_changed)
+def _reset_exporter(setting, **kwargs):
+    global _exporter
+    if setting in ("TRACING_FILE", "TRACING_BUFFER_SIZE"):
+        _exporter = None
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def _activate(span):
+    token = _current.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as exc:
+        span.set(error=type(exc).__name__)
+        raise
+    finally:
+        span.duration = time.perf_counter() - started
+        _current.reset(token)
+        get_exporter().export(span.to_dict())
+
+
+def span(name, **attributes):
+    """
+    Time a phase as a child of the current span. Use as a context manager;
+    yields the span (or NOOP_SPAN when the request is not traced).
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return _activate(Span(name, parent.trace_id, parent.span_id, parent, **attributes))
+
+
+def sampled() -> bool:
+    rate = settings.TRACING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start_trace(name, **attributes):
+    """Context manager for a new root span (sampling is up to the caller)"""
+    return _activate(Span(name, f"{random.getrandbits(128):032x}", **attributes))
+
+
+def inject():
+    """The current trace position as a picklable dict, or None"""
+    current = _current.get()
+    if current is None:
+        return None
+    return {"trace_id": current.trace_id, "span_id": current.span_id}
+
+
+def extract(carrier, name, **attributes):
+    """
+    Continue a trace from `inject()` output in another process or task;
+    returns a no-op context when `carrier` is None (trace not sampled).
+    """
+    if not carrier:
+        return NOOP_SPAN
+    return _activate(Span(name, carrier["trace_id"], carrier["span_id"], **attributes))
+
+
+def propagate(fn):
+    """
+    Wrap `fn` to run in a copy of the caller's context (for threads). Each
+    call gets its own copy, so the wrapper can be mapped over a thread pool.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _count_queries(execute, sql, params, many, context):
+    current = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if current is not None:
+            current.add("db.queries", 1)
+            current.add("db.ms", round((time.perf_counter() - started) * 1000, 3))
+
+
+@contextmanager
+def count_queries():
+    """Add query counts and database time to the active spans"""
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(_count_queries))
+        yield
@@ -1,12 +1,28 @@
 from django.http import JsonResponse
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import (
+    TokenBlacklistView,
+    TokenObtainPairView,
+    TokenRefreshView,
+)
 
 from .views import (
+    BreachRangeView,
+    CurrentHealthView,
+    EventStreamView,
+    EventTicketView,
+    ImportJobView,
     PasswordCheckView,
+    PasswordGenerateView,
+    PasswordHistoryExportView,
     PasswordHistoryView,
+    ProfileDownloadView,
+    ProfileListView,
     QuickCheckView,
     RegisterView,
+    TimeSeriesView,
+    TraceListView,
+    UserImportView,
     UserStatsView,
 )
 
@@ -20,12 +36,40 @@ urlpatterns = [
     path("auth/register/", RegisterView.as_view(), name="register"),
     path("auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("auth/logout/", TokenBlacklistView.as_view(), name="token_blacklist"),
     # Password checking
     path("passwords/check/", PasswordCheckView.as_view(), name="password_check"),
     path("passwords/quick-check/", QuickCheckView.as_view(), name="quick_check"),
+    path(
+        "passwords/generate/", PasswordGenerateView.as_view(), name="password_generate"
+    ),
     path("passwords/history/", PasswordHistoryView.as_view(), name="password_history"),
+    path(
+        "passwords/history/export/",
+        PasswordHistoryExportView.as_view(),
+        name="password_history_export",
+    ),
+    path("breach/range/<str:prefix>/", BreachRangeView.as_view(), name="breach_range"),
     # Dashboard
     path("stats/", UserStatsView.as_view(), name="user_stats"),
+    path("stats/current/", CurrentHealthView.as_view(), name="stats_current"),
+    path("stats/timeseries/", TimeSeriesView.as_view(), name="stats_timeseries"),
+    path("events/", EventStreamView.as_view(), name="events"),
+    path("events/ticket/", EventTicketView.as_view(), name="events_ticket"),
+    # Admin
+    path("admin/profiles/", ProfileListView.as_view(), name="profiles"),
+    path(
+        "admin/profiles/<str:name>/",
+        ProfileDownloadView.as_view(),
+        name="profile_download",
+    ),
+    path("admin/traces/", TraceListView.as_view(), name="traces"),
+    path("admin/users/import/", UserImportView.as_view(), name="user_import"),
+    path(
+        "admin/users/import/<str:job_id>/",
+        ImportJobView.as_view(),
+        name="user_import_job",
+    ),
     # Health check
     path("health/", health, name="health"),
 ]
@@ -1,18 +1,149 @@
+import hashlib
+import io
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from rest_framework import generics, status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import PasswordCheck, UserStats
+from . import onboarding, profiling, tracing
+from .authentication import (
+    StatelessJWTAuthentication,
+    StreamTicketAuthentication,
+    issue_stream_ticket,
+)
+from .dedup import save_check
+from .events import event_stream, latest_check_id
+from .events import slots as event_slots
+from .generator import CHARACTER_CLASSES, generate_passwords, policy_score
+from .hibp import get_range
+from .latest import record_latest
+from .models import DailyRollup, ImportJob, LatestCheck, PasswordCheck, UserStats
+from .prefixes import record_prefix
+from .renderers import (
+    CSVRenderer,
+    EventStreamRenderer,
+    FastJSONRenderer,
+    NDJSONRenderer,
+    isoformat,
+)
+from .rollups import record_check
+from .routers import ReplicaReadMixin
 from .serializers import (
     PasswordCheckRequestSerializer,
     PasswordCheckSerializer,
+    PasswordGenerateRequestSerializer,
+    QuickCheckRequestSerializer,
     UserSerializer,
 )
-from .services import calculate_password_strength, check_hibp_breach, get_hash_prefix
+from .services import (
+    STRENGTH_BUCKETS,
+    PasswordAnalysis,
+    calculate_password_strength,
+    check_hibp_breach,
+    strength_label,
+)
+from .stats import security_score, stats_fields, user_totals
+from .throttling import TokenBucketThrottle
+
+# PasswordCheckSerializer fields rendered as ISO 8601 strings
+DATETIME_FIELDS = ("checked_at", "last_checked_at")
+
+
+def serialize_checks(checks):
+    """
+    Read-only fast path for `PasswordCheckSerializer(checks, many=True).data`:
+    reads value tuples instead of building model and serializer instances,
+    producing identical output.
+    """
+    fields = PasswordCheckSerializer.Meta.fields
+    rows = []
+    for values in checks.values_list(*fields):
+        row = dict(zip(fields, values))
+        for field in DATETIME_FIELDS:
+            row[field] = isoformat(row[field])
+        rows.append(row)
+    return rows
+
+
+class NotModified(Exception):
+    """Carries the 304/412 response for a satisfied conditional request"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET support for per-user read views.
+
+    Validators come from the user's latest `last_checked_at` (which also
+    moves when a repeat is coalesced into an existing row): a weak ETag with
+    microsecond precision and a Last-Modified date. A matching
+    If-None-Match/If-Modified-Since is answered with 304 after one indexed
+    lookup, before the view does any work. Views whose response also
+    depends on something else extend `validators`.
+    """
+
+    def latest_change(self, request):
+        return (
+            PasswordCheck.objects.filter(user_id=request.user.id)
+            .order_by("-last_checked_at")
+            .values_list("last_checked_at", flat=True)
+            .first()
+        )
+
+    def validators(self, request, latest):
+        """(ETag, Last-Modified timestamp) for the latest change, or Nones"""
+        if latest is None:
+            return None, None
+        return f'W/"{latest.timestamp():.6f}"', int(latest.timestamp())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        self.etag, self.last_modified = self.validators(
+            request, self.latest_change(request)
+        )
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "etag", None):
+            response.headers.setdefault("ETag", self.etag)
+            response.headers.setdefault("Last-Modified", http_date(self.last_modified))
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization",))
+        return response
 
 
 class RegisterView(generics.CreateAPIView):
@@ -30,41 +161,57 @@ class PasswordCheckView(APIView):
     """
 
     permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "password_check"
 
     def post(self, request):
         serializer = PasswordCheckRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        password = serializer.validated_data["password"]
+        # Hashed and normalized once, for scoring, breach lookup and storage
+        analysis = PasswordAnalysis(serializer.validated_data["password"])
         label = serializer.validated_data.get("label", "")
+        policy = serializer.validated_data.get("policy")
 
         # Calculate strength
-        strength_result = calculate_password_strength(password)
+        with tracing.span("password.strength", policy=policy or "default") as span:
+            strength_result = calculate_password_strength(analysis, policy)
+            span.set(score=strength_result["score"])
 
         # Check breach status
-        is_breached, breach_count = check_hibp_breach(password)
+        with tracing.span("hibp.check") as span:
+            is_breached, breach_count = check_hibp_breach(analysis)
+            span.set(breached=is_breached)
 
         # Save to history (only hash prefix for privacy)
-        password_check = PasswordCheck.objects.create(
-            user=request.user,
-            hash_prefix=get_hash_prefix(password),
-            label=label,
-            strength_score=strength_result["score"],
-            is_breached=is_breached,
-            breach_count=breach_count,
-        )
-
-        # Update user stats
-        self._update_user_stats(request.user)
+        with tracing.span("db.insert") as span:
+            password_check, created = save_check(
+                request.user,
+                hash_prefix=analysis.hash_prefix,
+                label=label,
+                strength_score=strength_result["score"],
+                is_breached=is_breached,
+                breach_count=breach_count,
+            )
+            span.set(coalesced=not created)
+
+        # Update user stats, today's rollup, the label's latest state and
+        # the prefix's popularity
+        with tracing.span("stats.update") as span:
+            stats = self._update_user_stats(request.user)
+            span.set(rows=stats.total_checks)
+        with tracing.span("rollup.record"):
+            record_check(password_check)
+        with tracing.span("latest.record"):
+            record_latest(password_check)
+        with tracing.span("prefix.record"):
+            record_prefix(password_check)
 
         # Build response
         response_data = {
             "id": password_check.id,
-            "score": strength_result["score"],
-            "strength": strength_result["strength"],
-            "feedback": strength_result["feedback"],
-            "criteria": strength_result["criteria"],
+            **strength_result,
             "is_breached": is_breached,
             "breach_count": breach_count,
             "label": label,
@@ -76,14 +223,11 @@ class PasswordCheckView(APIView):
         """Update aggregated user statistics"""
         stats, created = UserStats.objects.get_or_create(user=user)
 
-        checks = PasswordCheck.objects.filter(user=user)
-        stats.total_checks = checks.count()
-        stats.breached_count = checks.filter(is_breached=True).count()
-        stats.avg_strength = (
-            checks.aggregate(avg=models.Avg("strength_score"))["avg"] or 0
-        )
+        for field, value in stats_fields(user_totals(user.id)).items():
+            setattr(stats, field, value)
         stats.last_check = timezone.now()
         stats.save()
+        return stats
 
 
 class QuickCheckView(APIView):
@@ -93,25 +237,27 @@ class QuickCheckView(APIView):
     """
 
     permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "quick_check"
 
     def post(self, request):
-        password = request.data.get("password", "")
-        if not password:
-            return Response(
-                {"error": "Password is required"}, status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = QuickCheckRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            # First message only, keeping the {"error": ...} body clients read
+            error = next(iter(serializer.errors.values()))[0]
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        analysis = PasswordAnalysis(serializer.validated_data["password"])
 
         # Calculate strength
-        strength_result = calculate_password_strength(password)
+        strength_result = calculate_password_strength(
+            analysis, serializer.validated_data.get("policy")
+        )
 
         # Check breach status
-        is_breached, breach_count = check_hibp_breach(password)
+        is_breached, breach_count = check_hibp_breach(analysis)
 
         response_data = {
-            "score": strength_result["score"],
-            "strength": strength_result["strength"],
-            "feedback": strength_result["feedback"],
-            "criteria": strength_result["criteria"],
+            **strength_result,
             "is_breached": is_breached,
             "breach_count": breach_count,
         }
@@ -119,44 +265,143 @@ class QuickCheckView(APIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class PasswordHistoryView(generics.ListAPIView):
+class PasswordGenerateView(APIView):
+    """
+    Generate random passwords that meet a minimum strength score
+    POST: {"count", "length", "min_score", "uppercase", "lowercase",
+    "numbers", "symbols"}. JSON by default, `?format=ndjson` for one
+    password per line. Large batches are streamed as they are generated.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, NDJSONRenderer]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "generate"
+
+    def post(self, request):
+        serializer = PasswordGenerateRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        policy = serializer.validated_data
+        passwords = generate_passwords(**policy)
+        renderer = request.accepted_renderer
+
+        if isinstance(renderer, NDJSONRenderer):
+            rows = ((password,) for password in passwords)
+            return StreamingHttpResponse(
+                renderer.stream(("password",), rows),
+                content_type=f"{renderer.media_type}; charset=utf-8",
+            )
+
+        score = policy_score(
+            policy["length"], [name for name in CHARACTER_CLASSES if policy[name]]
+        )
+        data = {
+            "count": policy["count"],
+            "length": policy["length"],
+            "score": score,
+            "strength": strength_label(score),
+        }
+        if policy["count"] <= settings.GENERATE_STREAM_THRESHOLD:
+            return Response({**data, "passwords": list(passwords)})
+        return StreamingHttpResponse(
+            self._stream_json(data, passwords), content_type=renderer.media_type
+        )
+
+    def _stream_json(self, data, passwords, batch_size=500):
+        """Yield the JSON response document with the list filled in batches"""
+        head = json.dumps(data, separators=(",", ":"))[:-1]
+        yield head + ',"passwords":['
+        separator = ""
+        batch = []
+        for password in passwords:
+            batch.append(json.dumps(password))
+            if len(batch) >= batch_size:
+                yield separator + ",".join(batch)
+                separator = ","
+                batch = []
+        if batch:
+            yield separator + ",".join(batch)
+        yield "]}"
+
+
+class PasswordHistoryView(ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Get user's password check history"""
 
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     serializer_class = PasswordCheckSerializer
 
     def get_queryset(self):
-        return PasswordCheck.objects.filter(user=self.request.user)[:50]
+        return PasswordCheck.objects.filter(user_id=self.request.user.id)[:50]
 
+    def list(self, request, *args, **kwargs):
+        return Response(serialize_checks(self.get_queryset()))
 
-class UserStatsView(APIView):
+
+class PasswordHistoryExportView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Stream the user's full check history
+    GET ?format=ndjson (default) or ?format=csv. Rows are read with a
+    server-side cursor and written as they arrive, so memory use does not
+    grow with history size.
+    """
+
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    fields = PasswordCheckSerializer.Meta.fields
+
+    def get(self, request):
+        renderer = request.accepted_renderer
+        checks = PasswordCheck.objects.filter(user_id=request.user.id)
+        rows = (
+            # Bind the routed alias now: rows are read after the view returns
+            checks.using(checks.db)
+            .order_by("-checked_at")
+            .values_list(*self.fields)
+            .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        )
+        response = StreamingHttpResponse(
+            renderer.stream(self.fields, self._format_rows(rows)),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="password-history.{renderer.format}"'
+        )
+        return response
+
+    def _format_rows(self, rows):
+        positions = [self.fields.index(field) for field in DATETIME_FIELDS]
+        for row in rows:
+            row = list(row)
+            for position in positions:
+                row[position] = isoformat(row[position])
+            yield row
+
+
+class UserStatsView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     """Get user's security statistics for dashboard"""
 
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request):
-        stats, created = UserStats.objects.get_or_create(user=request.user)
+        stats, created = UserStats.objects.get_or_create(user_id=request.user.id)
 
         # Get additional stats
-        checks = PasswordCheck.objects.filter(user=request.user)
-
-        # Strength distribution
-        strength_dist = {
-            "weak": checks.filter(strength_score__lt=30).count(),
-            "fair": checks.filter(
-                strength_score__gte=30, strength_score__lt=50
-            ).count(),
-            "good": checks.filter(
-                strength_score__gte=50, strength_score__lt=70
-            ).count(),
-            "strong": checks.filter(
-                strength_score__gte=70, strength_score__lt=90
-            ).count(),
-            "very_strong": checks.filter(strength_score__gte=90).count(),
-        }
+        checks = PasswordCheck.objects.filter(user_id=request.user.id)
+
+        # Strength distribution (all-time, including archived checks)
+        totals = user_totals(request.user.id)
+        strength_dist = {bucket: totals[bucket] for bucket in STRENGTH_BUCKETS}
 
         # Recent checks
-        recent = PasswordCheckSerializer(checks[:5], many=True).data
+        recent = serialize_checks(checks[:5])
 
         return Response(
             {
@@ -172,20 +417,414 @@ class UserStatsView(APIView):
 
     def _calculate_security_score(self, stats, strength_dist):
         """Calculate overall security score (0-100)"""
-        if stats.total_checks == 0:
-            return 0
+        return security_score(
+            stats.total_checks,
+            stats.breached_count,
+            strength_dist["strong"] + strength_dist["very_strong"],
+            stats.avg_strength,
+        )
+
+
+class CurrentHealthView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Get the user's current password health
+    Counts only the latest check of each label, so rechecking a password
+    does not skew the figures. Served from LatestCheck, one row per label.
+    """
+
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    fields = ("label", "strength_score", "is_breached", "breach_count", "checked_at")
+
+    def get(self, request):
+        rows = LatestCheck.objects.filter(user_id=request.user.id).values_list(
+            *self.fields
+        )
+
+        passwords = []
+        strength_dist = dict.fromkeys(STRENGTH_BUCKETS, 0)
+        breached = strength_total = 0
+        for label, score, is_breached, breach_count, checked_at in rows:
+            strength = strength_label(score)
+            strength_dist[strength] += 1
+            breached += is_breached
+            strength_total += score
+            passwords.append(
+                {
+                    "label": label,
+                    "strength_score": score,
+                    "strength": strength,
+                    "is_breached": is_breached,
+                    "breach_count": breach_count,
+                    "checked_at": isoformat(checked_at),
+                }
+            )
+        # Worst first: breached, then weakest
+        passwords.sort(key=lambda p: (not p["is_breached"], p["strength_score"]))
+
+        count = len(passwords)
+        avg_strength = strength_total / count if count else 0
+        return Response(
+            {
+                "passwords_tracked": count,
+                "breached_count": breached,
+                "avg_strength": round(avg_strength, 1),
+                "strength_distribution": strength_dist,
+                "security_score": security_score(
+                    count,
+                    breached,
+                    strength_dist["strong"] + strength_dist["very_strong"],
+                    avg_strength,
+                ),
+                "passwords": passwords,
+            }
+        )
+
+
+class TimeSeriesView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Get daily strength and breach trends for dashboard charts
+    GET ?start=YYYY-MM-DD&end=YYYY-MM-DD (defaults to the last 30 days).
+    Served from DailyRollup in one indexed range query; days without
+    checks are omitted.
+    """
+
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    default_days = 30
+
+    def window(self, request):
+        """(start, end) dates; raises ValueError for a malformed date"""
+        end = self._parse(request.query_params.get("end"), timezone.localdate())
+        start = self._parse(
+            request.query_params.get("start"),
+            end - timedelta(days=self.default_days - 1),
+        )
+        return start, end
+
+    def validators(self, request, latest):
+        etag, last_modified = super().validators(request, latest)
+        if etag is None:
+            return etag, last_modified
+        try:
+            start, end = self.window(request)
+        except ValueError:
+            return None, None
+        # The default window moves at local midnight without any new check
+        midnight = timezone.make_aware(
+            datetime.combine(timezone.localdate(), datetime.min.time())
+        )
+        return (
+            f'{etag[:-1]}:{start.isoformat()}:{end.isoformat()}"',
+            max(last_modified, int(midnight.timestamp())),
+        )
+
+    def get(self, request):
+        try:
+            start, end = self.window(request)
+        except ValueError:
+            return Response(
+                {"error": "Dates must be formatted YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start > end:
+            return Response(
+                {"error": "start must not be after end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = DailyRollup.objects.filter(
+            user_id=request.user.id, day__range=(start, end)
+        ).values_list("day", "checks", "breached", "strength_total", *STRENGTH_BUCKETS)
+
+        days = []
+        for day, checks, breached, strength_total, *buckets in rows:
+            days.append(
+                {
+                    "day": day.isoformat(),
+                    "checks": checks,
+                    "breached": breached,
+                    "avg_strength": round(strength_total / checks, 1) if checks else 0,
+                    "strength_distribution": dict(zip(STRENGTH_BUCKETS, buckets)),
+                }
+            )
+
+        return Response(
+            {"start": start.isoformat(), "end": end.isoformat(), "days": days}
+        )
+
+    def _parse(self, value, default):
+        if not value:
+            return default
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+
+
+class EventTicketView(APIView):
+    """
+    Ticket for opening the event stream with EventSource
+    POST: {"ticket", "expires_in"}; 404 when event streams are disabled.
+    """
+
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not settings.EVENTS_MAX_STREAMS:
+            raise Http404("Event streams are disabled")
+        return Response(
+            {
+                "ticket": issue_stream_ticket(request.user.id),
+                "expires_in": settings.EVENTS_TICKET_SECONDS,
+            }
+        )
+
+
+class EventStreamView(APIView):
+    """
+    Live dashboard updates as Server-Sent Events
+    GET with `Authorization` or `?ticket=` from events/ticket/ (for
+    EventSource), resuming after `Last-Event-ID` or `?last_id=`.
+    Sends `check` events for new checks, `stats` when the dashboard figures
+    changed and `progress` for running jobs, on one long-lived connection.
+    503 when this worker already holds EVENTS_MAX_STREAMS streams.
+    """
+
+    authentication_classes = [StatelessJWTAuthentication, StreamTicketAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, FastJSONRenderer]
+    # Seconds a client should wait when every stream slot is taken
+    busy_retry_after = 30
+
+    def get(self, request):
+        if not settings.EVENTS_MAX_STREAMS:
+            raise Http404("Event streams are disabled")
+        user_id = request.user.id
+        last_event_id = request.headers.get(
+            "Last-Event-ID", request.query_params.get("last_id", "")
+        )
+        if not event_slots.acquire(settings.EVENTS_MAX_STREAMS):
+            response = Response(
+                {"detail": "Too many open event streams, retry later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            response["Retry-After"] = str(self.busy_retry_after)
+            return response
+
+        try:
+            if last_event_id.isdigit():
+                last_id = int(last_event_id)
+            else:
+                last_id = latest_check_id(user_id)
+            stream = event_slots.hold(event_stream(user_id, last_id))
+        except BaseException:
+            event_slots.release()
+            raise
+        response = StreamingHttpResponse(
+            stream,
+            content_type=f"{EventStreamRenderer.media_type}; charset=utf-8",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx-style proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class BreachRangeView(APIView):
+    """
+    Serve an HIBP range so clients can check breaches locally (k-anonymity)
+    GET: `SUFFIX:COUNT` lines for a 5-char SHA-1 prefix, padded with count-0
+    entries. The password and its full hash never reach the server.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "breach_range"
+
+    prefix_re = re.compile(r"^[0-9A-Fa-f]{5}$")
+
+    def get(self, request, prefix):
+        if not self.prefix_re.match(prefix):
+            return Response(
+                {"error": "Prefix must be 5 hex characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        prefix = prefix.upper()
+
+        key = f"hibp:range-body:{prefix}"
+        cached = cache.get(key)
+        if cached is None:
+            table = get_range(prefix)
+            if table is None:
+                return Response(
+                    {"error": "Breach data temporarily unavailable"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            body = self._render(table)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            cached = (body, etag)
+            cache.set(key, cached, settings.HIBP_RANGE_CACHE_TIMEOUT)
+
+        body, etag = cached
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type="text/plain; charset=utf-8")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.HIBP_RANGE_MAX_AGE)
+        return response
+
+    def _render(self, table):
+        """Render real entries plus deterministic count-0 padding"""
+        lines = [f"{suffix}:{count}" for suffix, count in table.entries()]
+        pad_to = settings.HIBP_RANGE_PAD_TO
+        index = 0
+        while len(lines) < pad_to:
+            seed = f"{table.prefix}:{index}".encode()
+            lines.append(f"{hashlib.sha1(seed).hexdigest().upper()[:35]}:0")
+            index += 1
+        lines.sort()
+        return "\r\n".join(lines).encode()
+
+
+class ProfileListView(APIView):
+    """
+    Captured request profiles (admin only)
+    GET: stored profiles, newest first
+    POST: a signed `X-Profile` header value; requests sending it are
+    profiled while PROFILE_REQUESTS is enabled
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "enabled": settings.PROFILE_REQUESTS,
+                "profiles": profiling.list_profiles(),
+            }
+        )
+
+    def post(self, request):
+        return Response(
+            {
+                "header": profiling.PROFILE_HEADER,
+                "token": profiling.issue_token(request.user),
+                "expires_in": settings.PROFILE_TOKEN_SECONDS,
+            }
+        )
 
-        # Penalize breached passwords heavily
-        breach_penalty = (stats.breached_count / stats.total_checks) * 40
 
-        # Reward strong passwords
-        strong_ratio = (
-            strength_dist["strong"] + strength_dist["very_strong"]
-        ) / stats.total_checks
-        strong_bonus = strong_ratio * 30
+class ProfileDownloadView(APIView):
+    """Download a captured profile (admin only)"""
 
-        # Base on average strength
-        avg_bonus = (stats.avg_strength / 100) * 30
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name):
+        path = profiling.profile_path(name)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+
+class TraceListView(APIView):
+    """
+    Recent trace spans of this process (admin only)
+    GET ?trace_id=<id> filters to one trace. Only available with the
+    in-memory exporter; with TRACING_FILE set, read that file instead.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        exporter = tracing.get_exporter()
+        if not isinstance(exporter, tracing.RingBufferExporter):
+            return Response(
+                {"error": "Spans are exported to TRACING_FILE"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        spans = list(exporter.spans)
+        trace_id = request.query_params.get("trace_id")
+        if trace_id:
+            spans = [span for span in spans if span["trace_id"] == trace_id]
+        return Response(
+            {"sample_rate": settings.TRACING_SAMPLE_RATE, "spans": spans[::-1]}
+        )
 
-        score = max(0, min(100, 100 - breach_penalty + strong_bonus + avg_bonus - 30))
-        return round(score, 1)
+
+class UserImportView(APIView):
+    """
+    Bulk-create users from an uploaded file (admin only)
+    POST multipart `file`: CSV with a username,email,password header, or
+    NDJSON (by extension, `.csv` or `.ndjson`). Rows are validated up front;
+    the import then runs in the background and reports `progress` events
+    (job `import_users`) to the admin's event stream; poll
+    admin/users/import/<job_id>/ for the job's status.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    # Invalid rows echoed back in the response
+    max_errors = 100
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Upload a CSV or NDJSON file as `file`"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        file_format = os.path.splitext(upload.name)[1].lstrip(".").lower()
+        try:
+            users, errors = onboarding.read_users(
+                io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""),
+                file_format,
+                limit=settings.IMPORT_USERS_MAX_ROWS,
+            )
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        body = {
+            "users": len(users),
+            "invalid": len(errors),
+            "errors": errors[: self.max_errors],
+        }
+        if not users:
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+
+        job_id = onboarding.start_import(request.user.id, users)
+        if job_id is None:
+            return Response(
+                {"error": "Another import is running"}, status=status.HTTP_409_CONFLICT
+            )
+        return Response({"job_id": job_id, **body}, status=status.HTTP_202_ACCEPTED)
+
+
+class ImportJobView(APIView):
+    """
+    Status of an uploaded user import (admin only)
+    GET: status (running, finished or failed), counts and error. Imports
+    interrupted by a worker restart are reported as failed.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    fields = ("id", "status", "total", "done", "created", "skipped", "error")
+
+    def get(self, request, job_id):
+        onboarding.mark_orphaned_imports()
+        job = (
+            ImportJob.objects.filter(pk=job_id)
+            .values(*self.fields, "started_at", "updated_at")
+            .first()
+        )
+        if job is None:
+            raise Http404("No such import")
+        return Response(job)
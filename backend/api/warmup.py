@@ -0,0 +1,46 @@
+"""
+Process warm-up hooks
+
+`load_static_data` runs once in the gunicorn master when the app is
+preloaded, so imports and lookup tables are shared copy-on-write by every
+worker. `prime_connections` runs in each worker after fork, since sockets
+must not be shared across processes.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+
+
+def load_static_data():
+    """Import the URLconf, lazily-loaded modules and module-level lookup tables"""
+    import requests  # noqa: F401
+
+    from . import policy, services
+
+    get_resolver().url_patterns
+    services.calculate_password_strength("warm-up")
+    # Compile configured policies now, so a bad policy file fails at boot
+    for name in settings.PASSWORD_POLICIES:
+        policy.get_policy(name)
+
+
+def prime_connections():
+    """Open a connection to every configured database and cache"""
+    for alias in connections:
+        connections[alias].ensure_connection()
+    for alias in caches:
+        caches[alias].get("warmup")
+
+
+def warm_up() -> dict:
+    """Run every warm-up step; returns seconds spent per step"""
+    timings = {}
+    for step in (load_static_data, prime_connections):
+        start = time.perf_counter()
+        step()
+        timings[step.__name__] = time.perf_counter() - start
+    return timings
@@ -0,0 +1,86 @@
+"""
+Benchmark HIBP range lookups: linear text scan vs parsed RangeTable.
+
+Reports parse cost, per-lookup latency and memory per cached prefix.
+
+Usage (from backend/):
+    python benchmarks/bench_hibp_range.py [--entries 1000] [--lookups 20000]
+"""
+
+import argparse
+import os
+import pickle
+import secrets
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.hibp import RangeTable  # noqa: E402
+
+
+def synthetic_body(entries, padding):
+    lines = [
+        f"{secrets.token_hex(18).upper()[:35]}:{secrets.randbelow(10**5) + 1}"
+        for _ in range(entries)
+    ]
+    lines += [f"{secrets.token_hex(18).upper()[:35]}:0" for _ in range(padding)]
+    lines.sort()
+    return "\r\n".join(lines)
+
+
+def linear_lookup(text, suffix):
+    for line in text.splitlines():
+        hash_suffix, count = line.split(":")
+        if hash_suffix == suffix:
+            return int(count)
+    return 0
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--padding", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    body = synthetic_body(args.entries, args.padding)
+    table = RangeTable.parse("ABCDE", body)
+    suffixes = [suffix for suffix, _ in table.entries()]
+    probes = [suffixes[i % len(suffixes)] for i in range(args.lookups)]
+    misses = [secrets.token_hex(18).upper()[:35] for _ in range(args.lookups)]
+
+    parse_s = timeit(lambda: RangeTable.parse("ABCDE", body), 50)
+    linear_s = timeit(lambda: linear_lookup(body, suffixes[len(suffixes) // 2]), 200)
+    hit_iter = iter(probes * 2)
+    hit_s = timeit(lambda: table.lookup(next(hit_iter)), args.lookups)
+    miss_iter = iter(misses * 2)
+    miss_s = timeit(lambda: table.lookup(next(miss_iter)), args.lookups)
+    pickled = pickle.dumps(table, pickle.HIGHEST_PROTOCOL)
+    unpickle_s = timeit(lambda: pickle.loads(pickled), 2000)
+
+    print(f"entries: {len(table)} (+{args.padding} padding dropped)")
+    print(f"raw body:             {len(body):>10,} bytes")
+    print(f"table payload:        {table.nbytes:>10,} bytes per prefix")
+    print(f"pickled (cache):      {len(pickled):>10,} bytes per prefix")
+    print(f"parse once:           {parse_s * 1e6:>10.1f} us")
+    print(f"linear scan lookup:   {linear_s * 1e6:>10.1f} us")
+    print(f"bisect lookup (hit):  {hit_s * 1e6:>10.2f} us")
+    print(f"bisect lookup (miss): {miss_s * 1e6:>10.2f} us")
+    print(f"cache unpickle:       {unpickle_s * 1e6:>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
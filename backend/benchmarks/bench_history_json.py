@@ -0,0 +1,100 @@
+"""
+Benchmark history/stats response encoding: serializer path vs fast path.
+
+Both paths start from the same database row tuples, so the numbers reflect
+the CPU spent per request on model instantiation, serialization and JSON
+encoding (the query itself is excluded).
+
+Usage (from backend/):
+    python benchmarks/bench_history_json.py [--rows 50] [--repeat 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.models import PasswordCheck  # noqa: E402
+from api.renderers import FastJSONRenderer, isoformat, orjson  # noqa: E402
+from api.serializers import PasswordCheckSerializer  # noqa: E402
+from api.views import DATETIME_FIELDS  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+FIELDS = PasswordCheckSerializer.Meta.fields
+MODEL_FIELDS = [field.attname for field in PasswordCheck._meta.concrete_fields]
+
+
+def make_rows(count):
+    now = timezone.now()
+    model_rows, value_rows = [], []
+    for i in range(count):
+        row = {
+            "id": i + 1,
+            "user_id": 1,
+            "hash_prefix": "ABCDE",
+            "label": f"Account {i}",
+            "strength_score": (i * 17) % 101,
+            "is_breached": i % 3 == 0,
+            "breach_count": i * 11,
+            "checked_at": now - timedelta(minutes=i),
+            "hit_count": 1 + i % 2,
+            "last_checked_at": now - timedelta(minutes=i),
+            "dedup_key": None,
+        }
+        model_rows.append(tuple(row[name] for name in MODEL_FIELDS))
+        value_rows.append(tuple(row[name] for name in FIELDS))
+    return model_rows, value_rows
+
+
+def serializer_path(model_rows):
+    checks = [PasswordCheck.from_db("default", MODEL_FIELDS, row) for row in model_rows]
+    return JSONRenderer().render(PasswordCheckSerializer(checks, many=True).data)
+
+
+def fast_path(value_rows):
+    rows = []
+    for values in value_rows:
+        row = dict(zip(FIELDS, values))
+        for field in DATETIME_FIELDS:
+            row[field] = isoformat(row[field])
+        rows.append(row)
+    return FastJSONRenderer().render(rows)
+
+
+def per_call(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 50])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"JSON encoder: {'orjson' if orjson else 'stdlib json'}")
+    for count in args.rows:
+        model_rows, value_rows = make_rows(count)
+        assert serializer_path(model_rows) == fast_path(value_rows)
+        slow = per_call(serializer_path, model_rows, args.repeat)
+        fast = per_call(fast_path, value_rows, args.repeat)
+        print(
+            f"{count:>4} rows: serializer {slow * 1e6:8.1f} us, "
+            f"fast path {fast * 1e6:8.1f} us, "
+            f"saved {(slow - fast) * 1e6:8.1f} us/request ({slow / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark password scoring: compiled policies vs the original hard-coded checks.
+
+Reports per-password cost of the default policy, and how cost changes as
+banned words and rules are added to a policy.
+
+Usage (from backend/):
+    python benchmarks/bench_policy.py [--passwords 5000]
+"""
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.policy import DEFAULT_POLICY, compile_policy  # noqa: E402
+from api.services import (  # noqa: E402
+    has_repeated_chars,
+    has_sequential_chars,
+    is_common_password,
+)
+
+UPPER, LOWER, DIGIT = re.compile("[A-Z]"), re.compile("[a-z]"), re.compile(r"\d")
+SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+
+
+def original_criteria(password):
+    """Criteria as computed before policies (scoring and feedback omitted)"""
+    return {
+        "length": len(password) >= 8,
+        "length_12": len(password) >= 12,
+        "length_16": len(password) >= 16,
+        "uppercase": bool(UPPER.search(password)),
+        "lowercase": bool(LOWER.search(password)),
+        "numbers": bool(DIGIT.search(password)),
+        "special": bool(SPECIAL.search(password)),
+        "no_common": not is_common_password(password),
+        "no_sequential": not has_sequential_chars(password),
+        "no_repeated": not has_repeated_chars(password),
+    }
+
+
+def per_call(fn, passwords, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for password in passwords:
+            fn(password)
+        best = min(best, time.perf_counter() - start)
+    return best / len(passwords)
+
+
+def with_banned_words(count, rng):
+    words = {
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 8)))
+        for _ in range(count)
+    }
+    rules = DEFAULT_POLICY["rules"] + [
+        {"name": "banned", "not_containing": sorted(words), "points": 0}
+    ]
+    return {**DEFAULT_POLICY, "rules": rules}
+
+
+def with_extra_rules(count):
+    rules = list(DEFAULT_POLICY["rules"])
+    for i in range(count):
+        rules.append({"name": f"len_{i}", "min_length": 4 + i, "points": 0})
+        rules.append({"name": f"has_{i}", "contains": chr(33 + i % 90), "points": 0})
+    return {**DEFAULT_POLICY, "rules": rules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passwords", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    passwords = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 20)))
+        for _ in range(args.passwords)
+    ]
+
+    def report(label, fn):
+        print(f"{label:<34}{per_call(fn, passwords) * 1e6:>8.2f} us")
+
+    report("original hard-coded criteria", original_criteria)
+    report("default policy (full result)", compile_policy(DEFAULT_POLICY).evaluate)
+    for count in (10, 100, 1000, 10000):
+        plan = compile_policy(with_banned_words(count, rng))
+        report(f"+ {count} banned words", plan.evaluate)
+    for count in (5, 20, 40):
+        plan = compile_policy(with_extra_rules(count))
+        report(f"+ {count * 2} length/charset rules", plan.evaluate)
+
+
+if __name__ == "__main__":
+    main()
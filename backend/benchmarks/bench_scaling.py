@@ -0,0 +1,144 @@
+"""
+Benchmark dashboard endpoints as one user's check history grows.
+
+Seeds a synthetic user (see api.synthetic) to each history size in turn and
+reports, per endpoint, the median latency, the number of queries and the
+latency relative to the smallest size, so work that grows with history
+(O(n) in rows) stands out from constant-cost paths. `check write` is the
+bookkeeping after saving a check (stats, rollup, latest state), run in a
+rolled-back transaction so history size stays put; the HIBP lookup is left
+out.
+
+Runs against a throwaway SQLite file. DATABASE_URL is ignored, so the
+benchmark never seeds the app's own database; to measure another database
+(a disposable copy, never production) set BENCH_DATABASE_URL, and the
+`bench-` users it creates are deleted at the end.
+
+Usage (from backend/):
+    python benchmarks/bench_scaling.py [--sizes 100 1000 10000 100000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+scratch = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite:///{scratch.name}/bench.sqlite3"
+)
+os.environ.pop("REPLICA_DATABASE_URL", None)
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.latest import backfill_latest, record_latest  # noqa: E402
+from api.models import PasswordCheck  # noqa: E402
+from api.rollups import backfill_rollups, record_check  # noqa: E402
+from api.stats import rebuild_user_stats  # noqa: E402
+from api.synthetic import create_checks, create_users  # noqa: E402
+from api.views import PasswordCheckView  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+ENDPOINTS = {
+    "history": "/api/passwords/history/",
+    "stats": "/api/stats/",
+    "current health": "/api/stats/current/",
+    "time series": "/api/stats/timeseries/",
+    "export (ndjson)": "/api/passwords/history/export/",
+}
+
+
+def grow_history(user, size, current):
+    """Add checks up to `size` and rebuild the user's derived tables"""
+    create_checks({user.id: size - current}, seed=size)
+    history = PasswordCheck.objects.filter(user=user)
+    rebuild_user_stats([user.id])
+    backfill_rollups(history)
+    backfill_latest(history)
+
+
+def request(client, path):
+    def run():
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    return run
+
+
+def check_write(user):
+    def run():
+        with transaction.atomic():
+            check = PasswordCheck.objects.create(
+                user=user, hash_prefix="ABCDE", label="Gmail", strength_score=70
+            )
+            PasswordCheckView()._update_user_stats(user)
+            record_check(check)
+            record_latest(check)
+            transaction.set_rollback(True)
+
+    return run
+
+
+def measure(fn, repeat):
+    """(median seconds, queries of one call)"""
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        fn()
+    return statistics.median(timings), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    user = create_users(1, prefix="bench")[0]
+    client = APIClient()
+    client.force_authenticate(user)
+    cases = {name: request(client, path) for name, path in ENDPOINTS.items()}
+    cases["check write"] = check_write(user)
+
+    baseline = {}
+    current = PasswordCheck.objects.filter(user=user).count()
+    try:
+        for size in sorted(args.sizes):
+            if size > current:
+                grow_history(user, size, current)
+                current = size
+            print(f"\n{current} checks")
+            for name, fn in cases.items():
+                seconds, queries = measure(fn, args.repeat)
+                growth = seconds / baseline.setdefault(name, seconds)
+                print(
+                    f"  {name:<16}{seconds * 1e3:>9.2f} ms"
+                    f"{queries:>4} queries{growth:>8.1f}x"
+                )
+    finally:
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
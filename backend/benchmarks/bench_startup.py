@@ -0,0 +1,128 @@
+"""
+Benchmark cold start: import-time profile and time to first healthy response.
+
+Starts gunicorn with and without app preloading and polls /api/health/
+until it returns 200.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [--top 15] [--runs 3]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Loading the URLconf pulls in DRF, SimpleJWT and the views, which Django
+# otherwise defers to the first request
+WSGI_IMPORT = (
+    "import securepass.wsgi; from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(top):
+    """
+    Return (total_us, top rows, importer of `requests`) for the WSGI app.
+    Rows are (self_us, cumulative_us, module) sorted by self time.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="securepass.settings")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", WSGI_IMPORT],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    total = sum(self_us for self_us, _, _ in rows)
+    return total, sorted(rows, reverse=True)[:top], importer_of("requests", rows)
+
+
+def importer_of(module, rows):
+    """Find the module whose import first pulled in `module` (None if unused)"""
+    names = [name.strip() for _, _, name in rows]
+    if module not in names:
+        return None
+    index = names.index(module)
+    depth = len(rows[index][2]) - len(names[index])
+    # -X importtime lists children before their parent, one indent deeper
+    for _, _, name in rows[index + 1 :]:
+        if len(name) - len(name.lstrip()) < depth:
+            return name.strip()
+    return "__main__"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_healthy(preload, timeout=30.0):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        GUNICORN_PRELOAD=str(preload),
+        WEB_CONCURRENCY="2",
+    )
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        ["gunicorn", "securepass.wsgi:application", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/api/health/"
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"no healthy response within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    total, rows, requests_importer = import_profile(args.top)
+    print(f"import time (self, all modules): {total / 1000:.1f} ms")
+    print(f"'requests' imported at startup by: {requests_importer or 'nobody'}")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for self_us, cumulative_us, name in rows:
+        print(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+    print()
+    for preload in (True, False):
+        runs = [time_to_healthy(preload) for _ in range(args.runs)]
+        best, worst = min(runs), max(runs)
+        print(
+            f"gunicorn preload={preload!s:<5} first healthy response: "
+            f"best {best * 1000:.0f} ms, worst {worst * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark `auth/refresh/` latency with refresh-token revocation.
+
+Rotates a chain of refresh tokens through the refresh view, interleaving
+simplejwt's serializer without any revocation check, the revocable
+serializer answering cache misses from RevokedToken (a per-process cache),
+and the revocable serializer with a primed shared cache
+(REVOKED_TOKENS_CACHE_SHARED). `--revoked` rows are inserted first, so the
+table is the size it would be after that many rotations. Reports median
+latency and queries per refresh; every rotation also inserts its
+RevokedToken row.
+
+Runs against a throwaway SQLite file, since it empties RevokedToken at the
+end. DATABASE_URL is ignored; set BENCH_DATABASE_URL to measure another
+disposable database.
+
+Usage (from backend/):
+    python benchmarks/bench_token_refresh.py [--requests 1000] [--revoked 100000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+scratch = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite:///{scratch.name}/bench.sqlite3"
+)
+os.environ.pop("REPLICA_DATABASE_URL", None)
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.models import RevokedToken  # noqa: E402
+from api.revocation import RevocableTokenRefreshSerializer, load_revoked  # noqa: E402
+from api.synthetic import create_users  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+from rest_framework_simplejwt.views import TokenRefreshView  # noqa: E402
+
+MODES = {
+    "no revocation": (TokenRefreshSerializer, False),
+    "database on miss": (RevocableTokenRefreshSerializer, False),
+    "shared cache": (RevocableTokenRefreshSerializer, True),
+}
+
+
+def fill_revoked(count, batch_size=10000):
+    """Insert `count` unexpired RevokedToken rows"""
+    expires_at = timezone.now() + timedelta(days=7)
+    for start in range(0, count, batch_size):
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at)
+            for _ in range(min(batch_size, count - start))
+        )
+
+
+def refresh_request(view, factory, token):
+    """(seconds, queries, next refresh token) for one refresh request"""
+    request = factory.post("/api/auth/refresh/", {"refresh": token}, format="json")
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = view(request)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    return elapsed, len(queries), response.data["refresh"]
+
+
+def time_refreshes(user, count):
+    """Median seconds and queries per refresh in each mode, interleaved"""
+    factory = APIRequestFactory()
+    views, tokens, timings, queries = {}, {}, {}, {}
+    for mode, (serializer, _) in MODES.items():
+        views[mode] = TokenRefreshView.as_view(serializer_class=serializer)
+        tokens[mode] = str(RefreshToken.for_user(user))
+        timings[mode], queries[mode] = [], []
+    for _ in range(count):
+        for mode, (_, shared) in MODES.items():
+            with override_settings(REVOKED_TOKENS_CACHE_SHARED=shared):
+                elapsed, queried, tokens[mode] = refresh_request(
+                    views[mode], factory, tokens[mode]
+                )
+            timings[mode].append(elapsed)
+            queries[mode].append(queried)
+    return {
+        mode: (statistics.median(timings[mode]), statistics.mean(queries[mode]))
+        for mode in MODES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--revoked", type=int, default=100000)
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    user = create_users(1, prefix="bench")[0]
+    try:
+        fill_revoked(args.revoked)
+        load_revoked()
+        results = time_refreshes(user, args.requests)
+    finally:
+        user.delete()
+        RevokedToken.objects.all().delete()
+
+    baseline = results["no revocation"][0]
+    print(f"{args.revoked} revoked tokens, {args.requests} refreshes per mode")
+    for mode, (seconds, queries) in results.items():
+        print(
+            f"{mode:<17} {seconds * 1e3:8.3f} ms/refresh "
+            f"({seconds / baseline - 1:+.1%}), {queries:.1f} queries"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark tracing overhead and the sample rate that fits an overhead budget.
+
+Times `passwords/check/` end to end (HIBP range pre-cached, throttling off,
+each request rolled back so history size stays fixed), interleaving runs
+with tracing disabled, with every request traced, and with the no-op spans
+of an untraced request inside an enabled deployment. From the per-request
+cost of a traced request it reports the highest TRACING_SAMPLE_RATE whose
+mean overhead stays within `--budget` percent.
+
+Runs against a throwaway SQLite file. DATABASE_URL is ignored; set
+BENCH_DATABASE_URL to measure another disposable database.
+
+Usage (from backend/):
+    python benchmarks/bench_tracing.py [--requests 1000] [--budget 1]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "securepass.settings")
+scratch = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCH_DATABASE_URL", f"sqlite:///{scratch.name}/bench.sqlite3"
+)
+os.environ.pop("REPLICA_DATABASE_URL", None)
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.hibp import RangeTable, range_cache_key  # noqa: E402
+from api.services import get_hash_prefix  # noqa: E402
+from api.synthetic import create_users  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+PASSWORD = "Tr0ub4dor&3xPlorer!"
+
+
+def check_request(client):
+    """Seconds for one check request, rolled back to keep history size fixed"""
+    with transaction.atomic():
+        start = time.perf_counter()
+        response = client.post(
+            "/api/passwords/check/", {"password": PASSWORD}, format="json"
+        )
+        elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    assert response.status_code == 200, response.status_code
+    return elapsed
+
+
+def time_requests(user, count, rates):
+    """Median seconds per check request at each sample rate, interleaved"""
+    clients = {}
+    timings = {rate: [] for rate in rates}
+    for _ in range(count):
+        for rate in rates:
+            with override_settings(TRACING_SAMPLE_RATE=rate):
+                # Each client builds its middleware chain at its own rate
+                if rate not in clients:
+                    clients[rate] = APIClient()
+                    clients[rate].force_authenticate(user)
+                timings[rate].append(check_request(clients[rate]))
+    return [statistics.median(timings[rate]) for rate in rates]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument(
+        "--budget", type=float, default=1, help="Overhead budget in percent"
+    )
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    user = create_users(1, prefix="bench")[0]
+    prefix = get_hash_prefix(PASSWORD)
+    cache.set(range_cache_key(prefix), RangeTable.parse(prefix, ""), None)
+    rates = {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]}
+    rates["password_check"] = None
+
+    try:
+        with override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": rates,
+            },
+            TRACING_BUFFER_SIZE=args.requests,
+        ):
+            # A rate this low keeps the middleware installed but samples
+            # nothing, which isolates the cost of no-op spans
+            disabled, untraced, traced = time_requests(
+                user, args.requests, [0, 1e-12, 1]
+            )
+    finally:
+        user.delete()
+
+    idle, extra = max(untraced - disabled, 0), traced - disabled
+    print(f"tracing disabled   {disabled * 1e3:8.3f} ms/request")
+    print(
+        f"enabled, untraced  {untraced * 1e3:8.3f} ms/request "
+        f"({untraced / disabled - 1:+.1%})"
+    )
+    print(
+        f"every request      {traced * 1e3:8.3f} ms/request "
+        f"({traced / disabled - 1:+.1%})"
+    )
+
+    # Mean overhead at rate r: idle * (1 - r) + extra * r
+    budget = args.budget / 100 * disabled
+    if extra <= budget:
+        print(f"Tracing every request stays within the {args.budget}% budget")
+    elif idle >= budget:
+        print(f"Untraced requests alone exceed the {args.budget}% budget")
+    else:
+        rate = (budget - idle) / (extra - idle)
+        print(f"Max TRACING_SAMPLE_RATE for a {args.budget}% budget: {rate:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration
+
+With GUNICORN_PRELOAD=True (the default) Django and the password lookup
+tables are loaded once in the master before forking; each worker then only
+opens its own database and cache connections.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# Threads per worker (gthread when > 1), so long-lived event streams do not
+# tie up a whole worker; EVENTS_MAX_STREAMS must stay below this
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+
+def when_ready(server):
+    if preload_app:
+        from api.warmup import load_static_data
+
+        load_static_data()
+
+
+def post_worker_init(worker):
+    from api.warmup import load_static_data, prime_connections
+
+    if not preload_app:
+        load_static_data()
+    prime_connections()
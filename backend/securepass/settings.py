@@ -3,6 +3,7 @@ Django settings for SecurePass Dashboard
 Production-ready with Railway support
 """
 
+import json
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -35,9 +36,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.ProfilingMiddleware",
+    "api.middleware.TracingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "api.middleware.APICompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -78,6 +82,18 @@ else:
         }
     }
 
+# Optional read replica for dashboard reads (see api.routers); locally e.g.
+# sqlite:///replica.sqlite3 holding a copy of db.sqlite3
+REPLICA_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL")
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600)
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["api.routers.ReplicaRouter"]
+# Seconds a user's reads stay on the primary after their own writes, and
+# seconds an unreachable replica is skipped before it is tried again
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+REPLICA_RETRY_SECONDS = int(os.environ.get("REPLICA_RETRY_SECONDS", 30))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": (
@@ -119,6 +135,21 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # Token-bucket rates per `throttle_scope` (see api.throttling); with the
+    # default LocMemCache each worker process keeps its own buckets
+    "DEFAULT_THROTTLE_RATES": {
+        "quick_check": os.environ.get("QUICK_CHECK_RATE", "30/min"),
+        "password_check": os.environ.get("PASSWORD_CHECK_RATE", "60/min"),
+        "breach_range": os.environ.get("BREACH_RANGE_RATE", "100/min"),
+        "generate": os.environ.get("GENERATE_RATE", "30/min"),
+    },
+    # Trusted proxies in front of the app: client IPs are the address the
+    # outermost one appended to X-Forwarded-For, or REMOTE_ADDR with 0. Never
+    # None, which trusts the client-supplied header. Defaults to Railway's
+    # one proxy when deployed there (RAILWAY_ENVIRONMENT is set), else 0
+    "NUM_PROXIES": int(
+        os.environ.get("NUM_PROXIES", 1 if os.environ.get("RAILWAY_ENVIRONMENT") else 0)
+    ),
 }
 
 # JWT Settings
@@ -127,4 +158,111 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Revoked refresh tokens are rejected (see api.revocation)
+    "TOKEN_REFRESH_SERIALIZER": "api.revocation.RevocableTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "api.revocation.RevocableTokenBlacklistSerializer",
+}
+
+# Seconds a user's active status is trusted by StatelessJWTAuthentication
+AUTH_ACTIVE_CACHE_TIMEOUT = int(os.environ.get("AUTH_ACTIVE_CACHE_TIMEOUT", 60))
+
+# Set when the default cache is shared by every worker (e.g. Redis) and does
+# not evict: once primed, a revoked-token lookup that misses the cache is
+# answered without the database (see api.revocation)
+REVOKED_TOKENS_CACHE_SHARED = (
+    os.environ.get("REVOKED_TOKENS_CACHE_SHARED", "False") == "True"
+)
+
+# Cache — per-process by default; ranges are stored pre-parsed (see api.hibp)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "securepass",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 2000))},
+    }
 }
+
+# HIBP range cache lifetime in seconds
+HIBP_RANGE_CACHE_TIMEOUT = int(os.environ.get("HIBP_RANGE_CACHE_TIMEOUT", 60 * 60 * 24))
+
+# Browser/CDN lifetime of breach/range/ responses, and the minimum number of
+# entries each response is padded to so its size reveals nothing
+HIBP_RANGE_MAX_AGE = int(os.environ.get("HIBP_RANGE_MAX_AGE", 60 * 60 * 24))
+HIBP_RANGE_PAD_TO = int(os.environ.get("HIBP_RANGE_PAD_TO", 1000))
+
+# Hot prefixes kept cached by `manage.py warm_hibp_cache`; keep it below
+# CACHE_MAX_ENTRIES so warmed ranges are not evicted
+HIBP_WARM_TOP = int(os.environ.get("HIBP_WARM_TOP", 1000))
+
+# PasswordCheck rows older than this many days are folded into rollups and
+# deleted by `manage.py prune_checks` (0 keeps history forever)
+PASSWORD_CHECK_RETENTION_DAYS = int(
+    os.environ.get("PASSWORD_CHECK_RETENTION_DAYS", 365)
+)
+
+# Identical checks (same label, hash prefix and result) by one user within
+# the same CHECK_DEDUP_WINDOW seconds are stored as one row with a hit count
+# (see api.dedup); 0 stores every check as its own row
+CHECK_DEDUP_WINDOW = int(os.environ.get("CHECK_DEDUP_WINDOW", 0))
+
+# Bulk user imports (see api.onboarding): password hashing processes (default
+# one per CPU, 0 hashes in the importing process) and the most users one
+# upload to /api/admin/users/import/ may hold
+IMPORT_USERS_WORKERS = int(os.environ.get("IMPORT_USERS_WORKERS", os.cpu_count() or 1))
+IMPORT_USERS_MAX_ROWS = int(os.environ.get("IMPORT_USERS_MAX_ROWS", 50000))
+# Seconds an uploaded import may go without finishing a batch before it is
+# taken for interrupted (its worker restarted) and marked failed
+IMPORT_JOB_STALE_SECONDS = int(os.environ.get("IMPORT_JOB_STALE_SECONDS", 900))
+
+# Rows fetched per server-side cursor round trip by streamed exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# API read responses smaller than this many bytes are sent uncompressed
+API_COMPRESSION_MIN_SIZE = int(os.environ.get("API_COMPRESSION_MIN_SIZE", 1024))
+
+# Upper bound on passwords per generate request; responses with more than
+# GENERATE_STREAM_THRESHOLD passwords are streamed
+GENERATE_MAX_COUNT = int(os.environ.get("GENERATE_MAX_COUNT", 100000))
+GENERATE_STREAM_THRESHOLD = int(os.environ.get("GENERATE_STREAM_THRESHOLD", 1000))
+
+# Server-Sent Events (see api.events): streams each worker process may hold
+# open (each holds a thread, so keep it below GUNICORN_THREADS; 0 disables
+# /api/events/), seconds a stream
+# ticket is valid, seconds between history polls, seconds before a stream
+# ends and the browser reconnects, reconnect delay in ms and checks read per
+# poll
+EVENTS_MAX_STREAMS = int(os.environ.get("EVENTS_MAX_STREAMS", 2))
+EVENTS_TICKET_SECONDS = int(os.environ.get("EVENTS_TICKET_SECONDS", 30))
+EVENTS_POLL_SECONDS = float(os.environ.get("EVENTS_POLL_SECONDS", 5))
+EVENTS_STREAM_SECONDS = int(os.environ.get("EVENTS_STREAM_SECONDS", 300))
+EVENTS_RETRY_MS = int(os.environ.get("EVENTS_RETRY_MS", 3000))
+EVENTS_POLL_BATCH = int(os.environ.get("EVENTS_POLL_BATCH", 500))
+
+# Named password policies in addition to the built-in "default" (see
+# api.policy for the rule format), loaded from a JSON file mapping names to
+# policies
+PASSWORD_POLICIES_FILE = os.environ.get("PASSWORD_POLICIES_FILE")
+PASSWORD_POLICIES = {}
+if PASSWORD_POLICIES_FILE:
+    with open(PASSWORD_POLICIES_FILE, encoding="utf-8") as policies_file:
+        PASSWORD_POLICIES = json.load(policies_file)
+
+# On-demand request profiling (see api.profiling). Off unless
+# PROFILE_REQUESTS=True; then requests with a signed X-Profile header (valid
+# PROFILE_TOKEN_SECONDS) and a PROFILE_SAMPLE_RATE fraction of all requests
+# are profiled. PROFILE_MODE is "sample" (speedscope) or "cprofile" (pstats);
+# only the newest PROFILE_MAX_FILES profiles are kept
+PROFILE_REQUESTS = os.environ.get("PROFILE_REQUESTS", "False") == "True"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 1))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 200))
+PROFILE_TOKEN_SECONDS = int(os.environ.get("PROFILE_TOKEN_SECONDS", 60 * 60))
+
+# Request tracing (see api.tracing): fraction of requests traced (0 disables),
+# and where spans go: JSON lines appended to TRACING_FILE when set, otherwise
+# a per-process ring buffer of the last TRACING_BUFFER_SIZE spans
+TRACING_SAMPLE_RATE = float(os.environ.get("TRACING_SAMPLE_RATE", 0))
+TRACING_FILE = os.environ.get("TRACING_FILE")
+TRACING_BUFFER_SIZE = int(os.environ.get("TRACING_BUFFER_SIZE", 10000))
@@ -38,6 +38,8 @@ api.interceptors.response.use(
           });
 
           localStorage.setItem('access_token', response.data.access);
+          // Refresh tokens are rotated; the old one is now revoked
+          localStorage.setItem('refresh_token', response.data.refresh);
           api.defaults.headers.Authorization = `Bearer ${response.data.access}`;
 
           return api(originalRequest);
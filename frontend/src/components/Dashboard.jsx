@@ -15,6 +15,10 @@ import api from '../api/axios';
 
 ChartJS.register(ArcElement, Tooltip, Legend, CategoryScale, LinearScale, BarElement, Title);
 
+// Event stream reconnect backoff
+const STREAM_RETRY_MIN_MS = 3000;
+const STREAM_RETRY_MAX_MS = 60000;
+
 export default function Dashboard() {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -24,6 +28,61 @@ export default function Dashboard() {
     fetchStats();
   }, []);
 
+  // Refresh when the server reports new checks, instead of polling
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let timer = null;
+    let stopped = false;
+    let lastId = '';
+    let delay = STREAM_RETRY_MIN_MS;
+
+    const retry = () => {
+      if (stopped) return;
+      timer = setTimeout(connect, delay);
+      delay = Math.min(delay * 2, STREAM_RETRY_MAX_MS);
+    };
+
+    const connect = async () => {
+      let ticket;
+      try {
+        // Requested with the access token, which the api client refreshes
+        const response = await api.post('/events/ticket/');
+        ticket = response.data.ticket;
+      } catch (err) {
+        // 404: live updates are disabled on this server
+        if (err.response?.status !== 404) retry();
+        return;
+      }
+      if (stopped) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastId) params.set('last_id', lastId);
+      source = new EventSource(`${api.defaults.baseURL}/events/?${params}`);
+      source.addEventListener('open', () => {
+        delay = STREAM_RETRY_MIN_MS;
+      });
+      source.addEventListener('check', (event) => {
+        lastId = event.lastEventId;
+      });
+      source.addEventListener('stats', () => fetchStats());
+      // Tickets expire within seconds, so reconnect with a new one instead
+      // of letting the browser retry the same URL (also backs off on 503)
+      source.addEventListener('error', () => {
+        source.close();
+        retry();
+      });
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(timer);
+      if (source) source.close();
+    };
+  }, []);
+
   const fetchStats = async () => {
     try {
       const response = await api.get('/stats/');
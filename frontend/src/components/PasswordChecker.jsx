@@ -1,6 +1,8 @@
 import { useState, useMemo } from 'react';
 import { Eye, EyeOff, Shield, ShieldAlert, ShieldCheck, Loader2, Copy, Check } from 'lucide-react';
 import api from '../api/axios';
+import { checkBreachLocally } from '../utils/breach';
+import { calculatePasswordStrength } from '../utils/passwordStrength';
 
 const strengthColors = {
   weak: 'bg-red-500',
@@ -59,13 +61,17 @@ export default function PasswordChecker({ onCheck }) {
     setError('');
 
     try {
-      const endpoint = localStorage.getItem('access_token') 
-        ? '/passwords/check/' 
-        : '/passwords/quick-check/';
-      
-      const response = await api.post(endpoint, { password, label });
-      setResult(response.data);
-      if (onCheck) onCheck(response.data);
+      let data;
+      if (localStorage.getItem('access_token')) {
+        const response = await api.post('/passwords/check/', { password, label });
+        data = response.data;
+      } else {
+        // Anonymous mode: score and match suffixes locally, never send the password
+        const breach = await checkBreachLocally(password);
+        data = { ...calculatePasswordStrength(password), ...breach };
+      }
+      setResult(data);
+      if (onCheck) onCheck(data);
     } catch (err) {
       setError(err.response?.data?.error || 'Error checking password');
     } finally {
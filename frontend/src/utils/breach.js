@@ -0,0 +1,32 @@
+// Client-side k-anonymity breach check: the password is hashed in the
+// browser and only the 5-char SHA-1 prefix is sent to the range endpoint.
+// Range responses are cacheable, so repeat prefixes hit the HTTP cache.
+import api from '../api/axios';
+
+export async function sha1Hex(text) {
+  const digest = await crypto.subtle.digest('SHA-1', new TextEncoder().encode(text));
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('')
+    .toUpperCase();
+}
+
+export async function checkBreachLocally(password) {
+  const hash = await sha1Hex(password);
+  const prefix = hash.slice(0, 5);
+  const suffix = hash.slice(5);
+
+  const response = await api.get(`/breach/range/${prefix}/`, {
+    responseType: 'text',
+    transformResponse: (data) => data,
+  });
+
+  for (const line of response.data.split('\n')) {
+    const [hashSuffix, count] = line.trim().split(':');
+    if (hashSuffix === suffix) {
+      const breachCount = parseInt(count, 10);
+      return { is_breached: breachCount > 0, breach_count: breachCount };
+    }
+  }
+  return { is_breached: false, breach_count: 0 };
+}
@@ -0,0 +1,55 @@
+// Client-side port of backend `calculate_password_strength` (api/services.py).
+// Keep the lists, weights and feedback strings in sync with the backend.
+
+const COMMON_PASSWORDS = new Set([
+  'password', '123456', '12345678', 'qwerty', 'abc123', 'monkey', 'master',
+  'dragon', 'admin', 'letmein', 'login', 'welcome', 'password1', 'p@ssw0rd',
+  'iloveyou', 'princess', 'sunshine', 'passw0rd', '654321', 'superman',
+  'qwerty123', '1234567890',
+]);
+
+const SEQUENCES = [
+  '012', '123', '234', '345', '456', '567', '678', '789', '890',
+  'abc', 'bcd', 'cde', 'def', 'efg', 'fgh', 'ghi', 'hij', 'ijk', 'jkl', 'klm',
+  'lmn', 'mno', 'nop', 'opq', 'pqr', 'qrs', 'rst', 'stu', 'tuv', 'uvw', 'vwx',
+  'wxy', 'xyz', 'qwe', 'wer', 'ert', 'rty', 'tyu', 'yui', 'uio', 'iop', 'asd',
+  'sdf', 'dfg', 'ghj', 'hjk', 'zxc', 'xcv', 'cvb', 'vbn', 'bnm',
+];
+
+export function calculatePasswordStrength(password) {
+  const lower = password.toLowerCase();
+  const criteria = {
+    length: password.length >= 8,
+    length_12: password.length >= 12,
+    length_16: password.length >= 16,
+    uppercase: /[A-Z]/.test(password),
+    lowercase: /[a-z]/.test(password),
+    numbers: /\d/.test(password),
+    special: /[!@#$%^&*(),.?":{}|<>]/.test(password),
+    no_common: !COMMON_PASSWORDS.has(lower),
+    no_sequential: !SEQUENCES.some((seq) => lower.includes(seq)),
+    no_repeated: !/(.)\1{2,}/.test(password),
+  };
+
+  const score = Object.values(criteria).filter(Boolean).length * 10;
+
+  let strength = 'weak';
+  if (score >= 90) strength = 'very_strong';
+  else if (score >= 70) strength = 'strong';
+  else if (score >= 50) strength = 'good';
+  else if (score >= 30) strength = 'fair';
+
+  const feedback = [];
+  if (!criteria.length) feedback.push('Use at least 8 characters');
+  else if (!criteria.length_12) feedback.push('Consider using 12+ characters for better security');
+  if (!criteria.uppercase) feedback.push('Add uppercase letters');
+  if (!criteria.lowercase) feedback.push('Add lowercase letters');
+  if (!criteria.numbers) feedback.push('Add numbers');
+  if (!criteria.special) feedback.push('Add special characters (!@#$%)');
+  if (!criteria.no_common) feedback.push('Avoid common passwords');
+  if (!criteria.no_sequential) feedback.push('Avoid sequences (123, abc)');
+  if (!criteria.no_repeated) feedback.push('Avoid repeated characters (aaa, 111)');
+  if (feedback.length === 0) feedback.push('Excellent! Very strong password 💪');
+
+  return { score, strength, feedback, criteria };
+}
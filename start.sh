@@ -1,8 +1,10 @@
 #!/bin/sh
 set -e
-echo "Running migrations..."
-python manage.py migrate --noinput
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+# Migrations can be run once per release instead of on every boot
+if [ "${RUN_MIGRATIONS:-True}" = "True" ]; then
+    echo "Running migrations..."
+    python manage.py migrate --noinput
+fi
+# Static files are collected at image build time (see Dockerfile)
 echo "Starting gunicorn..."
-exec gunicorn securepass.wsgi:application --bind 0.0.0.0:${PORT:-8000} --workers 2
+exec gunicorn securepass.wsgi:application -c gunicorn.conf.py
@@ -0,0 +1,73 @@
+"""
+Tests for the Django admin changelists.
+"""
+
+import pytest
+from api.admin import EstimatedCountPaginator
+from api.models import PasswordCheck, UserStats
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def staff_client(admin_user):
+    client = Client()
+    client.force_login(admin_user)
+    return client
+
+
+def make_checks(count, **fields):
+    start = User.objects.count()
+    users = User.objects.bulk_create(
+        User(username=f"owner-{index}") for index in range(start, start + count)
+    )
+    PasswordCheck.objects.bulk_create(
+        PasswordCheck(user=user, hash_prefix="ABCDE", **fields) for user in users
+    )
+    UserStats.objects.bulk_create(UserStats(user=user) for user in users)
+
+
+@pytest.mark.django_db
+class TestChangelists:
+    @pytest.mark.parametrize("model", ["passwordcheck", "userstats"])
+    def test_queries_do_not_grow_with_rows(self, staff_client, model):
+        url = f"/admin/api/{model}/"
+
+        def queries():
+            with CaptureQueriesContext(connection) as context:
+                assert staff_client.get(url).status_code == 200
+            return len(context)
+
+        make_checks(2)
+        few = queries()
+        make_checks(20)
+        assert queries() == few
+
+    def test_filter_and_date_hierarchy(self, staff_client):
+        make_checks(3, is_breached=True)
+        make_checks(2)
+        resp = staff_client.get("/admin/api/passwordcheck/", {"is_breached__exact": 1})
+        assert resp.context["cl"].result_count == 3
+        check = PasswordCheck.objects.first()
+        resp = staff_client.get(
+            "/admin/api/passwordcheck/",
+            {"checked_at__year": check.checked_at.year},
+        )
+        assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_counts_small_tables_exactly(self):
+        make_checks(3)
+        assert EstimatedCountPaginator(PasswordCheck.objects.all(), 2).count == 3
+
+    def test_stops_counting_at_limit(self, monkeypatch):
+        make_checks(5)
+        monkeypatch.setattr(EstimatedCountPaginator, "limit", 3)
+        paginator = EstimatedCountPaginator(PasswordCheck.objects.all(), 2)
+        # SQLite has no planner estimate
+        assert paginator.count == 3
+        assert paginator.num_pages == 2
@@ -0,0 +1,256 @@
+"""
+Tests for management commands.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api.models import ArchivedStats, DailyRollup, LatestCheck, PasswordCheck, UserStats
+from api.stats import user_totals
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db.models import F, Sum
+from django.utils import timezone
+
+# ---------------------------------------------------------------------------
+# warmup
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestWarmupCommand:
+    def test_warmup_reports_each_step(self):
+        out = StringIO()
+        call_command("warmup", stdout=out)
+        output = out.getvalue()
+        assert "load_static_data" in output
+        assert "prime_connections" in output
+        assert "Warm-up complete" in output
+
+
+# ---------------------------------------------------------------------------
+# backfill_rollups
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestBackfillRollupsCommand:
+    def test_builds_rollups_from_history(self, user):
+        for score in (20, 75):
+            PasswordCheck.objects.create(
+                user=user, hash_prefix="ABCDE", strength_score=score
+            )
+        out = StringIO()
+        call_command("backfill_rollups", stdout=out)
+        assert "Wrote 1 daily rollups" in out.getvalue()
+        rollup = DailyRollup.objects.get(user=user)
+        assert (rollup.checks, rollup.weak, rollup.strong) == (2, 1, 1)
+
+    def test_skips_only_days_folded_by_pruning(self, user, admin_user):
+        old = timezone.now() - timedelta(days=400)
+        for owner in (user, admin_user):
+            check = PasswordCheck.objects.create(user=owner, hash_prefix="ABCDE")
+            PasswordCheck.objects.filter(pk=check.pk).update(checked_at=old)
+        # Four of user's checks that day were pruned into the archive
+        ArchivedStats.objects.create(user=user, checks=4, archived_through=old)
+        DailyRollup.objects.create(user=user, day=timezone.localdate(old), checks=5)
+
+        call_command("backfill_rollups", stdout=StringIO())
+        assert dict(DailyRollup.objects.values_list("user_id", "checks")) == {
+            user.id: 5,
+            admin_user.id: 1,
+        }
+
+
+# ---------------------------------------------------------------------------
+# backfill_latest
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestBackfillLatestCommand:
+    def test_builds_latest_per_label(self, user):
+        for label in ("Gmail", "Gmail", "Bank"):
+            PasswordCheck.objects.create(user=user, hash_prefix="ABCDE", label=label)
+        out = StringIO()
+        call_command("backfill_latest", "--user", str(user.id), stdout=out)
+        assert "Wrote 2 latest checks" in out.getvalue()
+        assert LatestCheck.objects.filter(user=user).count() == 2
+
+
+# ---------------------------------------------------------------------------
+# prune_checks
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestPruneChecksCommand:
+    def make_old_check(self, user):
+        check = PasswordCheck.objects.create(
+            user=user, hash_prefix="ABCDE", strength_score=50
+        )
+        PasswordCheck.objects.filter(pk=check.pk).update(
+            checked_at=check.checked_at - timedelta(days=30)
+        )
+
+    def test_dry_run_reports_throughput(self, user):
+        self.make_old_check(user)
+        out = StringIO()
+        call_command("prune_checks", "--days", "7", "--dry-run", stdout=out)
+        assert "Would prune 1 checks" in out.getvalue()
+        assert "rows/s" in out.getvalue()
+        assert PasswordCheck.objects.count() == 1
+
+    def test_prunes_old_checks(self, user):
+        self.make_old_check(user)
+        call_command("prune_checks", "--days", "7", stdout=StringIO())
+        assert PasswordCheck.objects.count() == 0
+
+    def test_disabled_retention_errors(self):
+        with pytest.raises(CommandError):
+            call_command("prune_checks", "--days", "0")
+
+
+# ---------------------------------------------------------------------------
+# rebuild_user_stats
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestRebuildUserStatsCommand:
+    def make_history(self, user, admin_user):
+        for score in (20, 80):
+            PasswordCheck.objects.create(
+                user=user, hash_prefix="ABCDE", strength_score=score
+            )
+        PasswordCheck.objects.create(
+            user=admin_user, hash_prefix="ABCDE", strength_score=90, hit_count=3
+        )
+        ArchivedStats.objects.create(
+            user=user, checks=2, breached=1, strength_total=40, weak=2
+        )
+        # Drifted, missing (admin_user) and stale with no checks left
+        UserStats.objects.create(user=user, total_checks=1)
+        stale = User.objects.create_user(username="stale", password="x")
+        UserStats.objects.create(user=stale, total_checks=5, avg_strength=50)
+        return stale
+
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command("rebuild_user_stats", "--batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_repairs_drift(self, user, admin_user):
+        stale = self.make_history(user, admin_user)
+        output = self.rebuild()
+        assert "Compared 3 users: 3 drifted (1 missing" in output
+        assert "total_checks off by 11" in output
+        assert "from 3 checks" in output
+
+        stats = {row.user_id: row for row in UserStats.objects.all()}
+        assert (stats[user.id].total_checks, stats[user.id].breached_count) == (4, 1)
+        assert stats[user.id].avg_strength == 35
+        assert stats[admin_user.id].total_checks == 3
+        assert (stats[stale.id].total_checks, stats[stale.id].avg_strength) == (0, 0)
+        for row in stats.values():
+            assert row.total_checks == user_totals(row.user_id)["checks"]
+
+        assert "Compared 3 users: 0 drifted" in self.rebuild()
+
+    def test_dry_run_writes_nothing(self, user, admin_user):
+        self.make_history(user, admin_user)
+        output = self.rebuild("--dry-run", "-v", "2")
+        assert f"user {admin_user.id}: missing, expected 3" in output
+        assert "Would rewrite 3 rows" in output
+        assert UserStats.objects.get(user=user).total_checks == 1
+
+
+# ---------------------------------------------------------------------------
+# seed_data
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestSeedDataCommand:
+    def seed(self, *args):
+        out = StringIO()
+        call_command("seed_data", "--seed", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_seeds_skewed_histories_and_derived_tables(self):
+        output = self.seed("--users", "5", "--checks", "500", "--skew", "1.5")
+        assert "Wrote 500 checks for 5 users" in output
+
+        per_user = sorted(
+            UserStats.objects.values_list("total_checks", flat=True), reverse=True
+        )
+        assert sum(per_user) == 500
+        assert per_user[0] > 2 * per_user[-1]
+        for stats in UserStats.objects.all():
+            assert stats.total_checks == user_totals(stats.user_id)["checks"]
+        assert DailyRollup.objects.aggregate(n=Sum("checks"))["n"] == 500
+        assert LatestCheck.objects.exists()
+
+        ages = {check.checked_at.date() for check in PasswordCheck.objects.all()}
+        assert len(ages) > 30
+        assert not PasswordCheck.objects.exclude(
+            checked_at=F("last_checked_at")
+        ).exists()
+
+    def test_real_checks_keep_auto_timestamp(self, user):
+        field = PasswordCheck._meta.get_field("checked_at")
+        flags = []
+        bulk_create = PasswordCheck.objects.bulk_create
+
+        def record(batch, *args, **kwargs):
+            flags.append(field.auto_now_add)
+            return bulk_create(batch, *args, **kwargs)
+
+        with patch.object(PasswordCheck.objects, "bulk_create", side_effect=record):
+            self.seed("--users", "1", "--checks", "10")
+        assert flags == [True]
+
+    def test_rerun_grows_the_same_users(self):
+        self.seed("--users", "2", "--checks", "10")
+        self.seed("--users", "2", "--checks", "10")
+        assert User.objects.filter(username__startswith="synthetic-").count() == 2
+        assert PasswordCheck.objects.count() == 20
+
+    def test_invalid_counts_error(self):
+        with pytest.raises(CommandError):
+            call_command("seed_data", "--users", "0")
+
+
+# ---------------------------------------------------------------------------
+# backfill_prefixes / warm_hibp_cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestPrefixCommands:
+    @pytest.fixture
+    def history(self, user):
+        for prefix in ("AAAAA", "AAAAA", "BBBBB"):
+            PasswordCheck.objects.create(user=user, hash_prefix=prefix)
+        call_command("backfill_prefixes", stdout=StringIO())
+
+    @patch("requests.get")
+    def test_warms_hot_ranges_once(self, mock_get, history):
+        mock_get.return_value = MagicMock(status_code=200, text="")
+        out, err = StringIO(), StringIO()
+        call_command("warm_hibp_cache", "--top", "1", stdout=out, stderr=err)
+        assert "Warmed 1 of 1 hot ranges" in out.getvalue()
+        assert "LocMemCache" in err.getvalue()
+        assert mock_get.call_args[0][0].endswith("/AAAAA")
+
+        out = StringIO()
+        call_command("warm_hibp_cache", "--top", "1", stdout=out, stderr=err)
+        assert "Warmed 0 of 1 hot ranges (0 failed, 1 still fresh)" in out.getvalue()
+
+    def test_report(self, history):
+        out = StringIO()
+        call_command("warm_hibp_cache", "--report", "--top", "1", stdout=out)
+        assert "3 checks over 2 prefixes" in out.getvalue()
+        assert "66.7% with the top 1 warmed" in out.getvalue()
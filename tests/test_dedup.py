@@ -0,0 +1,132 @@
+"""
+Tests for coalescing repeated identical checks.
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from api.dedup import save_check
+from api.hibp import RangeTable, range_cache_key
+from api.models import DailyRollup, PasswordCheck, UserStats
+from api.rollups import backfill_rollups, record_check
+from api.services import get_hash_prefix
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+CHECK = {
+    "label": "Gmail",
+    "hash_prefix": "ABCDE",
+    "strength_score": 40,
+    "is_breached": True,
+    "breach_count": 3,
+}
+
+
+@pytest.fixture
+def dedup(settings):
+    settings.CHECK_DEDUP_WINDOW = 3600
+
+
+@pytest.fixture(params=["upsert", "update"])
+def save_path(request):
+    """Run with the single-statement upsert and with the UPDATE fallback"""
+    if request.param == "upsert":
+        yield
+        return
+    with patch.object(connection.features, "can_return_columns_from_insert", False):
+        yield
+
+
+@pytest.mark.django_db
+class TestSaveCheck:
+    def test_disabled_stores_every_check(self, user):
+        save_check(user, **CHECK)
+        save_check(user, **CHECK)
+        assert PasswordCheck.objects.filter(user=user, hit_count=1).count() == 2
+
+    def test_repeats_coalesce(self, dedup, save_path, user):
+        first, created = save_check(user, **CHECK)
+        assert created
+        second, created = save_check(user, **CHECK)
+        assert not created
+        assert (second.id, second.hit_count) == (first.id, 2)
+
+        row = PasswordCheck.objects.get(user=user)
+        assert row.hit_count == 2
+        assert row.last_checked_at == second.last_checked_at > row.checked_at
+        assert second.checked_at == row.checked_at
+
+    def test_rollups_match_backfill_across_midnight(self, save_path, user, settings):
+        # Week-long windows start on Thursdays 00:00 UTC, never at local midnight
+        settings.CHECK_DEDUP_WINDOW = 7 * 24 * 3600
+        midnight = timezone.make_aware(datetime(2026, 3, 5))
+        for now in (midnight - timedelta(minutes=10), midnight + timedelta(minutes=10)):
+            with patch("api.dedup.timezone.now", return_value=now):
+                check, _ = save_check(user, **CHECK)
+            record_check(check)
+        assert check.hit_count == 2
+
+        live = list(DailyRollup.objects.values_list("day", "checks"))
+        DailyRollup.objects.all().delete()
+        backfill_rollups()
+        assert list(DailyRollup.objects.values_list("day", "checks")) == live
+        assert live == [(date(2026, 3, 4), 2)]
+
+    def test_different_results_get_own_rows(self, dedup, save_path, user, admin_user):
+        save_check(user, **CHECK)
+        save_check(user, **{**CHECK, "strength_score": 41})
+        save_check(user, **{**CHECK, "label": "Bank"})
+        save_check(admin_user, **CHECK)
+        assert PasswordCheck.objects.filter(hit_count=1).count() == 4
+
+    def test_new_window_starts_new_row(self, dedup, user):
+        first, _ = save_check(user, **CHECK)
+        later = first.checked_at + timedelta(hours=1)
+        with patch("api.dedup.timezone.now", return_value=later):
+            _, created = save_check(user, **CHECK)
+        assert created
+        assert PasswordCheck.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestCoalescedRequests:
+    password = "Tr0ub4dor&3xPlorer!"
+
+    def client_for(self, user):
+        prefix = get_hash_prefix(self.password)
+        cache.set(range_cache_key(prefix), RangeTable.parse(prefix, ""))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        return client
+
+    def check(self, client):
+        resp = client.post(
+            "/api/passwords/check/", {"password": self.password}, format="json"
+        )
+        assert resp.status_code == 200
+        return resp
+
+    def test_stats_count_every_check(self, dedup, user):
+        client = self.client_for(user)
+        ids = {self.check(client).data["id"] for _ in range(3)}
+        assert len(ids) == 1
+
+        stats = UserStats.objects.get(user=user)
+        assert stats.total_checks == 3
+        assert DailyRollup.objects.get(user=user).checks == 3
+        history = client.get("/api/passwords/history/").json()
+        assert [row["hit_count"] for row in history] == [3]
+
+    def test_repeat_changes_etag(self, dedup, user):
+        client = self.client_for(user)
+        self.check(client)
+        etag = client.get("/api/passwords/history/")["ETag"]
+        self.check(client)
+        resp = client.get("/api/passwords/history/", HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
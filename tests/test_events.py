@@ -0,0 +1,279 @@
+"""
+Tests for the live event stream.
+Tests the in-process bus, the history-polling fallback and the SSE view.
+"""
+
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api import events as events_module
+from api.authentication import issue_stream_ticket
+from api.events import (
+    EventBus,
+    StreamSlots,
+    bus,
+    event_stream,
+    publish_progress,
+    release_connections,
+)
+from api.models import ImportJob, PasswordCheck
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+
+def parse(chunk):
+    """Split an SSE chunk into (event, id, data) tuples"""
+    events = []
+    for message in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        if "event" in fields:
+            events.append(
+                (fields["event"], fields.get("id"), json.loads(fields["data"]))
+            )
+    return events
+
+
+class TestEventBus:
+    def test_publish_reaches_only_that_users_subscribers(self):
+        events = EventBus()
+        mine, other = events.subscribe(1), events.subscribe(2)
+        events.publish(1, "progress", {"done": 1})
+        assert mine.get_nowait() == ("progress", {"done": 1})
+        assert other.empty()
+
+    def test_unsubscribe_and_full_queues(self):
+        events = EventBus(maxsize=1)
+        subscriber = events.subscribe(1)
+        events.publish(1, "a", None)
+        events.publish(1, "b", None)  # dropped, queue full
+        assert subscriber.qsize() == 1
+        events.unsubscribe(1, subscriber)
+        events.publish(1, "c", None)
+        assert subscriber.qsize() == 1
+
+
+@pytest.mark.django_db
+class TestEventStream:
+    def test_saved_check_pushed_with_stats(
+        self, user, settings, django_capture_on_commit_callbacks
+    ):
+        settings.EVENTS_POLL_SECONDS = 60
+        stream = event_stream(user.id, 0, max_seconds=5)
+        assert next(stream).startswith("retry: ")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            check = PasswordCheck.objects.create(
+                user=user, hash_prefix="ABCDE", label="Gmail", strength_score=80
+            )
+
+        events = parse(next(stream))
+        assert [event for event, _, _ in events] == ["check", "stats"]
+        _, event_id, data = events[0]
+        assert event_id == str(check.id)
+        assert data["label"] == "Gmail"
+        assert data["strength_score"] == 80
+        stream.close()
+
+    def test_polling_picks_up_checks_from_other_workers(self, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0.01
+        stream = event_stream(user.id, 0, max_seconds=5)
+        next(stream)
+        # bulk_create sends no signals, like a write in another process
+        PasswordCheck.objects.bulk_create(
+            [
+                PasswordCheck(user=user, hash_prefix="ABCDE", label=str(i))
+                for i in (1, 2)
+            ]
+        )
+        events = parse(next(stream))
+        assert [data.get("label") for _, _, data in events] == ["1", "2", None]
+        stream.close()
+
+    def test_progress_events_and_keepalive(self, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0.01
+        stream = event_stream(user.id, 0, max_seconds=5)
+        next(stream)
+        assert next(stream) == ": keepalive\n\n"
+
+        publish_progress(user.id, "audit", 3, 10)
+        assert parse(next(stream)) == [
+            ("progress", None, {"job": "audit", "done": 3, "total": 10})
+        ]
+        stream.close()
+
+    def test_import_progress_from_other_workers(self, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0.01
+        job = ImportJob.objects.create(id="job", admin=user, total=10, done=4)
+        stream = event_stream(user.id, 0, max_seconds=5)
+        next(stream)
+        assert parse(next(stream)) == [
+            (
+                "progress",
+                None,
+                {
+                    "job": "import_users",
+                    "job_id": "job",
+                    "done": 4,
+                    "total": 10,
+                    "created": 0,
+                },
+            )
+        ]
+        assert next(stream) == ": keepalive\n\n"
+
+        # Saved by the importing worker, without a bus event here
+        saved = timezone.now()
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.FINISHED,
+            done=10,
+            created=8,
+            skipped=2,
+            started_at=saved - timedelta(seconds=2),
+            updated_at=saved,
+        )
+        chunk = next(stream)
+        while chunk == ": keepalive\n\n":
+            chunk = next(stream)
+        ((_, _, data),) = parse(chunk)
+        assert data["finished"] is True
+        assert (data["status"], data["done"], data["skipped"]) == ("finished", 10, 2)
+        assert data["users_per_second"] == 4.0
+        stream.close()
+
+    def test_stream_ends_and_unsubscribes(self, user, settings):
+        settings.EVENTS_POLL_SECONDS = 60
+        chunks = list(event_stream(user.id, 0, max_seconds=0.05))
+        assert len(chunks) == 1
+        assert user.id not in bus._queues
+
+    def test_connections_released_after_each_poll(self, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0.01
+        with patch("api.events.release_connections") as release:
+            stream = event_stream(user.id, 0, max_seconds=5)
+            next(stream)
+            assert release.call_count == 1
+            next(stream)
+            assert release.call_count == 2
+            stream.close()
+
+    def test_release_skips_connections_in_transactions(self):
+        idle, busy = MagicMock(in_atomic_block=False), MagicMock(in_atomic_block=True)
+        with patch("api.events.connections") as connections:
+            connections.all.return_value = [idle, busy]
+            release_connections()
+        idle.close.assert_called_once()
+        busy.close.assert_not_called()
+
+
+class TestStreamSlots:
+    def test_limit_and_release_on_close(self):
+        slots = StreamSlots()
+        assert slots.acquire(1)
+        assert not slots.acquire(1)
+
+        # Closed before the first chunk, so the generator never started
+        stream = slots.hold(iter_chunks())
+        stream.close()
+        stream.close()
+        assert slots.open == 0
+
+    def test_release_when_exhausted(self):
+        slots = StreamSlots()
+        slots.acquire(1)
+        assert list(slots.hold(iter_chunks())) == ["a", "b"]
+        assert slots.open == 0
+
+
+def iter_chunks():
+    yield "a"
+    yield "b"
+
+
+@pytest.fixture
+def streams(settings):
+    settings.EVENTS_MAX_STREAMS = 2
+
+
+@pytest.mark.django_db
+class TestEventStreamView:
+    def ticket(self, client):
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        resp = client.post("/api/events/ticket/")
+        assert resp.status_code == 200
+        client.credentials()
+        return resp.data["ticket"]
+
+    def test_ticket_and_resume(self, streams, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0
+        first, second = (
+            PasswordCheck.objects.create(user=user, hash_prefix="ABCDE", label=label)
+            for label in ("old", "new")
+        )
+        client = APIClient()
+        ticket = self.ticket(client)
+
+        resp = client.get("/api/events/", {"ticket": ticket, "last_id": first.id})
+        assert resp.status_code == 200
+        assert resp["Content-Type"].startswith("text/event-stream")
+        assert resp["Cache-Control"] == "no-cache"
+
+        chunks = iter(resp.streaming_content)
+        assert next(chunks).startswith(b"retry: ")
+        events = parse(next(chunks).decode())
+        assert events[0][1] == str(second.id)
+        assert events[0][2]["label"] == "new"
+        resp.close()
+
+    def test_new_connection_skips_existing_history(self, streams, user, settings):
+        settings.EVENTS_POLL_SECONDS = 0
+        PasswordCheck.objects.create(user=user, hash_prefix="ABCDE")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+
+        resp = client.get("/api/events/")
+        chunks = iter(resp.streaming_content)
+        next(chunks)
+        assert next(chunks) == b": keepalive\n\n"
+        resp.close()
+
+    def test_busy_worker_returns_503(self, streams, user, settings):
+        settings.EVENTS_MAX_STREAMS = 1
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        first = client.get("/api/events/")
+        assert first.status_code == 200
+
+        resp = client.get("/api/events/")
+        assert resp.status_code == 503
+        assert resp["Retry-After"] == "30"
+
+        first.close()
+        assert events_module.slots.open == 0
+        second = client.get("/api/events/")
+        assert second.status_code == 200
+        second.close()
+
+    def test_disabled_with_no_streams(self, user, settings):
+        settings.EVENTS_MAX_STREAMS = 0
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        assert client.post("/api/events/ticket/").status_code == 404
+        assert client.get("/api/events/").status_code == 404
+
+    def test_rejects_bad_or_expired_tickets(self, streams, user, settings):
+        resp = APIClient().get("/api/events/?ticket=bogus")
+        assert resp.status_code == 401
+        assert resp.content.startswith(b"event: error")
+
+        ticket = issue_stream_ticket(user.id)
+        settings.EVENTS_TICKET_SECONDS = -1
+        assert APIClient().get("/api/events/", {"ticket": ticket}).status_code == 401
+
+    def test_access_token_not_accepted_in_query(self, streams, user):
+        client = APIClient()
+        token = get_tokens(client)
+        assert client.get(f"/api/events/?token={token}").status_code == 401
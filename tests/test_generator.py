@@ -0,0 +1,61 @@
+"""
+Unit tests for the password generator.
+Tests that generated passwords meet their policy's score by construction.
+"""
+
+import pytest
+from api.generator import CHARACTER_CLASSES, generate_passwords, policy_score
+from api.services import calculate_password_strength
+
+
+class TestGeneratePasswords:
+    @pytest.mark.parametrize(
+        "policy",
+        [
+            {},
+            {"length": 12, "symbols": False},
+            {"length": 8, "uppercase": False, "symbols": False, "min_score": 0},
+            {"length": 3, "uppercase": False, "lowercase": False, "min_score": 0},
+            {"length": 10, "uppercase": False, "numbers": False, "symbols": False},
+        ],
+    )
+    def test_every_password_gets_the_policy_score(self, policy):
+        policy.setdefault("min_score", 0)
+        length = policy.get("length", 16)
+        classes = [name for name in CHARACTER_CLASSES if policy.get(name, True)]
+        expected = policy_score(length, classes)
+
+        passwords = list(generate_passwords(2000, **policy))
+
+        assert len(passwords) == 2000
+        for password in passwords:
+            assert len(password) == length
+            assert calculate_password_strength(password)["score"] == expected
+
+    def test_default_policy_is_perfect_score(self):
+        assert policy_score(16, list(CHARACTER_CLASSES)) == 100
+        password = next(generate_passwords(1))
+        assert calculate_password_strength(password)["score"] == 100
+
+    def test_passwords_are_random(self):
+        passwords = list(generate_passwords(500, length=12))
+        assert len(set(passwords)) == 500
+
+    def test_short_common_lengths_avoid_common_passwords(self):
+        # Only lowercase at length 6 could otherwise produce e.g. "monkey"
+        for password in generate_passwords(
+            3000, length=6, uppercase=False, numbers=False, symbols=False, min_score=0
+        ):
+            assert calculate_password_strength(password)["criteria"]["no_common"]
+
+    def test_unreachable_score_rejected_up_front(self):
+        with pytest.raises(ValueError, match="scores at most 60"):
+            generate_passwords(10, length=8, symbols=False, uppercase=False)
+
+    def test_invalid_policies_rejected(self):
+        with pytest.raises(ValueError):
+            generate_passwords(
+                1, uppercase=False, lowercase=False, numbers=False, symbols=False
+            )
+        with pytest.raises(ValueError):
+            generate_passwords(1, length=3, min_score=0)
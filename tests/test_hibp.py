@@ -0,0 +1,111 @@
+"""
+Unit tests for the HIBP range client.
+Tests range parsing, binary-search lookup, padding handling and caching.
+"""
+
+import hashlib
+from unittest.mock import MagicMock, patch
+
+from api.hibp import SUFFIX_BYTES, RangeTable, get_range
+
+
+def sha1_suffix(password):
+    return hashlib.sha1(password.encode()).hexdigest().upper()[5:]
+
+
+def make_body(entries):
+    return "\r\n".join(f"{suffix}:{count}" for suffix, count in entries)
+
+
+# ---------------------------------------------------------------------------
+# RangeTable
+# ---------------------------------------------------------------------------
+
+
+class TestRangeTable:
+    def test_lookup_finds_every_entry(self):
+        entries = [(format(i * 7919, "035X"), i + 1) for i in range(500)]
+        entries += [("F" + format(i, "034X"), 10) for i in range(20)]
+        table = RangeTable.parse("ABCDE", make_body(reversed(entries)))
+
+        assert len(table) == len(entries)
+        for suffix, count in entries:
+            assert table.lookup(suffix) == count
+
+    def test_lookup_missing_suffix_returns_zero(self):
+        table = RangeTable.parse("ABCDE", make_body([("0" * 35, 3)]))
+        assert table.lookup("1" * 35) == 0
+        assert table.lookup("0" * 34 + "1") == 0
+
+    def test_padding_entries_dropped(self):
+        body = make_body([("A" * 35, 0), ("B" * 35, 42)])
+        table = RangeTable.parse("ABCDE", body)
+        assert len(table) == 1
+        assert table.lookup("A" * 35) == 0
+        assert table.lookup("B" * 35) == 42
+
+    def test_lowercase_and_malformed_lines(self):
+        body = "\n".join(["c" * 35 + ":5", "NOTHEX:1", "", "D" * 35 + ":x"])
+        table = RangeTable.parse("abcde", body)
+        assert table.prefix == "ABCDE"
+        assert len(table) == 1
+        assert table.lookup("C" * 35) == 5
+
+    def test_invalid_lookup_input(self):
+        table = RangeTable.parse("ABCDE", make_body([("A" * 35, 1)]))
+        assert table.lookup("short") == 0
+        assert table.lookup("Z" * 35) == 0
+
+    def test_entries_round_trip_sorted(self):
+        entries = sorted((format(i * 104729, "035X"), i + 1) for i in range(100))
+        table = RangeTable.parse("00000", make_body(reversed(entries)))
+        assert list(table.entries()) == entries
+
+    def test_nbytes_is_compact(self):
+        entries = [(format(i * 7919, "035X"), 1) for i in range(1000)]
+        body = make_body(entries)
+        table = RangeTable.parse("ABCDE", body)
+        assert table.nbytes < len(body) / 1.5
+        assert len(table.suffixes) == SUFFIX_BYTES * 1000
+
+
+# ---------------------------------------------------------------------------
+# get_range (cached)
+# ---------------------------------------------------------------------------
+
+
+class TestGetRange:
+    @patch("requests.get")
+    def test_range_parsed_once_and_cached(self, mock_get):
+        suffix = sha1_suffix("password")
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = make_body([(suffix, 7)])
+        mock_get.return_value = mock_response
+
+        first = get_range("5BAA6")
+        second = get_range("5BAA6")
+
+        assert mock_get.call_count == 1
+        assert first.lookup(suffix) == 7
+        assert second.lookup(suffix) == 7
+
+    @patch("requests.get")
+    def test_padding_requested(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = ""
+        mock_get.return_value = mock_response
+
+        get_range("ABCDE")
+        assert mock_get.call_args[1]["headers"]["Add-Padding"] == "true"
+
+    @patch("requests.get")
+    def test_failed_fetch_not_cached(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_get.return_value = mock_response
+
+        assert get_range("ABCDE") is None
+        assert get_range("ABCDE") is None
+        assert mock_get.call_count == 2
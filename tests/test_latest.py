@@ -0,0 +1,69 @@
+"""
+Tests for the latest-check-per-label table.
+"""
+
+from datetime import timedelta
+
+import pytest
+from api.latest import backfill_latest, record_latest
+from api.models import LatestCheck, PasswordCheck
+
+
+def make_check(user, label, score, breached=False, minutes_ago=0):
+    check = PasswordCheck.objects.create(
+        user=user,
+        hash_prefix="ABCDE",
+        label=label,
+        strength_score=score,
+        is_breached=breached,
+    )
+    if minutes_ago:
+        check.checked_at -= timedelta(minutes=minutes_ago)
+        check.save(update_fields=["checked_at"])
+    return check
+
+
+@pytest.mark.django_db
+class TestRecordLatest:
+    def test_recheck_replaces_state(self, user):
+        record_latest(make_check(user, "Gmail", 20, breached=True))
+        record_latest(make_check(user, "Gmail", 90))
+
+        state = LatestCheck.objects.get(user=user, label="Gmail")
+        assert (state.strength_score, state.is_breached) == (90, False)
+
+    def test_one_row_per_label(self, user):
+        for label in ("Gmail", "Bank", "Gmail", ""):
+            record_latest(make_check(user, label, 50))
+        labels = LatestCheck.objects.filter(user=user).values_list("label", flat=True)
+        assert list(labels) == ["", "Bank", "Gmail"]
+
+    def test_older_check_does_not_overwrite_newer(self, user):
+        newer = make_check(user, "Gmail", 90)
+        older = make_check(user, "Gmail", 10, minutes_ago=5)
+        record_latest(newer)
+        record_latest(older)
+        assert LatestCheck.objects.get(user=user).strength_score == 90
+
+
+@pytest.mark.django_db
+class TestBackfillLatest:
+    def test_keeps_newest_per_label(self, user, admin_user):
+        make_check(user, "Gmail", 10, minutes_ago=10)
+        make_check(user, "Gmail", 80)
+        make_check(user, "Bank", 40)
+        make_check(admin_user, "Gmail", 60)
+
+        assert backfill_latest(batch_size=2) == 3
+        assert LatestCheck.objects.get(user=user, label="Gmail").strength_score == 80
+        assert LatestCheck.objects.get(user=admin_user).strength_score == 60
+
+    def test_matches_incremental_updates(self, user):
+        for i, label in enumerate(["a", "b", "a", "c", "b"]):
+            record_latest(make_check(user, label, i * 20, breached=i % 2 == 1))
+        incremental = list(LatestCheck.objects.values_list("label", "strength_score"))
+
+        LatestCheck.objects.all().delete()
+        backfill_latest()
+        rebuilt = list(LatestCheck.objects.values_list("label", "strength_score"))
+        assert rebuilt == incremental
@@ -0,0 +1,216 @@
+"""
+Tests for bulk user onboarding.
+"""
+
+import io
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api.events import bus
+from api.models import ImportJob, UserStats
+from api.onboarding import import_users, read_users, start_import
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+CSV = (
+    "username,email,password\n"
+    "alice,alice@example.com,Alice-Secret-1\n"
+    "bob,,\n"
+    "alice,,Another-Secret\n"
+    "carol,not-an-email,Carol-Secret-1\n"
+    "dave,,short\n"
+)
+
+
+class InlineThread:
+    """Runs the import in the test's thread and transaction"""
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class TestReadUsers:
+    def test_csv_rows_validated(self):
+        users, errors = read_users(io.StringIO(CSV), "csv")
+        assert [user["username"] for user in users] == ["alice", "bob"]
+        assert users[1]["password"] is None
+        assert [error["line"] for error in errors] == [4, 5, 6]
+        assert "Duplicate" in errors[0]["error"]
+
+    def test_ndjson_rows(self):
+        lines = [json.dumps({"username": "alice", "password": 12345678}), "", "[1]"]
+        users, errors = read_users(io.StringIO("\n".join(lines)), "ndjson")
+        assert users == [{"username": "alice", "email": "", "password": "12345678"}]
+        assert errors == [{"line": 3, "error": "Not a JSON object"}]
+
+    def test_stops_reading_past_the_limit(self):
+        def lines():
+            yield "username\n"
+            yield from ("alice\n", "bob\n", "carol\n")
+            raise AssertionError("read past the first extra row")
+
+        with pytest.raises(ValueError, match="At most 2 users"):
+            read_users(lines(), "csv", limit=2)
+        users, _ = read_users(io.StringIO("username\nalice\nbob\n"), "csv", limit=2)
+        assert len(users) == 2
+
+    def test_bad_input_rejected(self):
+        with pytest.raises(ValueError):
+            read_users(io.StringIO("name\nalice\n"), "csv")
+        with pytest.raises(ValueError):
+            read_users(io.StringIO(""), "xlsx")
+
+
+@pytest.mark.django_db
+class TestImportUsers:
+    def users(self, *names):
+        return [
+            {"username": name, "email": "", "password": f"{name}-Secret-1"}
+            for name in names
+        ]
+
+    def test_creates_users_and_stats_in_batches(self, user):
+        progress = MagicMock()
+        result = import_users(
+            self.users("alice", "testuser", "bob"),
+            batch_size=2,
+            workers=0,
+            progress=progress,
+        )
+        assert (result["created"], result["skipped"]) == (2, 1)
+        assert [call.args for call in progress.call_args_list] == [(2, 1), (3, 2)]
+
+        alice = User.objects.get(username="alice")
+        assert alice.check_password("alice-Secret-1")
+        assert (
+            UserStats.objects.filter(user__username__in=["alice", "bob"]).count() == 2
+        )
+
+    def test_username_registered_mid_batch_is_skipped(self):
+        User.objects.create(username="bob")
+        # bob signed up after the existence check missed him
+        with patch("api.onboarding._taken", side_effect=[set(), {"bob"}]):
+            result = import_users(self.users("alice", "bob", "carol"), workers=0)
+        assert (result["created"], result["skipped"]) == (2, 1)
+        assert UserStats.objects.filter(user__username="carol").exists()
+
+    def test_hashes_in_process_pool(self):
+        result = import_users(self.users("alice", "bob", "carol"), workers=2)
+        assert result["created"] == 3
+        assert User.objects.get(username="carol").check_password("carol-Secret-1")
+
+
+@pytest.mark.django_db
+class TestImportUsersCommand:
+    def test_imports_file(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text(CSV)
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "import_users", str(path), "--workers", "0", stdout=out, stderr=err
+        )
+        assert "Created 2 users (0 existing skipped, 3 invalid rows)" in out.getvalue()
+        assert "users/s" in out.getvalue()
+        assert "line 4:" in err.getvalue()
+
+    def test_unknown_format_errors(self, tmp_path):
+        path = tmp_path / "users.txt"
+        path.write_text("")
+        with pytest.raises(CommandError):
+            call_command("import_users", str(path))
+
+
+@pytest.mark.django_db
+class TestUserImportEndpoint:
+    url = "/api/admin/users/import/"
+
+    def admin_client(self):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION="Bearer "
+            + get_tokens(client, "admin", "AdminPassword123!")
+        )
+        return client
+
+    def upload(self, client, content, name="users.csv"):
+        return client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart",
+        )
+
+    @patch("api.onboarding.connections")
+    @patch("api.onboarding.threading.Thread", InlineThread)
+    def test_import_reports_progress(self, _, admin_user, settings):
+        settings.IMPORT_USERS_WORKERS = 0
+        events = bus.subscribe(admin_user.id)
+        try:
+            resp = self.upload(self.admin_client(), CSV)
+        finally:
+            bus.unsubscribe(admin_user.id, events)
+        assert resp.status_code == 202
+        assert (resp.data["users"], resp.data["invalid"]) == (2, 3)
+
+        # Each saved batch wakes the admin's streams to read the job
+        assert events.get_nowait() == ("import", None)
+        assert User.objects.filter(username__in=["alice", "bob"]).count() == 2
+
+        job = self.admin_client().get(f"{self.url}{resp.data['job_id']}/").data
+        assert (job["status"], job["created"], job["skipped"]) == ("finished", 2, 0)
+
+    def test_rejects_bad_uploads(self, admin_user, settings):
+        client = self.admin_client()
+        assert self.upload(client, CSV, name="users.xlsx").status_code == 400
+        assert self.upload(client, "username\n,\n").status_code == 400
+        settings.IMPORT_USERS_MAX_ROWS = 2
+        resp = self.upload(client, CSV)
+        assert resp.status_code == 400
+        assert resp.data == {"error": "At most 2 users per upload"}
+
+    def test_one_import_at_a_time(self, admin_user):
+        ImportJob.objects.create(id="running", total=1)
+        assert self.upload(self.admin_client(), CSV).status_code == 409
+
+    @patch("api.onboarding.threading.Thread")
+    def test_interrupted_import_marked_failed(self, _, admin_user, settings):
+        stale = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+        ImportJob.objects.create(id="orphan", total=1, updated_at=stale)
+        client = self.admin_client()
+
+        job = client.get(f"{self.url}orphan/").data
+        assert (job["status"], job["error"]) == ("failed", "Interrupted")
+        assert start_import(admin_user.id, [{"username": "alice"}]) is not None
+        assert client.get(f"{self.url}missing/").status_code == 404
+
+    @patch("api.onboarding.connections")
+    @patch("api.onboarding.threading.Thread", InlineThread)
+    def test_failed_import_keeps_committed_counts(self, _, admin_user, settings):
+        settings.IMPORT_USERS_WORKERS = 0
+        users = [
+            {"username": name, "email": "", "password": None}
+            for name in ("alice", "bob", "carol")
+        ]
+        # The first batch commits one user, the second one fails
+        with patch(
+            "api.onboarding._create_batch", side_effect=[[MagicMock()], RuntimeError]
+        ):
+            job_id = start_import(admin_user.id, users, batch_size=1)
+
+        job = ImportJob.objects.get(pk=job_id)
+        assert (job.status, job.error) == (ImportJob.FAILED, "Import failed")
+        assert (job.done, job.created) == (1, 1)
+
+    def test_admin_only(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        assert self.upload(client, CSV).status_code == 403
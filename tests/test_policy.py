@@ -0,0 +1,182 @@
+"""
+Tests for the password policy engine.
+Tests that the default policy reproduces the original scoring exactly, and
+custom rules: minimum length, required classes and banned words.
+"""
+
+import random
+import re
+import string
+
+import pytest
+from api.policy import DEFAULT_POLICY, compile_policy, get_policy
+from api.services import (
+    calculate_password_strength,
+    has_repeated_chars,
+    has_sequential_chars,
+    is_common_password,
+    strength_label,
+)
+
+
+def reference_strength(password):
+    """The scoring as it was hard-coded before policies"""
+    criteria = {
+        "length": len(password) >= 8,
+        "length_12": len(password) >= 12,
+        "length_16": len(password) >= 16,
+        "uppercase": bool(re.search(r"[A-Z]", password)),
+        "lowercase": bool(re.search(r"[a-z]", password)),
+        "numbers": bool(re.search(r"\d", password)),
+        "special": bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password)),
+        "no_common": not is_common_password(password),
+        "no_sequential": not has_sequential_chars(password),
+        "no_repeated": not has_repeated_chars(password),
+    }
+    score = 10 * sum(criteria.values())
+    messages = {
+        "uppercase": "Add uppercase letters",
+        "lowercase": "Add lowercase letters",
+        "numbers": "Add numbers",
+        "special": "Add special characters (!@#$%)",
+        "no_common": "Avoid common passwords",
+        "no_sequential": "Avoid sequences (123, abc)",
+        "no_repeated": "Avoid repeated characters (aaa, 111)",
+    }
+    feedback = []
+    if not criteria["length"]:
+        feedback.append("Use at least 8 characters")
+    elif not criteria["length_12"]:
+        feedback.append("Consider using 12+ characters for better security")
+    feedback += [message for key, message in messages.items() if not criteria[key]]
+    return {
+        "score": score,
+        "strength": strength_label(score),
+        "feedback": feedback or ["Excellent! Very strong password 💪"],
+        "criteria": criteria,
+    }
+
+
+EDGE_CASES = [
+    "",
+    "a",
+    "Password",
+    "P@SSW0RD",
+    "ABCdef",
+    "xyz12345",
+    "aaa",
+    "\n\n\n",
+    "١٢٣٤٥٦٧٨",
+    "İİİİİİİİ",
+    "ÉÉcole!!9",
+    "Tr0ub4dor&3xPlorer!",
+    "correct horse battery staple",
+    "🔒🔒🔒🔒🔒🔒🔒🔒",
+    "Qwerty123!",
+    "Zx" * 20,
+]
+
+
+class TestDefaultPolicy:
+    @pytest.mark.parametrize("password", EDGE_CASES)
+    def test_matches_original_scoring(self, password):
+        assert calculate_password_strength(password) == reference_strength(password)
+
+    def test_matches_original_scoring_on_random_passwords(self):
+        rng = random.Random(40)
+        alphabet = string.ascii_letters + string.digits + string.punctuation + " éİ١"
+        for _ in range(3000):
+            password = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            assert calculate_password_strength(password) == reference_strength(password)
+
+    def test_results_are_independent_copies(self):
+        first = calculate_password_strength("abc")
+        first["feedback"].append("mutated")
+        first["criteria"]["length"] = True
+        assert calculate_password_strength("abc") == reference_strength("abc")
+
+    def test_plans_are_cached(self):
+        assert get_policy() is get_policy("default")
+        assert compile_policy(dict(DEFAULT_POLICY)) is get_policy()
+
+
+TENANT_POLICY = {
+    "rules": [
+        {
+            "name": "min_length",
+            "min_length": 14,
+            "points": 40,
+            "required": True,
+            "feedback": "Use at least 14 characters",
+        },
+        {"name": "digits", "contains": "digits", "points": 20, "required": True},
+        {"name": "symbols", "contains": "#$%&", "points": 20},
+        {
+            "name": "no_company",
+            "not_containing": ["Acme", "widget"],
+            "points": 20,
+            "required": True,
+            "feedback": "Do not use the company name",
+        },
+    ],
+    "success_feedback": "Meets policy",
+}
+
+
+class TestCustomPolicies:
+    def test_required_rules_and_compliance(self):
+        plan = compile_policy(TENANT_POLICY)
+        result = plan.evaluate("my-ACME-password-1")
+        assert result["criteria"] == {
+            "min_length": True,
+            "digits": True,
+            "symbols": False,
+            "no_company": False,
+        }
+        assert result["score"] == 60
+        assert result["compliant"] is False
+        assert result["feedback"] == ["Do not use the company name"]
+
+        result = plan.evaluate("long-enough-pass-7%")
+        assert (result["score"], result["compliant"]) == (100, True)
+        assert result["feedback"] == ["Meets policy"]
+
+    def test_no_compliance_key_without_required_rules(self):
+        assert "compliant" not in calculate_password_strength("abc")
+
+    def test_score_clamped(self):
+        plan = compile_policy(
+            {"rules": [{"name": "any", "min_length": 0, "points": 500}]}
+        )
+        assert plan.evaluate("x")["score"] == 100
+
+    def test_many_banned_words_share_one_pass(self):
+        words = [f"word{i}" for i in range(100, 600)]
+        plan = compile_policy(
+            {"rules": [{"name": "clean", "not_containing": words, "points": 100}]}
+        )
+        assert len(plan.grams) == 1  # one entry per distinct word length
+        assert plan.evaluate("xxWORD417xx")["criteria"]["clean"] is False
+        assert plan.evaluate("xxword5000")["criteria"]["clean"] is False
+        assert plan.evaluate("wordsmith")["criteria"]["clean"] is True
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {"rules": []},
+            {"rules": [{"min_length": 8}]},
+            {"rules": [{"name": "a", "min_length": 8, "contains": "digits"}]},
+            {"rules": [{"name": "a", "minimum": 8}]},
+            {"rules": [{"name": "a", "max_run": 2, "unless_failed": "b"}]},
+        ],
+    )
+    def test_invalid_policies_rejected(self, spec):
+        with pytest.raises(ValueError):
+            compile_policy(spec)
+
+    def test_named_policies_from_settings(self, settings):
+        settings.PASSWORD_POLICIES = {"tenant": TENANT_POLICY}
+        result = calculate_password_strength("short", policy="tenant")
+        assert result["compliant"] is False
+        with pytest.raises(LookupError):
+            get_policy("missing")
@@ -0,0 +1,104 @@
+"""
+Tests for hash-prefix popularity and HIBP cache warming.
+"""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api.hibp import get_range, range_cache_key, range_fetched_key
+from api.models import PasswordCheck, PrefixPopularity
+from api.prefixes import (
+    backfill_prefixes,
+    expected_hit_ratio,
+    hot_prefixes,
+    record_prefix,
+    stale_prefixes,
+    warm_ranges,
+)
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def make_checks(user, prefixes, **fields):
+    return [
+        PasswordCheck.objects.create(user=user, hash_prefix=prefix, **fields)
+        for prefix in prefixes
+    ]
+
+
+def hibp_response(status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = ""
+    return response
+
+
+@pytest.mark.django_db
+class TestPrefixCounts:
+    def test_record_prefix_counts_across_users(self, user, admin_user):
+        checks = make_checks(user, ["AAAAA", "AAAAA", "BBBBB"])
+        checks += make_checks(admin_user, ["AAAAA"])
+        for check in checks:
+            record_prefix(check)
+        counts = dict(PrefixPopularity.objects.values_list("hash_prefix", "checks"))
+        assert counts == {"AAAAA": 3, "BBBBB": 1}
+        assert (
+            PrefixPopularity.objects.get(hash_prefix="AAAAA").last_checked
+            == checks[-1].last_checked_at
+        )
+
+    def test_backfill_overwrites_counts(self, user):
+        make_checks(user, ["AAAAA", "BBBBB", "AAAAA"])
+        PrefixPopularity.objects.create(
+            hash_prefix="AAAAA", checks=99, last_checked=timezone.now()
+        )
+        assert backfill_prefixes(batch_size=1) == 2
+        assert hot_prefixes(10) == ["AAAAA", "BBBBB"]
+        assert PrefixPopularity.objects.get(hash_prefix="AAAAA").checks == 2
+
+    def test_hot_prefixes_skip_inactive(self, user):
+        make_checks(user, ["AAAAA", "AAAAA", "BBBBB"])
+        backfill_prefixes()
+        PrefixPopularity.objects.filter(hash_prefix="AAAAA").update(
+            last_checked=timezone.now() - timedelta(days=60)
+        )
+        assert hot_prefixes(1) == ["AAAAA"]
+        assert hot_prefixes(1, days=30) == ["BBBBB"]
+
+
+class TestWarming:
+    @patch("requests.get")
+    def test_warm_then_fresh(self, mock_get, settings):
+        mock_get.side_effect = [hibp_response(), hibp_response(503)]
+        assert stale_prefixes(["AAAAA", "BBBBB"], 0) == ["AAAAA", "BBBBB"]
+
+        assert warm_ranges(["AAAAA", "BBBBB"], workers=1) == (1, 1)
+        assert cache.get(range_cache_key("AAAAA")) is not None
+        assert stale_prefixes(["AAAAA", "BBBBB"], 0) == ["BBBBB"]
+        # Due to expire within the refresh window
+        refresh = settings.HIBP_RANGE_CACHE_TIMEOUT
+        assert stale_prefixes(["AAAAA"], refresh) == ["AAAAA"]
+
+    @patch("requests.get")
+    def test_request_fetches_record_fetch_time(self, mock_get):
+        mock_get.return_value = hibp_response()
+        get_range("ABCDE")
+        assert cache.get(range_fetched_key("ABCDE")) is not None
+
+
+@pytest.mark.django_db
+class TestExpectedHitRatio:
+    def test_replays_history(self, user, settings):
+        settings.HIBP_RANGE_CACHE_TIMEOUT = 60
+        # Three checks of AAAAA within a minute: one fetch then two hits
+        make_checks(user, ["AAAAA", "AAAAA", "AAAAA", "BBBBB", "CCCCC"])
+        backfill_prefixes()
+        ratio = expected_hit_ratio(days=30, top=1)
+        assert ratio["checks"] == 5
+        assert ratio["prefixes"] == 3
+        assert ratio["cold"] == pytest.approx(2 / 5)
+        assert ratio["warm"] == pytest.approx(3 / 5)
+
+    def test_empty_history(self, db):
+        assert expected_hit_ratio()["warm"] == 0.0
@@ -0,0 +1,125 @@
+"""
+Tests for on-demand request profiling.
+Tests the stack sampler, the middleware triggers and the admin endpoints.
+"""
+
+import json
+import pstats
+import time
+
+import pytest
+from api import profiling
+from api.middleware import ProfilingMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+
+@pytest.fixture
+def profiled(settings, tmp_path):
+    settings.PROFILE_REQUESTS = True
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def admin_client(admin_user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION="Bearer " + get_tokens(client, "admin", "AdminPassword123!")
+    )
+    return client
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSampledProfile:
+    def test_samples_the_calling_thread(self, tmp_path):
+        profile = profiling.SampledProfile(0.001)
+        profile.start()
+        busy_wait(0.05)
+        profile.stop()
+
+        path = tmp_path / "out.speedscope.json"
+        profile.write(path, "test")
+        document = json.loads(path.read_text())
+        frames = document["shared"]["frames"]
+        assert "busy_wait" in {frame["name"] for frame in frames}
+        (sampled,) = document["profiles"]
+        assert len(sampled["samples"]) == len(sampled["weights"]) > 0
+        assert sum(sampled["weights"]) <= sampled["endValue"]
+
+
+class TestProfilingMiddleware:
+    def test_removed_when_disabled(self, settings):
+        settings.PROFILE_REQUESTS = False
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_unsigned_requests_not_profiled(self, profiled):
+        resp = APIClient().get("/api/health/", HTTP_X_PROFILE="forged")
+        assert "X-Profile-Id" not in resp
+        assert list(profiled.iterdir()) == []
+
+    def test_signed_header_profiles_request(self, profiled, admin_user):
+        token = profiling.issue_token(admin_user)
+        resp = APIClient().get("/api/health/", HTTP_X_PROFILE=token)
+        name = resp["X-Profile-Id"]
+        assert name.endswith(".speedscope.json")
+        assert "GET-api-health" in name
+        assert json.loads((profiled / name).read_text())["profiles"]
+
+    def test_expired_token_rejected(self, profiled, admin_user, settings):
+        token = profiling.issue_token(admin_user)
+        settings.PROFILE_TOKEN_SECONDS = -1
+        assert profiling.verify_token(token) is None
+
+    def test_sample_rate_and_cprofile_mode(self, profiled, settings):
+        settings.PROFILE_SAMPLE_RATE = 1
+        settings.PROFILE_MODE = "cprofile"
+        name = APIClient().get("/api/health/")["X-Profile-Id"]
+        assert name.endswith(".prof")
+        stats = pstats.Stats(str(profiled / name))
+        assert stats.total_calls > 0
+
+    def test_keeps_newest_profiles(self, profiled, settings):
+        settings.PROFILE_SAMPLE_RATE = 1
+        settings.PROFILE_MAX_FILES = 2
+        client = APIClient()
+        for _ in range(3):
+            client.get("/api/health/")
+        assert len(list(profiled.iterdir())) == 2
+
+
+@pytest.mark.django_db
+class TestProfileViews:
+    def test_issue_token_list_and_download(self, profiled, admin_client):
+        header = admin_client.post("/api/admin/profiles/").data
+        assert header["header"] == "X-Profile"
+        name = APIClient().get("/api/health/", HTTP_X_PROFILE=header["token"])[
+            "X-Profile-Id"
+        ]
+
+        listing = admin_client.get("/api/admin/profiles/").data
+        assert listing["enabled"] is True
+        assert [profile["name"] for profile in listing["profiles"]] == [name]
+        assert listing["profiles"][0]["format"] == "speedscope"
+
+        resp = admin_client.get(f"/api/admin/profiles/{name}/")
+        assert resp.status_code == 200
+        assert json.loads(b"".join(resp.streaming_content))["profiles"]
+
+    def test_unknown_profile_404(self, profiled, admin_client):
+        resp = admin_client.get("/api/admin/profiles/..%2Fsettings.py/")
+        assert resp.status_code == 404
+
+    def test_requires_staff(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        assert client.get("/api/admin/profiles/").status_code == 403
+        assert client.post("/api/admin/profiles/").status_code == 403
@@ -0,0 +1,59 @@
+"""
+Unit tests for custom renderers.
+Checks FastJSONRenderer is byte-compatible with DRF's JSONRenderer and
+that CSV exports cannot carry spreadsheet formulas.
+"""
+
+import csv
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from api.renderers import CSVRenderer, FastJSONRenderer
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+PAYLOADS = [
+    {"score": 63.3, "ok": True, "none": None, "items": [1, 2.5, "x"]},
+    {"label": "Gmail — café 🔐", "sep": "a b c"},
+    {"when": timezone.now(), "naive": datetime.datetime(2026, 1, 2, 3, 4, 5, 678901)},
+    {"day": datetime.date(2026, 1, 2), "time": datetime.time(10, 30)},
+    {"amount": decimal.Decimal("12.50"), "id": uuid.uuid4()},
+    [],
+    {},
+]
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize("payload", PAYLOADS)
+    def test_byte_identical_to_json_renderer(self, payload):
+        assert FastJSONRenderer().render(payload) == JSONRenderer().render(payload)
+
+    def test_none_renders_empty(self):
+        assert FastJSONRenderer().render(None) == b""
+
+    def test_indent_falls_back(self):
+        payload = {"a": [1, 2]}
+        media_type = "application/json; indent=2"
+        assert FastJSONRenderer().render(payload, media_type) == JSONRenderer().render(
+            payload, media_type
+        )
+
+
+class TestCSVRenderer:
+    def read(self, fields, rows):
+        content = "".join(CSVRenderer().stream(fields, rows))
+        return list(csv.reader(io.StringIO(content)))
+
+    @pytest.mark.parametrize(
+        "label",
+        ['=HYPERLINK("http://x")', "+1+1", "-2+3", "@SUM(A1)", "\tx", "\rx"],
+    )
+    def test_formula_cells_prefixed(self, label):
+        assert self.read(["label"], [[label]])[1] == ["'" + label]
+
+    def test_other_cells_unchanged(self):
+        rows = self.read(["label", "score"], [["Gmail = work", -5], ["", 0]])
+        assert rows == [["label", "score"], ["Gmail = work", "-5"], ["", "0"]]
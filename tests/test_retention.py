@@ -0,0 +1,82 @@
+"""
+Tests for the PasswordCheck retention policy.
+"""
+
+from datetime import timedelta
+
+import pytest
+from api.models import ArchivedStats, DailyRollup, PasswordCheck
+from api.retention import fold_into_rollups, prune_checks, retention_cutoff
+from api.rollups import record_check
+from api.stats import user_totals
+from django.utils import timezone
+
+
+def make_check(user, score, breached=False, days_ago=0, rollup=True):
+    check = PasswordCheck.objects.create(
+        user=user, hash_prefix="ABCDE", strength_score=score, is_breached=breached
+    )
+    if days_ago:
+        check.checked_at -= timedelta(days=days_ago)
+        check.save(update_fields=["checked_at"])
+    if rollup:
+        record_check(check)
+    return check
+
+
+@pytest.fixture
+def history(user):
+    make_check(user, 10, breached=True, days_ago=400)
+    make_check(user, 95, days_ago=400)
+    make_check(user, 60, breached=True, days_ago=380, rollup=False)
+    make_check(user, 75)
+    return user
+
+
+@pytest.mark.django_db
+class TestRetentionCutoff:
+    def test_aligned_to_local_midnight(self):
+        cutoff = retention_cutoff(30)
+        local = timezone.localtime(cutoff)
+        assert (local.hour, local.minute, local.second) == (0, 0, 0)
+        assert local.date() == timezone.localdate() - timedelta(days=30)
+
+    def test_disabled(self):
+        assert retention_cutoff(0) is None
+
+
+@pytest.mark.django_db
+class TestPruneChecks:
+    def test_totals_stay_exact(self, history):
+        before = user_totals(history.id)
+        result = prune_checks(retention_cutoff(365), chunk_size=1)
+
+        assert result["pruned"] == 3
+        assert result["chunks"] == 3
+        assert PasswordCheck.objects.count() == 1
+        assert user_totals(history.id) == before
+
+        archived = ArchivedStats.objects.get(user=history)
+        assert (archived.checks, archived.breached) == (3, 2)
+        assert archived.strength_total == 165
+        assert archived.archived_through is not None
+
+    def test_unrolled_days_folded_into_rollups(self, history):
+        prune_checks(retention_cutoff(365))
+        assert DailyRollup.objects.filter(user=history).count() == 3
+        assert sum(DailyRollup.objects.values_list("checks", flat=True)) == 4
+
+    def test_dry_run_changes_nothing(self, history):
+        result = prune_checks(retention_cutoff(365), dry_run=True)
+        assert result["pruned"] == 3
+        assert result["rows_per_second"] > 0
+        assert PasswordCheck.objects.count() == 4
+        assert not ArchivedStats.objects.exists()
+        assert DailyRollup.objects.filter(user=history).count() == 2
+
+    def test_fold_never_lowers_rollups(self, history):
+        old = PasswordCheck.objects.filter(checked_at__lt=retention_cutoff(365))
+        old.filter(strength_score=10).delete()  # as if a prior run was interrupted
+        assert fold_into_rollups(old) == 1  # only the never-rolled-up day
+        day_rollup = DailyRollup.objects.filter(user=history).order_by("day").first()
+        assert day_rollup.checks == 2
@@ -0,0 +1,123 @@
+"""
+Tests for refresh-token revocation.
+"""
+
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from api.models import RevokedToken
+from api.revocation import is_revoked, load_revoked, revoke, revoked_cache_key
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def login(client):
+    resp = client.post(
+        "/api/auth/login/",
+        {"username": "testuser", "password": "TestPassword123!"},
+        format="json",
+    )
+    return resp.data["refresh"]
+
+
+def refresh(client, token):
+    return client.post("/api/auth/refresh/", {"refresh": token}, format="json")
+
+
+@pytest.mark.django_db
+class TestRefreshRotation:
+    def test_rotated_token_cannot_be_reused(self, user):
+        client = APIClient()
+        first = login(client)
+        resp = refresh(client, first)
+        assert resp.status_code == 200
+        second = resp.data["refresh"]
+
+        assert refresh(client, first).status_code == 401
+        assert refresh(client, second).status_code == 200
+
+    def test_revocation_survives_cache_loss(self, user):
+        client = APIClient()
+        first = login(client)
+        assert refresh(client, first).status_code == 200
+        cache.clear()
+        assert refresh(client, first).status_code == 401
+
+    def test_logout_revokes(self, user):
+        client = APIClient()
+        token = login(client)
+        resp = client.post("/api/auth/logout/", {"refresh": token}, format="json")
+        assert resp.status_code == 200
+        assert refresh(client, token).status_code == 401
+
+
+@pytest.mark.django_db
+class TestRevoke:
+    def test_cached_for_remaining_lifetime(self, user):
+        token = RefreshToken.for_user(user)
+        with patch("api.revocation.cache.set") as cache_set:
+            revoke(token)
+        key, value, timeout = cache_set.call_args.args
+        assert (key, value) == (revoked_cache_key(token["jti"]), True)
+        lifetime = token.lifetime.total_seconds()
+        assert lifetime - 5 < timeout <= lifetime
+
+        row = RevokedToken.objects.get(jti=token["jti"])
+        assert row.expires_at.timestamp() == token["exp"]
+
+    def test_second_revoke_fails(self, user):
+        token = RefreshToken.for_user(user)
+        revoke(token)
+        with pytest.raises(TokenError):
+            revoke(token)
+
+    def test_shared_cache_answers_misses_once_loaded(
+        self, user, settings, django_assert_num_queries
+    ):
+        settings.REVOKED_TOKENS_CACHE_SHARED = True
+        revoked, live = RefreshToken.for_user(user), RefreshToken.for_user(user)
+        revoke(revoked)
+        cache.clear()
+
+        with django_assert_num_queries(1):
+            assert is_revoked(revoked["jti"])
+        assert load_revoked() == 1
+        with django_assert_num_queries(0):
+            assert is_revoked(revoked["jti"])
+            assert not is_revoked(live["jti"])
+
+    def test_private_cache_checks_database_on_miss(
+        self, user, django_assert_num_queries
+    ):
+        load_revoked()
+        with django_assert_num_queries(1):
+            assert not is_revoked(RefreshToken.for_user(user)["jti"])
+
+
+@pytest.mark.django_db
+class TestPurgeRevokedTokensCommand:
+    def test_deletes_expired_rows_in_chunks(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=f"jti-{index}", expires_at=now + timedelta(days=days))
+            for index, days in enumerate([-2, -1, -1, 1])
+        )
+        out = io.StringIO()
+        call_command(
+            "purge_revoked_tokens",
+            "--batch-size",
+            "2",
+            "--prime-cache",
+            stdout=out,
+        )
+        assert "Purged 3 expired revoked tokens in 2 chunks" in out.getvalue()
+        assert "rows/s" in out.getvalue()
+        assert "Cached 1 revoked tokens" in out.getvalue()
+        assert list(RevokedToken.objects.values_list("jti", flat=True)) == ["jti-3"]
+        assert cache.get(revoked_cache_key("jti-3"))
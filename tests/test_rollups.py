@@ -0,0 +1,66 @@
+"""
+Tests for daily rollups of password checks.
+"""
+
+from datetime import timedelta
+
+import pytest
+from api.models import DailyRollup, PasswordCheck
+from api.rollups import backfill_rollups, record_check
+from django.utils import timezone
+
+
+def make_check(user, score, breached=False, days_ago=0):
+    check = PasswordCheck.objects.create(
+        user=user, hash_prefix="ABCDE", strength_score=score, is_breached=breached
+    )
+    if days_ago:
+        check.checked_at -= timedelta(days=days_ago)
+        check.save(update_fields=["checked_at"])
+    return check
+
+
+@pytest.mark.django_db
+class TestRecordCheck:
+    def test_first_check_creates_row(self, user):
+        record_check(make_check(user, 95, breached=True))
+        rollup = DailyRollup.objects.get(user=user)
+        assert rollup.day == timezone.localdate()
+        assert rollup.checks == 1
+        assert rollup.breached == 1
+        assert rollup.very_strong == 1
+        assert rollup.avg_strength == 95
+
+    def test_increments_existing_row(self, user):
+        for score in (10, 40, 60, 80):
+            record_check(make_check(user, score))
+        rollup = DailyRollup.objects.get(user=user)
+        assert rollup.checks == 4
+        assert rollup.breached == 0
+        assert rollup.strength_total == 190
+        assert (rollup.weak, rollup.fair, rollup.good, rollup.strong) == (1, 1, 1, 1)
+
+    def test_separate_rows_per_day(self, user):
+        record_check(make_check(user, 50))
+        record_check(make_check(user, 50, days_ago=3))
+        assert DailyRollup.objects.filter(user=user).count() == 2
+
+
+@pytest.mark.django_db
+class TestBackfillRollups:
+    def test_backfill_matches_incremental(self, user):
+        for score, breached, days_ago in [(10, True, 0), (95, False, 0), (55, True, 2)]:
+            record_check(make_check(user, score, breached, days_ago))
+        incremental = list(DailyRollup.objects.values())
+
+        DailyRollup.objects.all().delete()
+        assert backfill_rollups(batch_size=1) == 2
+        rebuilt = list(DailyRollup.objects.values())
+        strip = [{k: v for k, v in row.items() if k != "id"} for row in incremental]
+        assert [{k: v for k, v in row.items() if k != "id"} for row in rebuilt] == strip
+
+    def test_backfill_overwrites_drift(self, user):
+        record_check(make_check(user, 95))
+        DailyRollup.objects.update(checks=99)
+        backfill_rollups()
+        assert DailyRollup.objects.get(user=user).checks == 1
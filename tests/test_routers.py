@@ -0,0 +1,123 @@
+"""
+Tests for read-replica routing.
+Uses a second SQLite file as the replica, holding deliberately different
+rows so each response shows which database served it.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from api.models import DailyRollup, PasswordCheck, UserStats
+from api.routers import REPLICA_DB_ALIAS, ReplicaRouter, read_alias_for
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+
+def add_replica(name):
+    connections.settings[REPLICA_DB_ALIAS] = connections.configure_settings(
+        {
+            DEFAULT_DB_ALIAS: {},
+            REPLICA_DB_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": name},
+        }
+    )[REPLICA_DB_ALIAS]
+
+    # Django's test case refuses first connections to aliases it was not
+    # set up with; connect the same way BaseDatabaseWrapper does
+    replica = connections[REPLICA_DB_ALIAS]
+
+    def ensure_connection():
+        if replica.connection is None:
+            with replica.wrap_database_errors:
+                replica.connect()
+
+    replica.ensure_connection = ensure_connection
+
+
+def remove_replica():
+    if REPLICA_DB_ALIAS in connections.settings:
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+
+
+@pytest.fixture
+def replica(tmp_path, user):
+    """A replica SQLite file with its own copy of `user` and one check"""
+    PasswordCheck.objects.create(user=user, hash_prefix="AAAAA", label="primary")
+    add_replica(str(tmp_path / "replica.sqlite3"))
+    try:
+        with connections[REPLICA_DB_ALIAS].schema_editor() as editor:
+            for model in (User, PasswordCheck, UserStats, DailyRollup):
+                editor.create_model(model)
+        user.save(using=REPLICA_DB_ALIAS, force_insert=True)
+        PasswordCheck(user_id=user.id, hash_prefix="BBBBB", label="replica").save(
+            using=REPLICA_DB_ALIAS
+        )
+        cache.clear()
+        yield
+    finally:
+        remove_replica()
+
+
+def history_labels(client):
+    return [row["label"] for row in client.get("/api/passwords/history/").json()]
+
+
+def authed_client():
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+    return client
+
+
+class TestReplicaRouter:
+    def test_writes_and_migrations_stay_on_primary(self):
+        router = ReplicaRouter()
+        assert router.db_for_write(PasswordCheck) == DEFAULT_DB_ALIAS
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, "api")
+        assert not router.allow_migrate(REPLICA_DB_ALIAS, "api")
+
+    def test_reads_outside_views_use_primary(self):
+        assert ReplicaRouter().db_for_read(PasswordCheck) is None
+
+    def test_no_replica_configured(self):
+        assert read_alias_for(1) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.django_db
+class TestReplicaReads:
+    def test_dashboard_reads_served_by_replica(self, replica):
+        client = authed_client()
+        assert history_labels(client) == ["replica"]
+
+        export = client.get("/api/passwords/history/export/")
+        assert b"replica" in b"".join(export.streaming_content)
+
+    def test_own_writes_pin_user_to_primary(self, replica, settings):
+        client = authed_client()
+        assert history_labels(client) == ["replica"]
+
+        with patch("api.views.check_hibp_breach", return_value=(False, 0)):
+            client.post(
+                "/api/passwords/check/",
+                {"password": "Tr0ub4dor&3xPlorer!", "label": "new"},
+                format="json",
+            )
+        assert history_labels(client) == ["new", "primary"]
+
+        cache.clear()  # pin expired
+        assert history_labels(client) == ["replica"]
+
+    def test_unreachable_replica_falls_back_to_primary(self, tmp_path, user):
+        PasswordCheck.objects.create(user=user, hash_prefix="AAAAA", label="primary")
+        add_replica(str(tmp_path / "missing" / "replica.sqlite3"))
+        try:
+            cache.clear()
+            client = authed_client()
+            assert history_labels(client) == ["primary"]
+            assert cache.get("db:replica-down")
+        finally:
+            remove_replica()
@@ -6,7 +6,10 @@ Tests password strength logic, HIBP integration (mocked), and hash utilities.
 import hashlib
 from unittest.mock import MagicMock, patch
 
+from api.hibp import RangeTable, range_cache_key
+from api.policy import get_policy
 from api.services import (
+    PasswordAnalysis,
     calculate_password_strength,
     check_hibp_breach,
     get_hash_prefix,
@@ -14,6 +17,7 @@ from api.services import (
     has_sequential_chars,
     is_common_password,
 )
+from django.core.cache import cache
 
 # ---------------------------------------------------------------------------
 # calculate_password_strength
@@ -179,13 +183,48 @@ class TestGetHashPrefix:
         assert get_hash_prefix(pw) == expected
 
 
+# ---------------------------------------------------------------------------
+# PasswordAnalysis
+# ---------------------------------------------------------------------------
+
+
+class TestPasswordAnalysis:
+    def test_derived_values(self):
+        analysis = PasswordAnalysis("Secret-Secret")
+        digest = hashlib.sha1(b"Secret-Secret").hexdigest().upper()
+        assert analysis.sha1 == digest
+        assert (analysis.hash_prefix, analysis.hash_suffix) == (digest[:5], digest[5:])
+        assert analysis.lower == "secret-secret"
+        assert analysis.chars == frozenset("Secret-")
+
+    def test_one_check_hashes_once(self):
+        password = "Tr0ub4dor&3xPlorer!"
+        prefix = get_hash_prefix(password)
+        cache.set(range_cache_key(prefix), RangeTable.parse(prefix, ""))
+        analysis = PasswordAnalysis(password)
+        with patch("api.services.hashlib.sha1", wraps=hashlib.sha1) as sha1:
+            calculate_password_strength(analysis)
+            check_hibp_breach(analysis)
+            get_hash_prefix(analysis)
+        assert sha1.call_count == 1
+
+    def test_features_memoized_per_policy(self):
+        plan = get_policy()
+        analysis = PasswordAnalysis("abc")
+        with patch.object(plan, "features", wraps=plan.features) as features:
+            first = calculate_password_strength(analysis)
+            assert calculate_password_strength(analysis) == first
+        assert features.call_count == 1
+        assert first == calculate_password_strength("abc")
+
+
 # ---------------------------------------------------------------------------
 # check_hibp_breach  (mocked)
 # ---------------------------------------------------------------------------
 
 
 class TestCheckHibpBreach:
-    @patch("api.services.requests.get")
+    @patch("requests.get")
     def test_breached_password_detected(self, mock_get):
         """If HIBP returns our suffix, is_breached=True with correct count."""
         pw = "password"
@@ -201,7 +240,7 @@ class TestCheckHibpBreach:
         assert is_breached is True
         assert count == 12345
 
-    @patch("api.services.requests.get")
+    @patch("requests.get")
     def test_clean_password_not_breached(self, mock_get):
         """If our suffix is absent from HIBP response, not breached."""
         mock_response = MagicMock()
@@ -213,7 +252,7 @@ class TestCheckHibpBreach:
         assert is_breached is False
         assert count == 0
 
-    @patch("api.services.requests.get")
+    @patch("requests.get")
     def test_api_error_returns_safe_default(self, mock_get):
         """Network error → treat as not breached (fail open)."""
         import requests as req_lib
@@ -224,7 +263,7 @@ class TestCheckHibpBreach:
         assert is_breached is False
         assert count == 0
 
-    @patch("api.services.requests.get")
+    @patch("requests.get")
     def test_api_non_200_returns_false(self, mock_get):
         """Non-200 status → treat as not breached."""
         mock_response = MagicMock()
@@ -235,7 +274,7 @@ class TestCheckHibpBreach:
         assert is_breached is False
         assert count == 0
 
-    @patch("api.services.requests.get")
+    @patch("requests.get")
     def test_k_anonymity_prefix_sent(self, mock_get):
         """Verify only the 5-char prefix is sent to HIBP (k-anonymity)."""
         mock_response = MagicMock()
@@ -0,0 +1,178 @@
+"""
+Tests for the token-bucket rate limiter.
+Tests burst capacity, refill, refunds, per-client keys and the 429 response.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from api.throttling import TokenBucketThrottle
+from django.conf import settings
+from django.test import override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+
+QUICK_CHECK = "/api/passwords/quick-check/"
+
+
+def throttle_settings(rate):
+    return override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"quick_check": rate},
+        }
+    )
+
+
+class FakeView:
+    throttle_scope = "quick_check"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(ip="10.0.0.1", **headers):
+    request = APIRequestFactory().post(QUICK_CHECK, REMOTE_ADDR=ip, **headers)
+    request.user = None
+    return request
+
+
+def allow(throttle, request):
+    return throttle.allow_request(request, FakeView())
+
+
+# ---------------------------------------------------------------------------
+# TokenBucketThrottle
+# ---------------------------------------------------------------------------
+
+
+class TestTokenBucketThrottle:
+    @pytest.fixture(autouse=True)
+    def clock(self):
+        clock = Clock()
+        with throttle_settings("3/min"), patch.object(
+            TokenBucketThrottle, "timer", clock
+        ):
+            yield clock
+
+    def test_burst_then_refused(self):
+        throttle, request = TokenBucketThrottle(), make_request()
+        assert [allow(throttle, request) for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+        assert throttle.wait() == pytest.approx(20)
+
+    def test_refills_one_token_per_interval(self, clock):
+        throttle, request = TokenBucketThrottle(), make_request()
+        for _ in range(3):
+            allow(throttle, request)
+
+        clock.now += 19.9
+        assert not allow(throttle, request)
+        clock.now += 0.1
+        assert allow(throttle, request)
+        assert not allow(throttle, request)
+
+    def test_refused_requests_do_not_extend_wait(self, clock):
+        throttle, request = TokenBucketThrottle(), make_request()
+        for _ in range(3):
+            allow(throttle, request)
+        for _ in range(50):
+            assert not allow(throttle, request)
+
+        clock.now += 20
+        assert allow(throttle, request)
+
+    def test_idle_bucket_refills_to_capacity_only(self, clock):
+        throttle, request = TokenBucketThrottle(), make_request()
+        allow(throttle, request)
+
+        clock.now += 3600
+        assert [allow(throttle, request) for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+    def test_clients_have_separate_buckets(self):
+        throttle = TokenBucketThrottle()
+        for _ in range(3):
+            allow(throttle, make_request("10.0.0.1"))
+        assert not allow(throttle, make_request("10.0.0.1"))
+        assert allow(throttle, make_request("10.0.0.2"))
+
+    def test_spoofed_forwarded_for_keeps_bucket(self):
+        throttle = TokenBucketThrottle()
+        for index in range(3):
+            allow(throttle, make_request(HTTP_X_FORWARDED_FOR=f"192.0.2.{index}"))
+        assert not allow(throttle, make_request(HTTP_X_FORWARDED_FOR="192.0.2.9"))
+
+    def test_client_address_appended_by_proxy(self):
+        throttle = TokenBucketThrottle()
+        with override_settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        ):
+            for index in range(3):
+                request = make_request(
+                    HTTP_X_FORWARDED_FOR=f"192.0.2.{index}, 10.9.9.9"
+                )
+                allow(throttle, request)
+            assert not allow(throttle, make_request(HTTP_X_FORWARDED_FOR="10.9.9.9"))
+            assert allow(throttle, make_request(HTTP_X_FORWARDED_FOR="10.9.9.8"))
+
+    def test_view_without_scope_is_not_throttled(self):
+        throttle = TokenBucketThrottle()
+        for _ in range(10):
+            assert throttle.allow_request(make_request(), object())
+
+    def test_rate_none_disables(self):
+        throttle = TokenBucketThrottle()
+        with throttle_settings(None):
+            for _ in range(10):
+                assert allow(throttle, make_request())
+
+
+# ---------------------------------------------------------------------------
+# Endpoint integration
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestQuickCheckThrottled:
+    @patch("api.views.check_hibp_breach", return_value=(False, 0))
+    @patch("api.views.calculate_password_strength")
+    def test_429_with_retry_after_before_any_work(self, mock_strength, mock_hibp):
+        mock_strength.return_value = {
+            "score": 50,
+            "strength": "good",
+            "feedback": [],
+            "criteria": {},
+        }
+        client = APIClient()
+        with throttle_settings("2/min"):
+            for _ in range(2):
+                resp = client.post(QUICK_CHECK, {"password": "abc"}, format="json")
+                assert resp.status_code == 200
+            resp = client.post(QUICK_CHECK, {"password": "abc"}, format="json")
+
+        assert resp.status_code == 429
+        assert resp["Retry-After"] == "30"
+        assert mock_strength.call_count == 2
+        assert mock_hibp.call_count == 2
+
+    @patch("api.views.check_hibp_breach", return_value=(False, 0))
+    def test_authenticated_users_keyed_by_id(self, mock_hibp, user):
+        anonymous, signed_in = APIClient(), APIClient()
+        signed_in.force_authenticate(user)
+        with throttle_settings("1/min"):
+            assert anonymous.post(QUICK_CHECK, {"password": "x"}).status_code == 200
+            assert signed_in.post(QUICK_CHECK, {"password": "x"}).status_code == 200
+            assert signed_in.post(QUICK_CHECK, {"password": "x"}).status_code == 429
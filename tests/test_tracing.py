@@ -0,0 +1,201 @@
+"""
+Tests for request tracing.
+Tests span nesting and export, propagation and the traced check request.
+"""
+
+import contextvars
+import io
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from api import tracing
+from api.hibp import RangeTable, range_cache_key
+from api.middleware import TracingMiddleware
+from api.models import PasswordCheck
+from api.onboarding import start_import
+from api.services import get_hash_prefix
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from .test_views import get_tokens
+
+
+@pytest.fixture
+def traced(settings):
+    settings.TRACING_SAMPLE_RATE = 1
+    settings.TRACING_BUFFER_SIZE = 100
+    return tracing.get_exporter()
+
+
+class TestSpans:
+    def test_no_op_outside_a_trace(self, traced):
+        with tracing.span("phase") as span:
+            span.set(rows=1)
+        assert span is tracing.NOOP_SPAN
+        assert not traced.spans
+
+    def test_children_nest_and_export_in_end_order(self, traced):
+        with tracing.start_trace("root") as root:
+            with tracing.span("child", policy="default") as child:
+                child.add("db.queries", 2)
+        inner, outer = traced.spans
+        assert (inner["name"], outer["name"]) == ("child", "root")
+        assert inner["trace_id"] == outer["trace_id"] == root.trace_id
+        assert inner["parent_id"] == outer["span_id"]
+        assert inner["attributes"] == {"policy": "default", "db.queries": 2}
+        assert outer["attributes"] == {"db.queries": 2}
+        assert outer["duration_ms"] >= inner["duration_ms"]
+
+    def test_errors_recorded(self, traced):
+        with pytest.raises(KeyError):
+            with tracing.start_trace("root"):
+                raise KeyError("x")
+        assert traced.spans[0]["attributes"]["error"] == "KeyError"
+
+    def test_json_lines_exporter(self, settings, tmp_path):
+        settings.TRACING_FILE = str(tmp_path / "spans.jsonl")
+        with tracing.start_trace("root"):
+            with tracing.span("child"):
+                pass
+        lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["child", "root"]
+
+
+class TestPropagation:
+    def test_threads_continue_the_trace(self, traced):
+        def work():
+            with tracing.span("worker"):
+                pass
+
+        with tracing.start_trace("root") as root:
+            thread = threading.Thread(target=tracing.propagate(work))
+            thread.start()
+            thread.join()
+        worker = traced.spans[0]
+        assert (worker["name"], worker["parent_id"]) == ("worker", root.span_id)
+
+    def test_inject_and_extract(self, traced):
+        assert tracing.inject() is None
+        assert tracing.extract(None, "job") is tracing.NOOP_SPAN
+        with tracing.start_trace("root") as root:
+            carrier = tracing.inject()
+        with tracing.extract(carrier, "job") as job:
+            pass
+        assert (job.trace_id, job.parent_id) == (root.trace_id, root.span_id)
+
+    @pytest.mark.django_db
+    def test_import_thread_and_hash_pool_continue_the_trace(self, traced, settings):
+        settings.IMPORT_USERS_WORKERS = 2
+
+        class FreshContextThread:
+            """Runs the target synchronously in an empty context, as a thread would"""
+
+            def __init__(self, target, **kwargs):
+                self.target = target
+
+            def start(self):
+                contextvars.Context().run(self.target)
+
+        class FreshContextPool:
+            """Maps in empty contexts, as another process would"""
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return None
+
+            def map(self, fn, *iterables):
+                return [
+                    contextvars.Context().run(fn, *args) for args in zip(*iterables)
+                ]
+
+        users = [{"username": "alice", "email": "", "password": "Alice-Secret-1"}]
+        with patch("api.onboarding.connections"), patch(
+            "api.onboarding.threading.Thread", FreshContextThread
+        ), patch("api.onboarding.ProcessPoolExecutor", return_value=FreshContextPool()):
+            with tracing.start_trace("http.request") as root:
+                start_import(None, users)
+        spans = {span["name"]: span for span in traced.spans}
+        assert {span["trace_id"] for span in traced.spans} == {root.trace_id}
+        assert spans["import.run"]["parent_id"] == root.span_id
+        assert spans["import.hash"]["parent_id"] == spans["import.batch"]["span_id"]
+
+    @pytest.mark.django_db
+    @patch("requests.get")
+    def test_warm_hibp_cache_traces_fetches(self, mock_get, traced, user):
+        mock_get.return_value = MagicMock(status_code=200, text="")
+        for prefix in ("AAAAA", "BBBBB"):
+            PasswordCheck.objects.create(user=user, hash_prefix=prefix)
+        call_command("backfill_prefixes", stdout=io.StringIO())
+        call_command(
+            "warm_hibp_cache",
+            "--workers",
+            "2",
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+        fetches = [span for span in traced.spans if span["name"] == "hibp.fetch"]
+        root = traced.spans[-1]
+        assert (root["name"], root["attributes"]["fetched"]) == ("hibp.warm", 2)
+        assert len(fetches) == 2
+        assert {span["parent_id"] for span in fetches} == {root["span_id"]}
+        assert {span["trace_id"] for span in fetches} == {root["trace_id"]}
+
+
+@pytest.mark.django_db
+class TestTracedRequests:
+    def test_removed_when_disabled(self, settings):
+        settings.TRACING_SAMPLE_RATE = 0
+        with pytest.raises(MiddlewareNotUsed):
+            TracingMiddleware(lambda request: None)
+
+    def test_password_check_phases(self, traced, user):
+        password = "Tr0ub4dor&3xPlorer!"
+        prefix = get_hash_prefix(password)
+        cache.set(range_cache_key(prefix), RangeTable.parse(prefix, ""))
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        traced.spans.clear()
+        resp = client.post(
+            "/api/passwords/check/", {"password": password}, format="json"
+        )
+        trace_id = resp["X-Trace-Id"]
+        spans = {span["name"]: span for span in traced.spans}
+        assert {span["trace_id"] for span in traced.spans} == {trace_id}
+        assert set(spans) == {
+            "password.strength",
+            "hibp.range",
+            "hibp.check",
+            "db.insert",
+            "stats.update",
+            "rollup.record",
+            "latest.record",
+            "prefix.record",
+            "http.request",
+        }
+        assert spans["hibp.range"]["attributes"] == {"cache_hit": True}
+        assert spans["stats.update"]["attributes"]["rows"] == 1
+        assert spans["db.insert"]["attributes"]["db.queries"] >= 1
+        root = spans["http.request"]["attributes"]
+        assert root["route"] == "api/passwords/check/"
+        assert root["status"] == 200
+        assert root["db.queries"] >= spans["stats.update"]["attributes"]["db.queries"]
+
+    def test_trace_listing_admin_only(self, traced, admin_user, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION="Bearer "
+            + get_tokens(client, "admin", "AdminPassword123!")
+        )
+        trace_id = client.get("/api/health/")["X-Trace-Id"]
+        resp = client.get(f"/api/admin/traces/?trace_id={trace_id}")
+        assert [span["name"] for span in resp.data["spans"]] == ["http.request"]
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        assert client.get("/api/admin/traces/").status_code == 403
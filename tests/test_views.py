@@ -3,11 +3,23 @@ Integration tests for API endpoints.
 Tests registration, JWT auth, password checking, history, and stats.
 """
 
-from unittest.mock import patch
+import csv
+import gzip
+import hashlib
+import io
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
 
 import pytest
+from api.latest import backfill_latest
+from api.models import PasswordCheck
+from api.serializers import PasswordCheckSerializer
+from api.services import PasswordAnalysis, calculate_password_strength
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 # ---------------------------------------------------------------------------
@@ -126,11 +138,30 @@ class TestQuickCheckView:
             "/api/passwords/quick-check/", {"password": ""}, format="json"
         )
         assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.data == {"error": "Password is required"}
 
     def test_quick_check_missing_password(self):
         client = APIClient()
         resp = client.post("/api/passwords/quick-check/", {}, format="json")
         assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.data == {"error": "Password is required"}
+
+    @patch("api.views.check_hibp_breach", return_value=(False, 0))
+    def test_quick_check_keeps_surrounding_whitespace(self, mock_hibp):
+        client = APIClient()
+        with patch("api.views.PasswordAnalysis", wraps=PasswordAnalysis) as analysis:
+            resp = client.post(
+                "/api/passwords/quick-check/",
+                {"password": "  Abc123!  "},
+                format="json",
+            )
+            assert resp.status_code == status.HTTP_200_OK
+            analysis.assert_called_once_with("  Abc123!  ")
+
+            resp = client.post(
+                "/api/passwords/quick-check/", {"password": "   "}, format="json"
+            )
+        assert resp.status_code == status.HTTP_200_OK
 
     @patch("api.views.check_hibp_breach", return_value=(True, 999))
     def test_quick_check_detects_breach(self, mock_hibp):
@@ -144,6 +175,51 @@ class TestQuickCheckView:
         assert resp.data["is_breached"] is True
         assert resp.data["breach_count"] == 999
 
+    @patch("api.views.check_hibp_breach", return_value=(False, 0))
+    def test_quick_check_with_named_policy(self, mock_hibp, settings):
+        settings.PASSWORD_POLICIES = {
+            "strict": {
+                "rules": [
+                    {
+                        "name": "length",
+                        "min_length": 20,
+                        "points": 100,
+                        "required": True,
+                    }
+                ]
+            }
+        }
+        client = APIClient()
+        resp = client.post(
+            "/api/passwords/quick-check/",
+            {"password": "Tr0ub4dor&3xPlorer!", "policy": "strict"},
+            format="json",
+        )
+        assert resp.data["score"] == 0
+        assert resp.data["compliant"] is False
+
+        resp = client.post(
+            "/api/passwords/quick-check/",
+            {"password": "x", "policy": "missing"},
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.data == {"error": "Unknown password policy."}
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"password": "Tr0ub4dor&3xPlorer!", "policy": ["default"]},
+            {"password": "Tr0ub4dor&3xPlorer!", "policy": {"x": 1}},
+            {"password": ["Tr0ub4dor&3xPlorer!"]},
+        ],
+    )
+    def test_quick_check_rejects_non_string_fields(self, body):
+        client = APIClient()
+        resp = client.post("/api/passwords/quick-check/", body, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "error" in resp.data
+
 
 # ---------------------------------------------------------------------------
 # Authenticated Password Check
@@ -187,6 +263,73 @@ class TestPasswordCheckView:
         assert resp.status_code == status.HTTP_400_BAD_REQUEST
 
 
+# ---------------------------------------------------------------------------
+# Password generation
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestPasswordGenerateView:
+    def authed_client(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        return client
+
+    def test_generate_json(self, user):
+        resp = self.authed_client().post(
+            "/api/passwords/generate/", {"count": 5, "length": 12}, format="json"
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["score"] == 90
+        assert data["strength"] == "very_strong"
+        assert len(data["passwords"]) == 5
+        for password in data["passwords"]:
+            assert len(password) == 12
+            assert calculate_password_strength(password)["score"] == 90
+
+    def test_large_batch_streams_same_document(self, user, settings):
+        settings.GENERATE_STREAM_THRESHOLD = 10
+        resp = self.authed_client().post(
+            "/api/passwords/generate/", {"count": 1200}, format="json"
+        )
+        assert resp.streaming
+        data = json.loads(b"".join(resp.streaming_content))
+        assert data["count"] == 1200
+        assert data["score"] == 100
+        assert len(set(data["passwords"])) == 1200
+
+    def test_ndjson_streams_one_per_line(self, user):
+        resp = self.authed_client().post(
+            "/api/passwords/generate/?format=ndjson", {"count": 3}, format="json"
+        )
+        assert resp.streaming
+        assert resp["Content-Type"].startswith("application/x-ndjson")
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        assert [len(json.loads(line)["password"]) for line in lines] == [16] * 3
+
+    def test_unreachable_policy_rejected(self, user):
+        resp = self.authed_client().post(
+            "/api/passwords/generate/",
+            {"length": 8, "symbols": False, "min_score": 90},
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "scores at most" in resp.json()["non_field_errors"][0]
+
+    def test_count_capped(self, user, settings):
+        settings.GENERATE_MAX_COUNT = 10
+        resp = self.authed_client().post(
+            "/api/passwords/generate/", {"count": 11}, format="json"
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "count" in resp.json()
+
+    def test_requires_authentication(self):
+        resp = APIClient().post("/api/passwords/generate/", {}, format="json")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 # ---------------------------------------------------------------------------
 # Password History
 # ---------------------------------------------------------------------------
@@ -217,6 +360,101 @@ class TestPasswordHistoryView:
         assert len(resp.data) >= 1
 
 
+# ---------------------------------------------------------------------------
+# Serializer-free fast path
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestFastHistoryPath:
+    def test_history_bytes_match_serializer_output(self, user):
+        for i, label in enumerate(["Gmail", "Bank — café", ""]):
+            PasswordCheck.objects.create(
+                user=user,
+                hash_prefix="ABCDE",
+                label=label,
+                strength_score=i * 40,
+                is_breached=bool(i % 2),
+                breach_count=i * 1000,
+            )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+
+        resp = client.get("/api/passwords/history/")
+        expected = JSONRenderer().render(
+            PasswordCheckSerializer(
+                PasswordCheck.objects.filter(user=user)[:50], many=True
+            ).data
+        )
+        assert resp.content == expected
+
+        stats = client.get("/api/stats/")
+        recent = PasswordCheckSerializer(
+            PasswordCheck.objects.filter(user=user)[:5], many=True
+        ).data
+        assert stats.json()["recent_checks"] == json.loads(
+            JSONRenderer().render(recent)
+        )
+
+
+# ---------------------------------------------------------------------------
+# History export (streamed)
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestPasswordHistoryExportView:
+    def setup_history(self, user):
+        other = User.objects.create_user("other", password="OtherPass123!")
+        PasswordCheck.objects.create(user=other, hash_prefix="FFFFF", label="Other")
+        for i in range(3):
+            PasswordCheck.objects.create(
+                user=user, hash_prefix="ABCDE", label=f"Site, {i}", strength_score=i
+            )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        return client
+
+    def test_ndjson_export_streams_own_rows(self, user):
+        client = self.setup_history(user)
+        resp = client.get("/api/passwords/history/export/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.streaming
+        assert resp["Content-Type"].startswith("application/x-ndjson")
+
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert len(rows) == 3
+        assert {row["label"] for row in rows} == {"Site, 0", "Site, 1", "Site, 2"}
+        history = client.get("/api/passwords/history/").json()
+        assert rows == history
+
+    def test_csv_export(self, user):
+        client = self.setup_history(user)
+        resp = client.get("/api/passwords/history/export/", {"format": "csv"})
+        assert resp["Content-Type"].startswith("text/csv")
+        assert "password-history.csv" in resp["Content-Disposition"]
+
+        content = b"".join(resp.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        assert rows[0] == [
+            "id",
+            "label",
+            "strength_score",
+            "is_breached",
+            "breach_count",
+            "checked_at",
+            "hit_count",
+            "last_checked_at",
+        ]
+        assert len(rows) == 4
+        assert rows[1][1].startswith("Site, ")
+
+    def test_unauthenticated_export_rejected(self):
+        resp = APIClient().get("/api/passwords/history/export/")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 # ---------------------------------------------------------------------------
 # User Stats
 # ---------------------------------------------------------------------------
@@ -243,3 +481,298 @@ class TestUserStatsView:
             "strength_distribution",
         ):
             assert key in resp.data, f"Missing key: {key}"
+
+
+# ---------------------------------------------------------------------------
+# Stateless JWT authentication (history/stats hot path)
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+    def test_history_skips_user_lookup_once_cached(
+        self, user, django_assert_num_queries
+    ):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        client.get("/api/passwords/history/")  # primes the active-status cache
+
+        # Latest-check validator lookup + the history read; no users query
+        with django_assert_num_queries(2):
+            resp = client.get("/api/passwords/history/")
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_stats_served_with_token_user(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        resp = client.get("/api/stats/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["total_checks"] == 0
+
+    def test_deactivated_user_rejected(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        assert client.get("/api/stats/").status_code == status.HTTP_200_OK
+
+        user.is_active = False
+        user.save()
+        resp = client.get("/api/stats/")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# ---------------------------------------------------------------------------
+# Breach range proxy (client-side k-anonymity)
+# ---------------------------------------------------------------------------
+
+
+def mock_range_response(text, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    return response
+
+
+@pytest.mark.django_db
+class TestBreachRangeView:
+    @patch("requests.get")
+    def test_range_served_with_padding_and_cache_headers(self, mock_get):
+        sha1 = hashlib.sha1(b"password").hexdigest().upper()
+        mock_get.return_value = mock_range_response(f"{sha1[5:]}:42")
+
+        resp = APIClient().get(f"/api/breach/range/{sha1[:5].lower()}/")
+        assert resp.status_code == status.HTTP_200_OK
+        lines = resp.content.decode().split("\r\n")
+        assert f"{sha1[5:]}:42" in lines
+        assert len(lines) >= 1000
+        assert all(line.endswith(":0") for line in lines if line[:35] != sha1[5:])
+        assert "public" in resp["Cache-Control"]
+        assert "max-age" in resp["Cache-Control"]
+        assert resp["ETag"]
+
+    @patch("requests.get")
+    def test_etag_revalidation_and_cache(self, mock_get):
+        mock_get.return_value = mock_range_response("A" * 35 + ":1")
+        client = APIClient()
+
+        first = client.get("/api/breach/range/ABCDE/")
+        second = client.get(
+            "/api/breach/range/ABCDE/", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b""
+        assert mock_get.call_count == 1
+
+    def test_invalid_prefix_rejected(self):
+        resp = APIClient().get("/api/breach/range/XYZ12/")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    @patch("requests.get")
+    def test_upstream_failure(self, mock_get):
+        mock_get.return_value = mock_range_response("", status_code=503)
+        resp = APIClient().get("/api/breach/range/ABCDE/")
+        assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+# ---------------------------------------------------------------------------
+# Current health (latest check per label)
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestCurrentHealthView:
+    def check(self, client, password, label, breached=False):
+        with patch("api.views.check_hibp_breach", return_value=(breached, 7)):
+            client.post(
+                "/api/passwords/check/",
+                {"password": password, "label": label},
+                format="json",
+            )
+
+    def test_rechecks_count_once(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        self.check(client, "abc", "Gmail", breached=True)
+        self.check(client, "Tr0ub4dor&3xPlorer!", "Gmail")
+        self.check(client, "Tr0ub4dor&3xPlorer!", "Gmail")
+        self.check(client, "qwerty", "Bank", breached=True)
+
+        data = client.get("/api/stats/current/").json()
+        assert data["passwords_tracked"] == 2
+        assert data["breached_count"] == 1
+        assert [p["label"] for p in data["passwords"]] == ["Bank", "Gmail"]
+        assert data["passwords"][1]["strength"] == "very_strong"
+        assert sum(data["strength_distribution"].values()) == 2
+
+        stats = client.get("/api/stats/").json()
+        assert stats["total_checks"] == 4
+        assert stats["breached_count"] == 2
+
+    def test_empty(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        data = client.get("/api/stats/current/").json()
+        assert data["passwords_tracked"] == 0
+        assert data["security_score"] == 0
+        assert data["passwords"] == []
+
+    def test_reads_one_row_per_label(self, user, django_assert_num_queries):
+        for _ in range(20):
+            PasswordCheck.objects.create(user=user, hash_prefix="ABCDE", label="x")
+        backfill_latest()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        client.get("/api/stats/current/")  # warm the active-user cache
+        # Conditional-GET validator lookup plus the LatestCheck read
+        with django_assert_num_queries(2):
+            data = client.get("/api/stats/current/").json()
+        assert data["passwords_tracked"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Time series
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestTimeSeriesView:
+    def auth_client(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        return client
+
+    @patch("api.views.check_hibp_breach", return_value=(True, 5))
+    def test_checks_appear_in_today_rollup(self, mock_hibp, user):
+        client = self.auth_client()
+        for pw in ("abc", "Tr0ub4dor&3xPlorer!"):
+            client.post("/api/passwords/check/", {"password": pw}, format="json")
+
+        resp = client.get("/api/stats/timeseries/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["days"]) == 1
+        today = resp.data["days"][0]
+        assert today["day"] == resp.data["end"]
+        assert today["checks"] == 2
+        assert today["breached"] == 2
+        assert sum(today["strength_distribution"].values()) == 2
+
+    def test_range_filters_and_validation(self, user, django_assert_num_queries):
+        client = self.auth_client()
+        client.get("/api/stats/timeseries/")  # primes the active-status cache
+
+        # Latest-check validator lookup + one rollup range query
+        with django_assert_num_queries(2):
+            resp = client.get(
+                "/api/stats/timeseries/", {"start": "2020-01-01", "end": "2020-12-31"}
+            )
+        assert resp.data["days"] == []
+        assert resp.data["start"] == "2020-01-01"
+
+        bad = client.get("/api/stats/timeseries/", {"start": "yesterday"})
+        assert bad.status_code == status.HTTP_400_BAD_REQUEST
+        reversed_range = client.get(
+            "/api/stats/timeseries/", {"start": "2021-01-02", "end": "2021-01-01"}
+        )
+        assert reversed_range.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_default_window_revalidates_after_midnight(self, user):
+        PasswordCheck.objects.create(user=user, hash_prefix="ABCDE")
+        client = self.auth_client()
+        today = timezone.localdate()
+        first = client.get("/api/stats/timeseries/")
+        same_day = {
+            "HTTP_IF_NONE_MATCH": first["ETag"],
+            "HTTP_IF_MODIFIED_SINCE": first["Last-Modified"],
+        }
+        assert client.get("/api/stats/timeseries/", **same_day).status_code == 304
+
+        tomorrow = today + timedelta(days=1)
+        with patch("django.utils.timezone.localdate", return_value=tomorrow):
+            etag = client.get(
+                "/api/stats/timeseries/", HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+            since = client.get(
+                "/api/stats/timeseries/",
+                HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+            )
+        for resp in (etag, since):
+            assert resp.status_code == status.HTTP_200_OK
+            assert resp.data["end"] == tomorrow.isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Conditional GETs and compression
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def auth_client(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        return client
+
+    def test_validators_and_304(self, user, django_assert_num_queries):
+        PasswordCheck.objects.create(user=user, hash_prefix="ABCDE")
+        client = self.auth_client()
+
+        first = client.get("/api/stats/")
+        assert first.status_code == status.HTTP_200_OK
+        assert first["ETag"].startswith('W/"')
+        assert "Last-Modified" in first
+        assert "no-cache" in first["Cache-Control"]
+
+        with django_assert_num_queries(1):
+            again = client.get("/api/stats/", HTTP_IF_NONE_MATCH=first["ETag"])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again.content == b""
+
+        since = client.get(
+            "/api/passwords/history/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @patch("api.views.check_hibp_breach", return_value=(False, 0))
+    def test_new_check_invalidates(self, mock_hibp, user):
+        client = self.auth_client()
+        client.post("/api/passwords/check/", {"password": "abc"}, format="json")
+        etag = client.get("/api/passwords/history/")["ETag"]
+
+        client.post("/api/passwords/check/", {"password": "abcd"}, format="json")
+        resp = client.get("/api/passwords/history/", HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.json()) == 2
+
+    def test_no_checks_no_validators(self, user):
+        resp = self.auth_client().get("/api/stats/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert "ETag" not in resp
+
+
+@pytest.mark.django_db
+class TestResponseCompression:
+    def test_large_json_gzipped(self, user):
+        PasswordCheck.objects.bulk_create(
+            PasswordCheck(user=user, hash_prefix="ABCDE", label=f"Account {i}")
+            for i in range(50)
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+
+        plain = client.get("/api/passwords/history/")
+        resp = client.get("/api/passwords/history/", HTTP_ACCEPT_ENCODING="gzip")
+        assert resp["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp["Vary"]
+        assert gzip.decompress(resp.content) == plain.content
+
+    def test_small_json_not_compressed(self):
+        resp = APIClient().get("/api/health/", HTTP_ACCEPT_ENCODING="gzip")
+        assert not resp.has_header("Content-Encoding")
+
+    def test_streamed_export_gzipped(self, user):
+        PasswordCheck.objects.create(user=user, hash_prefix="ABCDE")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens(client)}")
+        resp = client.get("/api/passwords/history/export/", HTTP_ACCEPT_ENCODING="gzip")
+        assert resp["Content-Encoding"] == "gzip"
+        body = gzip.decompress(b"".join(resp.streaming_content))
+        assert json.loads(body)["id"]